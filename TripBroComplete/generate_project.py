@@ -1,340 +1,504 @@
 #!/usr/bin/env python3
 
+import argparse
+import contextlib
+import io
 import os
-import uuid
-
-def generate_uuid():
-    """Generate a 24-character hex UUID for Xcode"""
-    return uuid.uuid4().hex[:24].upper()
-
-# Find all Swift files
-swift_files = []
-for root, dirs, files in os.walk('TripBro'):
-    for file in files:
-        if file.endswith('.swift'):
-            path = os.path.join(root, file)
-            swift_files.append(path.replace('TripBro/', ''))
-
-print(f"Found {len(swift_files)} Swift files")
-
-# Generate UUIDs
-project_uuid = generate_uuid()
-target_uuid = generate_uuid()
-sources_uuid = generate_uuid()
-frameworks_uuid = generate_uuid()
-resources_uuid = generate_uuid()
-main_group_uuid = generate_uuid()
-products_group_uuid = generate_uuid()
-app_group_uuid = generate_uuid()
-product_ref_uuid = generate_uuid()
-build_config_list_project = generate_uuid()
-build_config_list_target = generate_uuid()
-build_config_debug = generate_uuid()
-build_config_release = generate_uuid()
-
-# Generate file references and build files
-file_refs = {}
-build_files = {}
-for swift_file in swift_files:
-    file_refs[swift_file] = generate_uuid()
-    build_files[swift_file] = generate_uuid()
-
-# Generate project.pbxproj
-content = f"""// !$*UTF8*$!
-{{
-	archiveVersion = 1;
-	classes = {{}};
-	objectVersion = 56;
-	objects = {{
-
-/* Begin PBXBuildFile section */"""
-
-for swift_file in swift_files:
-    name = os.path.basename(swift_file)
-    content += f"""
-		{build_files[swift_file]} /* {name} in Sources */ = {{isa = PBXBuildFile; fileRef = {file_refs[swift_file]} /* {name} */; }};"""
-
-content += """
-/* End PBXBuildFile section */
-
-/* Begin PBXFileReference section */"""
-
-content += f"""
-		{product_ref_uuid} /* TripBro.app */ = {{isa = PBXFileReference; explicitFileType = wrapper.application; includeInIndex = 0; path = TripBro.app; sourceTree = BUILT_PRODUCTS_DIR; }};"""
-
-for swift_file in swift_files:
-    name = os.path.basename(swift_file)
-    content += f"""
-		{file_refs[swift_file]} /* {name} */ = {{isa = PBXFileReference; lastKnownFileType = sourcecode.swift; path = {name}; sourceTree = "<group>"; }};"""
-
-content += f"""
-/* End PBXFileReference section */
-
-/* Begin PBXFrameworksBuildPhase section */
-		{frameworks_uuid} /* Frameworks */ = {{
-			isa = PBXFrameworksBuildPhase;
-			buildActionMask = 2147483647;
-			files = (
-			);
-			runOnlyForDeploymentPostprocessing = 0;
-		}};
-/* End PBXFrameworksBuildPhase section */
-
-/* Begin PBXGroup section */
-		{main_group_uuid} = {{
-			isa = PBXGroup;
-			children = (
-				{app_group_uuid} /* TripBro */,
-				{products_group_uuid} /* Products */,
-			);
-			sourceTree = "<group>";
-		}};
-		{products_group_uuid} /* Products */ = {{
-			isa = PBXGroup;
-			children = (
-				{product_ref_uuid} /* TripBro.app */,
-			);
-			name = Products;
-			sourceTree = "<group>";
-		}};
-		{app_group_uuid} /* TripBro */ = {{
-			isa = PBXGroup;
-			children = ("""
-
-# Add file references to group
-for swift_file in swift_files:
-    content += f"""
-				{file_refs[swift_file]} /* {os.path.basename(swift_file)} */,"""
-
-content += f"""
-			);
-			path = TripBro;
-			sourceTree = "<group>";
-		}};
-/* End PBXGroup section */
-
-/* Begin PBXNativeTarget section */
-		{target_uuid} /* TripBro */ = {{
-			isa = PBXNativeTarget;
-			buildConfigurationList = {build_config_list_target};
-			buildPhases = (
-				{sources_uuid} /* Sources */,
-				{frameworks_uuid} /* Frameworks */,
-				{resources_uuid} /* Resources */,
-			);
-			buildRules = (
-			);
-			dependencies = (
-			);
-			name = TripBro;
-			productName = TripBro;
-			productReference = {product_ref_uuid} /* TripBro.app */;
-			productType = "com.apple.product-type.application";
-		}};
-/* End PBXNativeTarget section */
-
-/* Begin PBXProject section */
-		{project_uuid} /* Project object */ = {{
-			isa = PBXProject;
-			attributes = {{
-				BuildIndependentTargetsInParallel = 1;
-				LastSwiftUpdateCheck = 1500;
-				LastUpgradeCheck = 1500;
-				TargetAttributes = {{
-					{target_uuid} = {{
-						CreatedOnToolsVersion = 15.0;
-					}};
-				}};
-			}};
-			buildConfigurationList = {build_config_list_project};
-			compatibilityVersion = "Xcode 14.0";
-			developmentRegion = en;
-			hasScannedForEncodings = 0;
-			knownRegions = (
-				en,
-				Base,
-			);
-			mainGroup = {main_group_uuid};
-			productRefGroup = {products_group_uuid} /* Products */;
-			projectDirPath = "";
-			projectRoot = "";
-			targets = (
-				{target_uuid} /* TripBro */,
-			);
-		}};
-/* End PBXProject section */
-
-/* Begin PBXResourcesBuildPhase section */
-		{resources_uuid} /* Resources */ = {{
-			isa = PBXResourcesBuildPhase;
-			buildActionMask = 2147483647;
-			files = (
-			);
-			runOnlyForDeploymentPostprocessing = 0;
-		}};
-/* End PBXResourcesBuildPhase section */
-
-/* Begin PBXSourcesBuildPhase section */
-		{sources_uuid} /* Sources */ = {{
-			isa = PBXSourcesBuildPhase;
-			buildActionMask = 2147483647;
-			files = ("""
-
-for swift_file in swift_files:
-    content += f"""
-				{build_files[swift_file]} /* {os.path.basename(swift_file)} in Sources */,"""
-
-content += f"""
-			);
-			runOnlyForDeploymentPostprocessing = 0;
-		}};
-/* End PBXSourcesBuildPhase section */
-
-/* Begin XCBuildConfiguration section */
-		{build_config_debug} /* Debug */ = {{
-			isa = XCBuildConfiguration;
-			buildSettings = {{
-				ALWAYS_SEARCH_USER_PATHS = NO;
-				CLANG_ANALYZER_NONNULL = YES;
-				CLANG_ENABLE_MODULES = YES;
-				CLANG_ENABLE_OBJC_ARC = YES;
-				DEBUG_INFORMATION_FORMAT = dwarf;
-				ENABLE_STRICT_OBJC_MSGSEND = YES;
-				ENABLE_TESTABILITY = YES;
-				GCC_C_LANGUAGE_STANDARD = gnu17;
-				GCC_DYNAMIC_NO_PIC = NO;
-				GCC_NO_COMMON_BLOCKS = YES;
-				GCC_OPTIMIZATION_LEVEL = 0;
-				GCC_WARN_64_TO_32_BIT_CONVERSION = YES;
-				GCC_WARN_ABOUT_RETURN_TYPE = YES_ERROR;
-				GCC_WARN_UNDECLARED_SELECTOR = YES;
-				GCC_WARN_UNINITIALIZED_AUTOS = YES_AGGRESSIVE;
-				GCC_WARN_UNUSED_FUNCTION = YES;
-				GCC_WARN_UNUSED_VARIABLE = YES;
-				IPHONEOS_DEPLOYMENT_TARGET = 17.0;
-				MTL_ENABLE_DEBUG_INFO = INCLUDE_SOURCE;
-				MTL_FAST_MATH = YES;
-				ONLY_ACTIVE_ARCH = YES;
-				SDKROOT = iphoneos;
-				SWIFT_ACTIVE_COMPILATION_CONDITIONS = DEBUG;
-				SWIFT_OPTIMIZATION_LEVEL = "-Onone";
-			}};
-			name = Debug;
-		}};
-		{build_config_release} /* Release */ = {{
-			isa = XCBuildConfiguration;
-			buildSettings = {{
-				ALWAYS_SEARCH_USER_PATHS = NO;
-				CLANG_ANALYZER_NONNULL = YES;
-				CLANG_ENABLE_MODULES = YES;
-				CLANG_ENABLE_OBJC_ARC = YES;
-				COPY_PHASE_STRIP = NO;
-				DEBUG_INFORMATION_FORMAT = "dwarf-with-dsym";
-				ENABLE_NS_ASSERTIONS = NO;
-				ENABLE_STRICT_OBJC_MSGSEND = YES;
-				GCC_C_LANGUAGE_STANDARD = gnu17;
-				GCC_NO_COMMON_BLOCKS = YES;
-				GCC_WARN_64_TO_32_BIT_CONVERSION = YES;
-				GCC_WARN_ABOUT_RETURN_TYPE = YES_ERROR;
-				GCC_WARN_UNDECLARED_SELECTOR = YES;
-				GCC_WARN_UNINITIALIZED_AUTOS = YES_AGGRESSIVE;
-				GCC_WARN_UNUSED_FUNCTION = YES;
-				GCC_WARN_UNUSED_VARIABLE = YES;
-				IPHONEOS_DEPLOYMENT_TARGET = 17.0;
-				MTL_ENABLE_DEBUG_INFO = NO;
-				MTL_FAST_MATH = YES;
-				SDKROOT = iphoneos;
-				SWIFT_COMPILATION_MODE = wholemodule;
-				VALIDATE_PRODUCT = YES;
-			}};
-			name = Release;
-		}};
-		{generate_uuid()} /* Debug */ = {{
-			isa = XCBuildConfiguration;
-			buildSettings = {{
-				ASSETCATALOG_COMPILER_APPICON_NAME = AppIcon;
-				ASSETCATALOG_COMPILER_GLOBAL_ACCENT_COLOR_NAME = AccentColor;
-				CODE_SIGN_STYLE = Automatic;
-				CURRENT_PROJECT_VERSION = 1;
-				ENABLE_PREVIEWS = YES;
-				GENERATE_INFOPLIST_FILE = YES;
-				INFOPLIST_KEY_UIApplicationSceneManifest_Generation = YES;
-				INFOPLIST_KEY_UIApplicationSupportsIndirectInputEvents = YES;
-				INFOPLIST_KEY_UILaunchScreen_Generation = YES;
-				INFOPLIST_KEY_UISupportedInterfaceOrientations = "UIInterfaceOrientationPortrait UIInterfaceOrientationLandscapeLeft UIInterfaceOrientationLandscapeRight";
-				INFOPLIST_KEY_UISupportedInterfaceOrientations_iPad = "UIInterfaceOrientationPortrait UIInterfaceOrientationPortraitUpsideDown UIInterfaceOrientationLandscapeLeft UIInterfaceOrientationLandscapeRight";
-				LD_RUNPATH_SEARCH_PATHS = (
-					"$(inherited)",
-					"@executable_path/Frameworks",
-				);
-				MARKETING_VERSION = 1.0;
-				PRODUCT_BUNDLE_IDENTIFIER = com.tripbro.app;
-				PRODUCT_NAME = "$(TARGET_NAME)";
-				SWIFT_EMIT_LOC_STRINGS = YES;
-				SWIFT_VERSION = 5.0;
-				TARGETED_DEVICE_FAMILY = "1,2";
-			}};
-			name = Debug;
-		}};
-		{generate_uuid()} /* Release */ = {{
-			isa = XCBuildConfiguration;
-			buildSettings = {{
-				ASSETCATALOG_COMPILER_APPICON_NAME = AppIcon;
-				ASSETCATALOG_COMPILER_GLOBAL_ACCENT_COLOR_NAME = AccentColor;
-				CODE_SIGN_STYLE = Automatic;
-				CURRENT_PROJECT_VERSION = 1;
-				ENABLE_PREVIEWS = YES;
-				GENERATE_INFOPLIST_FILE = YES;
-				INFOPLIST_KEY_UIApplicationSceneManifest_Generation = YES;
-				INFOPLIST_KEY_UIApplicationSupportsIndirectInputEvents = YES;
-				INFOPLIST_KEY_UILaunchScreen_Generation = YES;
-				INFOPLIST_KEY_UISupportedInterfaceOrientations = "UIInterfaceOrientationPortrait UIInterfaceOrientationLandscapeLeft UIInterfaceOrientationLandscapeRight";
-				INFOPLIST_KEY_UISupportedInterfaceOrientations_iPad = "UIInterfaceOrientationPortrait UIInterfaceOrientationPortraitUpsideDown UIInterfaceOrientationLandscapeLeft UIInterfaceOrientationLandscapeRight";
-				LD_RUNPATH_SEARCH_PATHS = (
-					"$(inherited)",
-					"@executable_path/Frameworks",
-				);
-				MARKETING_VERSION = 1.0;
-				PRODUCT_BUNDLE_IDENTIFIER = com.tripbro.app;
-				PRODUCT_NAME = "$(TARGET_NAME)";
-				SWIFT_EMIT_LOC_STRINGS = YES;
-				SWIFT_VERSION = 5.0;
-				TARGETED_DEVICE_FAMILY = "1,2";
-			}};
-			name = Release;
-		}};
-/* End XCBuildConfiguration section */
-
-/* Begin XCConfigurationList section */
-		{build_config_list_project} = {{
-			isa = XCConfigurationList;
-			buildConfigurations = (
-				{build_config_debug} /* Debug */,
-				{build_config_release} /* Release */,
-			);
-			defaultConfigurationIsVisible = 0;
-			defaultConfigurationName = Release;
-		}};
-		{build_config_list_target} = {{
-			isa = XCConfigurationList;
-			buildConfigurations = (
-				{generate_uuid()} /* Debug */,
-				{generate_uuid()} /* Release */,
-			);
-			defaultConfigurationIsVisible = 0;
-			defaultConfigurationName = Release;
-		}};
-/* End XCConfigurationList section */
-	}};
-	rootObject = {project_uuid} /* Project object */;
-}}
-"""
-
-# Create Xcode project directory and write the file
-os.makedirs("TripBro.xcodeproj", exist_ok=True)
-with open("TripBro.xcodeproj/project.pbxproj", "w") as f:
-    f.write(content)
-
-print("✅ Xcode project generated successfully!")
-print("📂 All Swift files included in build phase")
-print("🚀 Ready to open in Xcode and build!")
\ No newline at end of file
+import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from pbxtools import profile, swift, targets
+from pbxtools.classify import PHASES, Classifier, parse_override
+from pbxtools.groups import GroupTrie, child_order, group_order, missing_groups, prune_groups
+from pbxtools.ids import registry_for, registry_from_project
+from pbxtools.lock import project_lock
+from pbxtools.manifest import Manifest, file_digest, manifest_path, stat_key
+from pbxtools.model import BuildFile, Group, PBXObject
+from pbxtools.pbxproj import Project, insert_sorted
+from pbxtools.scan import DEFAULT_IGNORES, find_projects, scan_order
+from pbxtools.settings import (CONFIGURATIONS, DEFAULT_TIMING_THRESHOLD_MS, TIMING_CONFIGURATION, XCCONFIG_DIR,
+                               configurations_for, write_xcconfigs)
+from pbxtools.targets import PHASE_CLASSES, source_ids, source_reference, source_roots
+from pbxtools.watch import watch
+from pbxtools.writer import write_stream
+
+PROJECT_DIR = 'TripBro.xcodeproj'
+PROJECT_FILE = 'TripBro.xcodeproj/project.pbxproj'
+# --batch: only projects with the app's sources next to them are generated
+APP_ROOT = 'TripBro'
+# --exit-code: status when project.pbxproj was left as it was
+UNCHANGED_EXIT_STATUS = 3
+# --profile: report and trace are written to PREFIX.json and PREFIX.trace.json
+PROFILE_PREFIX = 'TripBro.profile'
+# --watch: the generator's own manifest, caches, lock and .xcconfig output are not source changes
+WATCH_IGNORES = (*DEFAULT_IGNORES, '.*.xcodeproj.*', f'{XCCONFIG_DIR}/')
+
+def split_root(path, roots):
+    """Return (source root, directory below it) for a scanned path"""
+    root = next(root for root in roots if path.startswith(f"{root}/"))
+    return root, os.path.dirname(path[len(root) + 1:])
+
+def classifier_for(args):
+    """Return the Classifier for the --file-type overrides"""
+    return Classifier([parse_override(text) for text in args.file_types])
+
+def generator_digest():
+    """Fingerprint of this script, so template changes force a full regeneration"""
+    return file_digest(os.path.abspath(__file__))
+
+def patch_project(manifest, specs, classifier, added, removed):
+    """Apply added/removed files to the existing project in place.
+
+    Returns False when the project does not have the expected layout and
+    needs a full regeneration instead.
+    """
+    with profile.phase('parse'):
+        project = Project.load(PROJECT_FILE)
+    with profile.phase('ids'):
+        registry = registry_from_project(project)
+    with profile.phase('patch'):
+        if not _patch(project, registry, manifest, specs, classifier, added, removed):
+            return False
+    profile.count_project(project)
+    with profile.phase('write'):
+        project.save(PROJECT_FILE)
+    return True
+
+def _patch(project, registry, manifest, specs, classifier, added, removed):
+    """Edit the parsed project; False if it lacks the expected groups or phases.
+
+    New objects, phase members and group children go where a full
+    regeneration would write them, so --full over a patched project finds
+    nothing to change.
+    """
+    roots = source_roots(specs)
+    groups = {root: GroupTrie.from_project(project, root) for root in roots}
+    phases = {spec.name: {phase: project.get(registry.id_for(spec.name, cls.isa))
+                          for phase, cls in PHASE_CLASSES.items()} for spec in specs}
+    if None in groups.values() or any(None in by_phase.values() for by_phase in phases.values()):
+        return False
+
+    stale_refs = {}
+    stale_builds = set()
+    for path in removed:
+        entry = manifest.forget(path)
+        file_ref, *build_files = entry[3:]
+        stale_refs.setdefault(split_root(path, roots), set()).add(file_ref)
+        stale_builds.update(build_files)
+        for uuid in (file_ref, *build_files):
+            if uuid in project:
+                project.remove_object(uuid)
+    for by_phase in phases.values():
+        for phase in by_phase.values():
+            phase['files'].remove_all(stale_builds)
+    # Deepest directories first, so emptied parents are pruned after their children
+    for root, directory in sorted(stale_refs, key=lambda key: len(key[1]), reverse=True):
+        node = groups[root].get(directory)
+        if node is not None:
+            project.get(node.uuid)['children'].remove_all(stale_refs[root, directory])
+            prune_groups(project, groups[root], directory)
+
+    # Sort keys of the files the project keeps: sources in scan order, per root
+    path_order = {path: (roots.index(root), scan_order(path)) for path in manifest.files
+                  for root in roots if path.startswith(f"{root}/")}
+    order = {}
+    for path, entry in manifest.files.items():
+        for uuid in entry[3:]:
+            order[uuid] = path_order.get(path, ())
+    target_order = {build_uuid: (i, PHASES.index(phase))
+                    for i, spec in enumerate(specs) for phase, obj in phases[spec.name].items()
+                    for build_uuid in obj['files']}
+    for i, root in enumerate(roots):
+        for uuid, directory in groups[root].paths().items():
+            order[uuid] = (i, group_order(directory))
+
+    spec_index = {spec.name: i for i, spec in enumerate(specs)}
+    objects, members, children = {}, {}, {}
+    for path in added:
+        file_type, phase = classifier.classify(path)
+        file_ref, build_files = source_ids(registry, specs, path, phase)
+        order[file_ref] = path_order[path]
+        objects[file_ref] = source_reference(path, file_ref, file_type).to_dict()
+        for name, build_file in build_files.items():
+            order[build_file] = path_order[path]
+            target_order[build_file] = (spec_index[name], PHASES.index(phase))
+            objects[build_file] = BuildFile(build_file, PBXObject(file_ref), phase).to_dict()
+            members.setdefault((name, phase), []).append(build_file)
+        root, directory = split_root(path, roots)
+        node, created = missing_groups(groups[root], directory,
+                                       lambda directory, root=root: registry.id_for('', 'PBXGroup',
+                                                                                    f"{root}/{directory}"))
+        parent = groups[root].get(os.path.dirname(created[0][0])) if created else None
+        for group_path, group in created:
+            order[group.uuid] = (roots.index(root), group_order(group_path))
+            objects[group.uuid] = Group(group.uuid, path=os.path.basename(group_path)).to_dict()
+            children.setdefault(parent.uuid, []).append(group.uuid)
+            parent = group
+        children.setdefault(node.uuid, []).append(file_ref)
+        manifest.files[path][3:] = [file_ref, *build_files.values()]
+
+    def object_order(uuid):
+        # Build files sort by target and phase first, as each target's phases are written in turn
+        return (target_order.get(uuid, ()), order.get(uuid, ())) if uuid in target_order else order.get(uuid, ())
+    project.add_sorted(objects, object_order)
+    for (name, phase), build_files in members.items():
+        insert_sorted(phases[name][phase]['files'], build_files, lambda uuid: order.get(uuid, ()))
+    for group_uuid, uuids in children.items():
+        insert_sorted(project.get(group_uuid)['children'], uuids, child_order(project))
+    return True
+
+def write_project(sources, registry, xcconfig, configurations=CONFIGURATIONS):
+    """Write project.pbxproj, plus the shared .xcconfig files when asked to.
+
+    Returns True if project.pbxproj changed; identical output is not written.
+    """
+    os.makedirs(PROJECT_DIR, exist_ok=True)
+    if xcconfig:
+        write_xcconfigs(targets.target_layers(sources.specs), configurations=configurations)
+    with profile.phase('write'):
+        # Rendering happens as the writer pulls chunks; 'render' is the time spent producing them
+        chunks = targets.iter_project(sources, registry, xcconfig, configurations=configurations)
+        return write_stream(PROJECT_FILE, profile.timed('render', chunks))
+
+def write_synchronized(specs, classifier, xcconfig=False, configurations=CONFIGURATIONS):
+    """Write project.pbxproj with the source roots as synchronized folders.
+
+    Only membership exceptions are listed, so the project changes when one
+    of those does, not when files are added or removed. Returns True if
+    project.pbxproj changed.
+    """
+    os.makedirs(PROJECT_DIR, exist_ok=True)
+    if xcconfig:
+        write_xcconfigs(targets.target_layers(specs), configurations=configurations)
+    with profile.phase('registry'):
+        registry = registry_for(PROJECT_FILE)
+    with profile.phase('scan'):
+        exceptions = targets.membership_exceptions(specs, classifier)
+    print(f"Found {sum(map(len, exceptions.values()))} membership exceptions")
+    with profile.phase('write'):
+        chunks = targets.iter_synchronized_project(specs, registry, exceptions, xcconfig, configurations)
+        return write_stream(PROJECT_FILE, profile.timed('render', chunks))
+
+def regenerate(manifest, specs, classifier, scanned, hash_contents, xcconfig=False, configurations=CONFIGURATIONS):
+    """Render the whole project from the scanned sources and rebuild the manifest.
+
+    Returns True if project.pbxproj changed.
+    """
+    with profile.phase('registry'):
+        registry = registry_for(PROJECT_FILE)
+    manifest.files = {}
+    with profile.phase('ids'):
+        sources = targets.collect_sources(registry, specs, scanned, classifier=classifier)
+    with sources:
+        written = write_project(sources, registry, xcconfig, configurations)
+    with profile.phase('manifest'):
+        for path, (size, mtime_ns) in scanned.items():
+            digest = file_digest(path) if hash_contents else None
+            file_ref, build_files = source_ids(registry, specs, path, classifier.classify(path)[1])
+            manifest.record(path, size, mtime_ns, digest, file_ref, *build_files.values())
+    return written
+
+def index_swift(specs, classifier, scanned=None):
+    """Refresh the Swift type index beside the project from a stat scan.
+
+    Only files whose size or mtime moved are read; see pbxtools.swift.
+    Without a scan the source roots are walked for one.
+    """
+    with profile.phase('swift-index'):
+        if scanned is None:
+            scanned = targets.scan_sources(specs, with_stat=True, classifier=classifier)
+        index, read, parsed = swift.refresh(PROJECT_DIR, scanned)
+    print(f"🔎 Swift index: {len(index.files)} files, {read} read, {parsed} parsed")
+
+def update(args):
+    """Bring the project in line with the source roots, patching it when possible.
+
+    The project lock is held from the manifest check to the last write, so
+    the updater and the project server never interleave with a patch or a
+    regeneration. Returns True if project.pbxproj was written, False if it
+    was left as is.
+    """
+    with project_lock(PROJECT_FILE):
+        return _update(args)
+
+def _update(args):
+    with profile.phase('manifest'):
+        manifest = Manifest.load(manifest_path(PROJECT_DIR))
+    specs = targets.active_targets()
+    names = [spec.name for spec in specs]
+    classifier = classifier_for(args)
+    configurations = configurations_for(args.compile_timing)
+
+    if args.swift_index and (args.synchronized or args.low_memory):
+        index_swift(specs, classifier)
+
+    if args.synchronized:
+        # Xcode lists synchronized folders itself; there are no files to track
+        manifest.discard()
+        written = write_synchronized(specs, classifier, args.xcconfig, configurations)
+        print("✅ Xcode project generated with synchronized folders" if written
+              else "✅ Xcode project is up to date; project.pbxproj left untouched")
+        return written
+
+    if args.low_memory:
+        # Streaming mode never holds the file list, so there is nothing to diff against
+        manifest.discard()
+        with profile.phase('registry'):
+            registry = registry_for(PROJECT_FILE)
+        with profile.phase('ids'):
+            # The scan streams into the ID assignment; 'scan' is its share
+            paths = profile.timed('scan', targets.iter_source_paths(specs, classifier))
+            sources = targets.collect_sources(registry, specs, paths, low_memory=True, classifier=classifier)
+        with sources:
+            print(f"Found {len(sources)} files")
+            written = write_project(sources, registry, args.xcconfig, configurations)
+        print("✅ Xcode project generated successfully!" if written
+              else "✅ Xcode project is up to date; project.pbxproj left untouched")
+        return written
+
+    with profile.phase('scan'):
+        scanned = targets.scan_sources(specs, with_stat=True, classifier=classifier)
+    print(f"Found {len(scanned)} files for {', '.join(names)}")
+    if args.swift_index:
+        index_swift(specs, classifier, scanned)
+
+    incremental = (not args.full
+                   and manifest.meta.get('generator') == generator_digest()
+                   and manifest.meta.get('project') == stat_key(PROJECT_FILE)
+                   and manifest.meta.get('xcconfig', False) == args.xcconfig
+                   and manifest.meta.get('compile_timing') == args.compile_timing
+                   and manifest.meta.get('targets') == names
+                   and manifest.meta.get('file_types', []) == args.file_types)
+
+    if incremental:
+        with profile.phase('diff'):
+            added, removed, changed = manifest.diff(scanned, '.' if args.hash else None)
+        if not added and not removed:
+            if changed:
+                manifest.save()
+            print("✅ Xcode project is up to date")
+            return False
+        for path in added:
+            size, mtime_ns = scanned[path]
+            digest = file_digest(path) if args.hash else None
+            manifest.record(path, size, mtime_ns, digest)
+        incremental = patch_project(manifest, specs, classifier, added, removed)
+        if incremental:
+            print(f"✅ Xcode project patched: {len(added)} added, {len(removed)} removed")
+
+    written = True
+    if not incremental:
+        written = regenerate(manifest, specs, classifier, scanned, args.hash, args.xcconfig, configurations)
+        if written:
+            print("✅ Xcode project generated successfully!")
+            print("📂 Sources, resources and frameworks included in their targets' build phases")
+            print("🚀 Ready to open in Xcode and build!")
+        else:
+            print("✅ Xcode project is up to date; project.pbxproj left untouched")
+
+    manifest.meta['generator'] = generator_digest()
+    manifest.meta['project'] = stat_key(PROJECT_FILE)
+    manifest.meta['xcconfig'] = args.xcconfig
+    manifest.meta['compile_timing'] = args.compile_timing
+    manifest.meta['targets'] = names
+    manifest.meta['file_types'] = args.file_types
+    with profile.phase('manifest'):
+        manifest.save()
+    return written
+
+class BatchResult:
+    """Outcome of updating one project in --batch mode"""
+
+    __slots__ = ('project', 'status', 'seconds', 'output', 'error')
+
+    def __init__(self, project, status, seconds=0.0, output='', error=None):
+        self.project = project
+        self.status = status
+        self.seconds = seconds
+        self.output = output
+        self.error = error
+
+def update_project(project, args):
+    """Run update(args) in the directory holding project, capturing its output.
+
+    Meant for a pool worker, which owns its working directory. Projects
+    with no generator manifest or no app folder are skipped, so hand-kept
+    projects in the tree are never rewritten. Never raises: failures come
+    back as a 'failed' BatchResult carrying the traceback.
+    """
+    start = time.perf_counter()
+    output = io.StringIO()
+    try:
+        os.chdir(os.path.dirname(project) or '.')
+        if os.path.basename(project) != PROJECT_DIR:
+            return BatchResult(project, 'skipped', error=f"only {PROJECT_DIR} projects are generated")
+        # A project the generator never wrote, or one without its app, is someone else's
+        if not os.path.exists(manifest_path(PROJECT_DIR)):
+            return BatchResult(project, 'skipped', error="no generator manifest; not a generated project")
+        if not os.path.isdir(APP_ROOT):
+            return BatchResult(project, 'skipped', error=f"no {APP_ROOT}/ folder next to it")
+        with contextlib.redirect_stdout(output):
+            written = update(args)
+        status = 'written' if written else 'unchanged'
+        return BatchResult(project, status, time.perf_counter() - start, output.getvalue())
+    except Exception:
+        return BatchResult(project, 'failed', time.perf_counter() - start, output.getvalue(),
+                           traceback.format_exc())
+
+def _run_pool(projects, args, jobs):
+    """Yield a BatchResult per project as workers finish.
+
+    A worker that dies outright breaks the whole pool; the projects it took
+    down are retried one per fresh process, so only the culprit fails.
+    """
+    broken = []
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = {pool.submit(update_project, project, args): project for project in projects}
+        for future in as_completed(futures):
+            try:
+                yield future.result()
+            except BrokenProcessPool:
+                broken.append(futures[future])
+    for project in broken:
+        with ProcessPoolExecutor(max_workers=1) as pool:
+            try:
+                yield pool.submit(update_project, project, args).result()
+            except BrokenProcessPool:
+                yield BatchResult(project, 'failed', error="worker process died")
+
+def batch(args):
+    """Update every TripBro.xcodeproj below args.batch in parallel and print a summary.
+
+    Returns (results, whether any project was written). One failing project
+    does not stop the others.
+    """
+    root = os.path.abspath(args.batch)
+    projects = [os.path.join(root, path) for path in find_projects(root)]
+    if not projects:
+        print(f"No .xcodeproj found below {root}")
+        return [], False
+    jobs = max(1, min(args.jobs or os.cpu_count() or 1, len(projects)))
+    print(f"🧩 Updating {len(projects)} projects below {root} with {jobs} workers")
+
+    marks = {'written': '✅', 'unchanged': '✅', 'skipped': '⏭ ', 'failed': '❌'}
+    results = []
+    for result in _run_pool(projects, args, jobs):
+        results.append(result)
+        detail = result.error.strip().splitlines()[-1] if result.error else result.status
+        print(f"  {marks[result.status]} {os.path.relpath(result.project, root)}: {detail} ({result.seconds:.1f} s)")
+
+    counts = {status: sum(1 for result in results if result.status == status) for status in marks}
+    print(f"📋 {counts['written']} written, {counts['unchanged']} unchanged, "
+          f"{counts['skipped']} skipped, {counts['failed']} failed")
+    for result in sorted(results, key=lambda result: result.project):
+        if result.status == 'failed':
+            print(f"\n❌ {os.path.relpath(result.project, root)}")
+            if result.output:
+                print(result.output.rstrip())
+            print(result.error.rstrip())
+    return results, counts['written'] > 0
+
+def watch_sources(args):
+    """Keep the project in sync while project files come and go"""
+    def on_change():
+        try:
+            update(args)
+        except Exception as e:
+            print(f"❌ Update failed: {e}")
+
+    # Every batch after the first is incremental
+    args.full = False
+    roots = ', '.join(f"{root}/" for root in source_roots(targets.active_targets()))
+    print(f"👀 Watching {roots} for project files (Ctrl+C to stop)")
+    try:
+        # Watching the project directory also notices test roots being created
+        watch('.', on_change, debounce=args.debounce, suffixes=classifier_for(args).suffixes, ignore=WATCH_IGNORES)
+    except KeyboardInterrupt:
+        pass
+
+def build_parser():
+    """Return the command line parser; parse_args([]) gives the default options"""
+    parser = argparse.ArgumentParser(description="Generate TripBro.xcodeproj for the app and its test targets")
+    parser.add_argument("--low-memory", action="store_true",
+                        help="spool the source table to disk so memory stays flat (always a full run)")
+    parser.add_argument("--full", action="store_true",
+                        help="ignore the manifest and regenerate the whole project")
+    parser.add_argument("--hash", action="store_true",
+                        help="record content hashes so touched-but-unchanged files are recognised")
+    parser.add_argument("--xcconfig", action="store_true",
+                        help="write build settings to Configs/*.xcconfig instead of inline")
+    parser.add_argument("--compile-timing", nargs="?", type=int, const=DEFAULT_TIMING_THRESHOLD_MS, metavar="MS",
+                        help=f"add a {TIMING_CONFIGURATION} configuration (Debug plus Swift frontend timing flags) "
+                             f"that warns about function bodies slower than MS to type-check "
+                             f"(default: {DEFAULT_TIMING_THRESHOLD_MS}); see analyze_build_log.py")
+    parser.add_argument("--synchronized", action="store_true",
+                        help="reference the source roots as synchronized folders (objectVersion 77, Xcode 16+) "
+                             "so adding or removing files needs no project change")
+    parser.add_argument("--file-type", dest="file_types", action="append", default=[],
+                        metavar="PATTERN=TYPE[:PHASE]",
+                        help="classify files matching PATTERN as TYPE, built in PHASE (sources, resources, "
+                             "frameworks or none); PATTERN=- leaves them out. Repeatable, last match wins")
+    parser.add_argument("--swift-index", action="store_true",
+                        help="also refresh the cached index of Swift type declarations and references "
+                             "(see query_xcode_project.py --users and --affected)")
+    parser.add_argument("--exit-code", action="store_true",
+                        help=f"exit with status {UNCHANGED_EXIT_STATUS} when project.pbxproj did not change")
+    parser.add_argument("--watch", action="store_true",
+                        help="keep running and update the project as files appear or disappear")
+    parser.add_argument("--debounce", type=float, default=0.5, metavar="SECONDS",
+                        help="quiet period that ends a burst of changes in --watch mode")
+    parser.add_argument("--batch", metavar="ROOT",
+                        help=f"update every generated {PROJECT_DIR} found below ROOT in parallel, each from its "
+                             "own directory, and print a summary; exits with status 1 if any failed")
+    parser.add_argument("--jobs", type=int, metavar="N",
+                        help="worker processes for --batch (default: one per CPU)")
+    parser.add_argument("--profile", nargs="?", const=PROFILE_PREFIX, metavar="PREFIX",
+                        help="time each phase and trace allocations (slower), writing PREFIX.json and a "
+                             f"Chrome trace to PREFIX.trace.json (default prefix: {PROFILE_PREFIX})")
+    return parser
+
+def main():
+    parser = build_parser()
+    args = parser.parse_args()
+    if args.watch and args.low_memory:
+        parser.error("--watch relies on the manifest and cannot be combined with --low-memory")
+    if args.synchronized and args.low_memory:
+        parser.error("--synchronized lists no files and cannot be combined with --low-memory")
+    if args.compile_timing is not None and args.compile_timing < 1:
+        parser.error("--compile-timing needs a threshold of at least 1 ms")
+    if args.batch and (args.watch or args.profile):
+        parser.error("--batch cannot be combined with --watch or --profile")
+    try:
+        classifier_for(args)
+    except ValueError as e:
+        parser.error(str(e))
+    if not args.batch and not targets.active_targets():
+        parser.error("no TripBro/ folder here to generate the project from")
+
+    if args.batch:
+        results, written = batch(args)
+        if any(result.status == 'failed' for result in results):
+            sys.exit(1)
+        if args.exit_code and not written:
+            sys.exit(UNCHANGED_EXIT_STATUS)
+        return
+
+    if args.profile:
+        profile.enable()
+    with profile.phase('total'):
+        written = update(args)
+    if args.profile:
+        print(profile.finish(args.profile).summary())
+        print(f"📊 Profile written to {args.profile}.json and {args.profile}.trace.json")
+    if args.watch:
+        watch_sources(args)
+    elif args.exit_code and not written:
+        sys.exit(UNCHANGED_EXIT_STATUS)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Rank the Swift files and functions that dominate compile time
+
+Reads xcodebuild logs of the CompileTiming configuration (generate_project.py
+--compile-timing), plain, gzipped or on stdin, and prints the slowest files
+and function bodies (see pbxtools.buildlog). With --history each run is
+recorded, and the report shows how every entry moved since the previous
+run and over the last few. Needs only the captured log, not Xcode:
+
+    xcodebuild -configuration CompileTiming build | tee build.log
+    ./analyze_build_log.py build.log --history compile-times.json
+"""
+
+import argparse
+import json
+
+from pbxtools.buildlog import HISTORY_RUNS, CompileTimes, History, format_report, report
+
+def main():
+    parser = argparse.ArgumentParser(description="Report compile-time hotspots from xcodebuild logs")
+    parser.add_argument("logs", nargs="*", default=["-"], metavar="LOG",
+                        help="xcodebuild output to read, .gz allowed; - or nothing reads stdin")
+    parser.add_argument("--top", type=int, default=20, metavar="N", help="entries per ranking (default: 20)")
+    parser.add_argument("--root", help="show paths relative to this directory "
+                                       "(default: the directory all sources share)")
+    parser.add_argument("--history", metavar="PATH",
+                        help=f"record this run in PATH and show trends against the runs kept there "
+                             f"(the last {HISTORY_RUNS})")
+    parser.add_argument("--label", help="name of this run in the history (default: the current time)")
+    parser.add_argument("--trend", type=int, default=5, metavar="RUNS",
+                        help="runs shown in each entry's trend, this one included (default: 5)")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args()
+    if args.top < 1 or args.trend < 1:
+        parser.error("--top and --trend must be at least 1")
+
+    times = CompileTimes()
+    for path in args.logs:
+        try:
+            times.read(path)
+        except OSError as e:
+            raise SystemExit(f"{path}: {e.strerror or e}")
+    root = args.root or times.common_root()
+    if root:
+        times = times.relative_to(root)
+
+    history = History.load(args.history) if args.history else None
+    data = report(times, args.top, history.runs if history else (), args.label, args.trend)
+    if history is not None and times.functions:
+        history.record(times, args.label)
+        history.save()
+
+    if args.json:
+        print(json.dumps(data, indent=1, ensure_ascii=False))
+    else:
+        print(format_report(data))
+
+if __name__ == "__main__":
+    main()
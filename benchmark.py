@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""
+Benchmark project generation and updates on synthetic source trees
+
+For each requested size a TripBro/-style tree is created in a scratch
+directory (App, Models, Views, Services and Repositories, nested `--depth`
+levels deep), then every stage is timed over `--repeat` runs and the best
+time kept. One extra run per stage is traced with tracemalloc for peak
+memory. Results are written as JSON; with --baseline the run fails when a
+stage's throughput (tree files per second) drops by more than --threshold
+percent.
+"""
+
+import argparse
+import contextlib
+import importlib.util
+import io
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import generate_complete_xcode_project as complete
+import update_xcode_project as updater
+from pbxtools.ids import IDRegistry
+from pbxtools.pbxproj import Project
+from pbxtools.targets import active_targets, scan_sources
+from pbxtools.writer import write_stream
+
+TOP_DIRS = ('App', 'Models', 'Views', 'Services', 'Repositories')
+
+DEFAULT_SIZES = (1_000, 10_000, 100_000)
+
+
+def load_generator():
+    """Import TripBroComplete/generate_project.py, which is not a package module"""
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                        'TripBroComplete', 'generate_project.py')
+    spec = importlib.util.spec_from_file_location('generate_project', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def make_tree(root, files, depth=3, fanout=4):
+    """Create `files` Swift files under root/TripBro, spread over nested feature dirs"""
+    dirs = []
+    stack = [(os.path.join(root, 'TripBro', top), 1) for top in reversed(TOP_DIRS)]
+    while stack:
+        path, level = stack.pop()
+        dirs.append(path)
+        if level < depth:
+            stack.extend((os.path.join(path, f"Feature{i}"), level + 1) for i in reversed(range(fanout)))
+    for path in dirs:
+        os.makedirs(path, exist_ok=True)
+    for i in range(files):
+        with open(os.path.join(dirs[i % len(dirs)], f"Type{i}.swift"), 'w') as f:
+            f.write(f"struct Type{i} {{}}\n")
+
+
+def change_files(count, create):
+    """Create or delete `count` extra Swift files under TripBro/Bench"""
+    directory = os.path.join('TripBro', 'Bench')
+    os.makedirs(directory, exist_ok=True)
+    paths = [os.path.join(directory, f"Extra{i}.swift") for i in range(count)]
+    for path in paths:
+        if create:
+            with open(path, 'w') as f:
+                f.write("struct Extra {}\n")
+        elif os.path.exists(path):
+            os.remove(path)
+    return paths
+
+
+class Stage:
+    """A named step: setup() runs untimed, run(state) is measured"""
+
+    def __init__(self, name, run, setup=None):
+        self.name = name
+        self.run = run
+        self.setup = setup or (lambda: None)
+
+
+def measure_stage(stage, repeat):
+    """Return {'seconds': best wall time, 'peak_bytes': traced peak}"""
+    best = None
+    for _ in range(repeat):
+        state = stage.setup()
+        start = time.perf_counter()
+        stage.run(state)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    state = stage.setup()
+    tracemalloc.start()
+    try:
+        stage.run(state)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return {'seconds': best, 'peak_bytes': peak}
+
+
+def build_stages(generator, changes):
+    """Stages in execution order; they run with the scratch tree as cwd"""
+    # The generator's own defaults, so options added to it later are always present
+    quiet = generator.build_parser().parse_args([])
+
+    def collect():
+        registry = IDRegistry()
+        return registry, complete.collect_sources(registry, paths=scan_sources(active_targets()))
+
+    def update(full=False):
+        quiet.full = full
+        with contextlib.redirect_stdout(io.StringIO()):
+            generator.update(quiet)
+
+    def patch_setup(create):
+        def setup():
+            change_files(changes, not create)
+            update()
+            return change_files(changes, create)
+        return setup
+
+    def updater_setup():
+        project = Project.load(generator.PROJECT_FILE)
+        paths = [os.path.join('TripBro', 'Bench', f"Added{i}.swift") for i in range(changes)]
+        return project, paths
+
+    def updater_run(state):
+        project, paths = state
+        updater.add_files(project, paths)
+        updater.remove_files(project, paths)
+        project.save(generator.PROJECT_FILE)
+
+    return [
+        Stage('scan', lambda _: scan_sources(active_targets())),
+        Stage('ids', lambda paths: complete.collect_sources(IDRegistry(), paths=paths),
+              lambda: scan_sources(active_targets())),
+        Stage('render', lambda state: ''.join(complete.iter_pbxproj(state[1], state[0])), collect),
+        Stage('write', lambda state: write_stream('bench.pbxproj', complete.iter_pbxproj(state[1], state[0])),
+              collect),
+        Stage('generate', lambda _: update(full=True)),
+        Stage('patch_add', lambda _: update(), patch_setup(True)),
+        Stage('patch_remove', lambda _: update(), patch_setup(False)),
+        Stage('load', lambda _: Project.load(generator.PROJECT_FILE)),
+        Stage('updater', updater_run, updater_setup),
+    ]
+
+
+def run_size(size, args, generator):
+    """Benchmark one tree size; returns {stage: metrics}"""
+    results = {}
+    root = tempfile.mkdtemp(prefix=f"pbxbench-{size}-", dir=args.workdir)
+    cwd = os.getcwd()
+    try:
+        make_tree(root, size, args.depth, args.fanout)
+        os.chdir(root)
+        for stage in build_stages(generator, args.changes):
+            metrics = measure_stage(stage, args.repeat)
+            metrics['files_per_sec'] = size / metrics['seconds'] if metrics['seconds'] else None
+            results[stage.name] = metrics
+            print(f"{size:>8} {stage.name:<13} {metrics['seconds'] * 1000:10.1f} ms"
+                  f" {metrics['peak_bytes'] / 1e6:9.1f} MB")
+    finally:
+        os.chdir(cwd)
+        if not args.keep:
+            shutil.rmtree(root, ignore_errors=True)
+    return results
+
+
+def regressions(results, baseline, threshold):
+    """Return (size, stage, old, new) for every throughput drop beyond threshold percent"""
+    found = []
+    for size, stages in results.items():
+        for name, metrics in stages.items():
+            old = baseline.get(size, {}).get(name, {}).get('files_per_sec')
+            new = metrics.get('files_per_sec')
+            if old and new and new < old * (1 - threshold / 100):
+                found.append((size, name, old, new))
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark project generation on synthetic trees")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, metavar="N",
+                        help="number of Swift files per tree (default: 1000 10000 100000)")
+    parser.add_argument("--depth", type=int, default=3, help="directory nesting below each top-level folder")
+    parser.add_argument("--fanout", type=int, default=4, help="subdirectories per directory")
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per stage; the best is kept")
+    parser.add_argument("--changes", type=int, default=10,
+                        help="files added/removed by the incremental and updater stages")
+    parser.add_argument("--output", default="benchmark_results.json", help="where to write the JSON results")
+    parser.add_argument("--baseline", help="earlier results to compare against")
+    parser.add_argument("--threshold", type=float, default=10.0, metavar="PERCENT",
+                        help="allowed throughput drop against --baseline (default: 10)")
+    parser.add_argument("--workdir", help="directory for the scratch trees (default: system temp)")
+    parser.add_argument("--keep", action="store_true", help="leave the scratch trees behind")
+    args = parser.parse_args()
+
+    generator = load_generator()
+    results = {}
+    for size in args.sizes:
+        results[str(size)] = run_size(size, args, generator)
+
+    report = {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'depth': args.depth,
+        'fanout': args.fanout,
+        'repeat': args.repeat,
+        'results': results,
+    }
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+    print(f"Results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f).get('results', {})
+        found = regressions(results, baseline, args.threshold)
+        for size, name, old, new in found:
+            print(f"❌ {name} at {size} files: {new:,.0f} files/s, was {old:,.0f} "
+                  f"({(1 - new / old) * 100:.1f}% slower)")
+        if found:
+            sys.exit(1)
+        print(f"✅ No stage regressed by more than {args.threshold:g}%")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Check an Xcode project for dangling references and orphaned objects
+
+Every reference is resolved against the object index and everything
+reachable from rootObject is marked, in time linear in the size of the
+project. Exits with status 1 while problems remain. With --fix, build
+configurations a configuration list lost track of are relinked, dangling
+list entries, build files of missing files and all other unreachable
+objects are removed, and the project is saved if that changed anything.
+"""
+
+import argparse
+import os
+from collections import Counter
+
+from pbxtools.check import check, fix, relink_configurations
+from pbxtools.lock import project_lock
+from pbxtools.pbxproj import Project
+
+DEFAULT_PROJECT = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                               'TripBroComplete', 'TripBro.xcodeproj')
+
+def main():
+    parser = argparse.ArgumentParser(description="Validate the object graph of an Xcode project")
+    parser.add_argument("project", nargs="?", default=DEFAULT_PROJECT,
+                        help="path to the .xcodeproj or its project.pbxproj "
+                             "(default: TripBroComplete/TripBro.xcodeproj)")
+    parser.add_argument("--fix", action="store_true",
+                        help="remove dangling list entries and unreachable objects, then save")
+    parser.add_argument("--limit", type=int, default=50, metavar="N",
+                        help="print at most N issues (default: 50, 0 for all)")
+    args = parser.parse_args()
+
+    pbxproj = args.project
+    if os.path.isdir(pbxproj):
+        pbxproj = os.path.join(pbxproj, 'project.pbxproj')
+
+    with project_lock(pbxproj):
+        project = Project.load(pbxproj)
+        if args.fix:
+            relinked = relink_configurations(project)
+            removed = fix(project)
+            issues, _ = check(project)
+            if project.save(pbxproj):
+                if relinked:
+                    print(f"🔗 Relinked {relinked} build configurations to their configuration lists")
+                print(f"🧹 Removed {removed} unreachable objects and saved {pbxproj}")
+        else:
+            issues, _ = check(project)
+
+    if not issues:
+        print(f"✅ {len(project.objects)} objects, every reference resolves, nothing orphaned")
+        return
+    shown = issues if args.limit <= 0 else issues[:args.limit]
+    for issue in shown:
+        print(f"  {issue}")
+    if len(shown) < len(issues):
+        print(f"  … and {len(issues) - len(shown)} more")
+    counts = Counter(issue.kind for issue in issues)
+    print("❌ " + ', '.join(f"{count} {kind}" for kind, count in sorted(counts.items())))
+    raise SystemExit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Convert project.pbxproj to JSON and back
+
+`to-json` writes the project's object graph plus the formatting needed to
+restore it (see pbxtools.pbxjson); `from-json` turns such a document, as
+edited by any JSON tool, back into project.pbxproj. Converting a project
+to JSON and back reproduces it byte for byte. The project is parsed from a
+memory map in one pass and the JSON is streamed out as it is encoded.
+"""
+
+import argparse
+import json
+import os
+import sys
+from itertools import chain
+
+from pbxtools.lock import project_lock
+from pbxtools.pbxjson import from_json, iter_json
+from pbxtools.pbxproj import Project
+from pbxtools.writer import write_stream
+
+def pbxproj_path(path):
+    """Accept either a .xcodeproj directory or the project.pbxproj inside it"""
+    return os.path.join(path, 'project.pbxproj') if os.path.isdir(path) else path
+
+def emit(chunks, output):
+    """Write chunks to output, or to stdout for '-'; returns True if output changed"""
+    if output == '-':
+        for chunk in chunks:
+            sys.stdout.write(chunk)
+        return True
+    return write_stream(output, chunks)
+
+def to_json_command(args):
+    with project_lock(args.project):
+        project = Project.load(args.project)
+    emit(chain(iter_json(project, trivia=not args.no_trivia), '\n'), args.output)
+
+def from_json_command(args):
+    try:
+        if args.json == '-':
+            document = json.load(sys.stdin)
+        else:
+            with open(args.json, 'r', encoding='utf-8') as f:
+                document = json.load(f)
+        project = from_json(document)
+    except ValueError as e:
+        raise SystemExit(f"{args.json}: {e}")
+    if args.output == '-':
+        emit(project.iter_chunks(), '-')
+        return
+    with project_lock(args.output):
+        if project.save(args.output):
+            print(f"✅ Wrote {args.output}")
+        else:
+            print(f"✅ {args.output} already matches; left untouched")
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert an Xcode project to JSON and back")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    to_json = commands.add_parser("to-json", help="write project.pbxproj as JSON")
+    to_json.add_argument("project", help="path to the .xcodeproj or its project.pbxproj")
+    to_json.add_argument("-o", "--output", default="-", help="JSON file to write (default: stdout)")
+    to_json.add_argument("--no-trivia", action="store_true",
+                         help="write only the object graph; from-json then lays the project out afresh")
+    to_json.set_defaults(run=to_json_command)
+
+    from_json = commands.add_parser("from-json", help="write project.pbxproj from JSON")
+    from_json.add_argument("json", help="JSON document written by to-json, or - for stdin")
+    from_json.add_argument("-o", "--output", default="-",
+                           help="the .xcodeproj or project.pbxproj to write (default: stdout)")
+    from_json.set_defaults(run=from_json_command)
+
+    args = parser.parse_args()
+    if args.command == 'to-json':
+        args.project = pbxproj_path(args.project)
+    elif args.output != '-':
+        args.output = pbxproj_path(args.output)
+    args.run(args)
+
+if __name__ == "__main__":
+    main()
@@ -1,408 +1,157 @@
 #!/usr/bin/env python3
 
+import argparse
 import os
-import uuid
-import plistlib
-
-def generate_uuid():
-    """Generate a 24-character hex UUID for Xcode"""
-    return uuid.uuid4().hex[:24].upper()
-
-def create_pbxproj():
+import shutil
+import sys
+
+from pbxtools import profile, targets
+from pbxtools.classify import DEFAULT_CLASSIFIER, Classifier, parse_override
+from pbxtools.ids import IDRegistry, registry_for
+from pbxtools.lock import project_lock
+from pbxtools.mirror import mirror
+from pbxtools.settings import XCCONFIG_DIR, write_xcconfigs
+from pbxtools.writer import write_stream
+
+# --exit-code: status when project.pbxproj was left as it was
+UNCHANGED_EXIT_STATUS = 3
+
+# Checkout whose TripBro/, TripBroTests/ and TripBroUITests/ are mirrored into TripBroFinal/
+SOURCE_ENV = "TRIPBRO_SOURCE"
+OUTPUT_DIR = "TripBroFinal"
+# --profile: report and trace are written to PREFIX.json and PREFIX.trace.json, in the current directory
+PROFILE_PREFIX = "TripBroFinal.profile"
+
+def collect_sources(registry, low_memory=False, paths=None, classifier=DEFAULT_CLASSIFIER):
+    """Assign IDs to the given files, or to everything under the targets' source roots.
+
+    Paths are relative to the project directory; TripBro/ feeds the app,
+    TripBroTests/ and TripBroUITests/ the test targets when they exist.
+    classifier decides which files belong and in which build phase.
+    """
+    return targets.collect_sources(registry, targets.active_targets(), paths, low_memory, classifier)
+
+def iter_pbxproj(sources, registry, xcconfig=False):
+    """Yield project.pbxproj one section at a time for the collected sources.
+
+    With xcconfig the build settings live in Configs/*.xcconfig (see
+    write_pbxproj) and the configurations only reference them.
+    """
+    return targets.iter_project(sources, registry, xcconfig)
+
+def create_pbxproj(xcconfig=False):
     """Generate a complete project.pbxproj with all source files"""
-
-    # Get all Swift files
-    swift_files = []
-    for root, dirs, files in os.walk('TripBro'):
-        for file in files:
-            if file.endswith('.swift'):
-                path = os.path.join(root, file)
-                swift_files.append(path)
-
-    # Generate UUIDs for everything
-    project_uuid = generate_uuid()
-    target_uuid = generate_uuid()
-    sources_phase_uuid = generate_uuid()
-    frameworks_phase_uuid = generate_uuid()
-    resources_phase_uuid = generate_uuid()
-    build_config_debug_uuid = generate_uuid()
-    build_config_release_uuid = generate_uuid()
-    config_list_project_uuid = generate_uuid()
-    config_list_target_uuid = generate_uuid()
-    product_uuid = generate_uuid()
-    main_group_uuid = generate_uuid()
-    products_group_uuid = generate_uuid()
-
-    # File references and build files
-    file_refs = {}
-    build_files = {}
-
-    for swift_file in swift_files:
-        file_uuid = generate_uuid()
-        build_uuid = generate_uuid()
-        file_refs[swift_file] = file_uuid
-        build_files[swift_file] = build_uuid
-
-    # Generate the project file content
-    content = f"""// !$*UTF8*$!
-{{
-	archiveVersion = 1;
-	classes = {{}};
-	objectVersion = 56;
-	objects = {{
-
-/* Begin PBXBuildFile section */"""
-
-    # Add build files
-    for path, build_uuid in build_files.items():
-        file_uuid = file_refs[path]
-        filename = os.path.basename(path)
-        content += f"""
-		{build_uuid} /* {filename} in Sources */ = {{isa = PBXBuildFile; fileRef = {file_uuid} /* {filename} */; }};"""
-
-    content += """
-/* End PBXBuildFile section */
-
-/* Begin PBXFileReference section */"""
-
-    # Add file references
-    content += f"""
-		{product_uuid} /* TripBro.app */ = {{isa = PBXFileReference; explicitFileType = wrapper.application; includeInIndex = 0; path = TripBro.app; sourceTree = BUILT_PRODUCTS_DIR; }};"""
-
-    for path, file_uuid in file_refs.items():
-        filename = os.path.basename(path)
-        content += f"""
-		{file_uuid} /* {filename} */ = {{isa = PBXFileReference; lastKnownFileType = sourcecode.swift; path = "{path.replace('TripBro/', '')}"; sourceTree = "<group>"; }};"""
-
-    content += f"""
-/* End PBXFileReference section */
-
-/* Begin PBXFrameworksBuildPhase section */
-		{frameworks_phase_uuid} /* Frameworks */ = {{
-			isa = PBXFrameworksBuildPhase;
-			buildActionMask = 2147483647;
-			files = (
-			);
-			runOnlyForDeploymentPostprocessing = 0;
-		}};
-/* End PBXFrameworksBuildPhase section */
-
-/* Begin PBXGroup section */
-		{main_group_uuid} = {{
-			isa = PBXGroup;
-			children = (
-				{generate_uuid()} /* TripBro */,
-				{products_group_uuid} /* Products */,
-			);
-			sourceTree = "<group>";
-		}};
-		{products_group_uuid} /* Products */ = {{
-			isa = PBXGroup;
-			children = (
-				{product_uuid} /* TripBro.app */,
-			);
-			name = Products;
-			sourceTree = "<group>";
-		}};
-		{generate_uuid()} /* TripBro */ = {{
-			isa = PBXGroup;
-			children = ("""
-
-    # Add file references to group
-    for path in file_refs.values():
-        content += f"""
-				{path},"""
-
-    content += f"""
-			);
-			path = TripBro;
-			sourceTree = "<group>";
-		}};
-/* End PBXGroup section */
-
-/* Begin PBXNativeTarget section */
-		{target_uuid} /* TripBro */ = {{
-			isa = PBXNativeTarget;
-			buildConfigurationList = {config_list_target_uuid};
-			buildPhases = (
-				{sources_phase_uuid} /* Sources */,
-				{frameworks_phase_uuid} /* Frameworks */,
-				{resources_phase_uuid} /* Resources */,
-			);
-			buildRules = (
-			);
-			dependencies = (
-			);
-			name = TripBro;
-			productName = TripBro;
-			productReference = {product_uuid} /* TripBro.app */;
-			productType = "com.apple.product-type.application";
-		}};
-/* End PBXNativeTarget section */
-
-/* Begin PBXProject section */
-		{project_uuid} /* Project object */ = {{
-			isa = PBXProject;
-			attributes = {{
-				BuildIndependentTargetsInParallel = 1;
-				LastSwiftUpdateCheck = 1500;
-				LastUpgradeVersion = 1500;
-				TargetAttributes = {{
-					{target_uuid} = {{
-						CreatedOnToolsVersion = 15.0;
-					}};
-				}};
-			}};
-			buildConfigurationList = {config_list_project_uuid};
-			compatibilityVersion = "Xcode 14.0";
-			developmentRegion = en;
-			hasScannedForEncodings = 0;
-			knownRegions = (
-				en,
-				Base,
-			);
-			mainGroup = {main_group_uuid};
-			productRefGroup = {products_group_uuid} /* Products */;
-			projectDirPath = "";
-			projectRoot = "";
-			targets = (
-				{target_uuid} /* TripBro */,
-			);
-		}};
-/* End PBXProject section */
-
-/* Begin PBXResourcesBuildPhase section */
-		{resources_phase_uuid} /* Resources */ = {{
-			isa = PBXResourcesBuildPhase;
-			buildActionMask = 2147483647;
-			files = (
-			);
-			runOnlyForDeploymentPostprocessing = 0;
-		}};
-/* End PBXResourcesBuildPhase section */
-
-/* Begin PBXSourcesBuildPhase section */
-		{sources_phase_uuid} /* Sources */ = {{
-			isa = PBXSourcesBuildPhase;
-			buildActionMask = 2147483647;
-			files = ("""
-
-    # Add all source files to compile
-    for path, build_uuid in build_files.items():
-        filename = os.path.basename(path)
-        content += f"""
-				{build_uuid} /* {filename} in Sources */,"""
-
-    content += f"""
-			);
-			runOnlyForDeploymentPostprocessing = 0;
-		}};
-/* End PBXSourcesBuildPhase section */
-
-/* Begin XCBuildConfiguration section */
-		{build_config_debug_uuid} /* Debug */ = {{
-			isa = XCBuildConfiguration;
-			buildSettings = {{
-				ALWAYS_SEARCH_USER_PATHS = NO;
-				ASSETCATALOG_COMPILER_GENERATE_SWIFT_ASSET_SYMBOL_EXTENSIONS = YES;
-				CLANG_ANALYZER_NONNULL = YES;
-				CLANG_ANALYZER_NUMBER_OBJECT_CONVERSION = YES_AGGRESSIVE;
-				CLANG_CXX_LANGUAGE_STANDARD = "gnu++20";
-				CLANG_ENABLE_MODULES = YES;
-				CLANG_ENABLE_OBJC_ARC = YES;
-				CLANG_ENABLE_OBJC_WEAK = YES;
-				CLANG_WARN_BLOCK_CAPTURE_AUTORELEASING = YES;
-				CLANG_WARN_BOOL_CONVERSION = YES;
-				CLANG_WARN_COMMA = YES;
-				CLANG_WARN_CONSTANT_CONVERSION = YES;
-				CLANG_WARN_DEPRECATED_OBJC_IMPLEMENTATIONS = YES;
-				CLANG_WARN_DIRECT_OBJC_ISA_USAGE = YES_ERROR;
-				CLANG_WARN_DOCUMENTATION_COMMENTS = YES;
-				CLANG_WARN_EMPTY_BODY = YES;
-				CLANG_WARN_ENUM_CONVERSION = YES;
-				CLANG_WARN_INFINITE_RECURSION = YES;
-				CLANG_WARN_INT_CONVERSION = YES;
-				CLANG_WARN_NON_LITERAL_NULL_CONVERSION = YES;
-				CLANG_WARN_OBJC_IMPLICIT_RETAIN_SELF = YES;
-				CLANG_WARN_OBJC_LITERAL_CONVERSION = YES;
-				CLANG_WARN_OBJC_ROOT_CLASS = YES_ERROR;
-				CLANG_WARN_QUOTED_INCLUDE_IN_FRAMEWORK_HEADER = YES;
-				CLANG_WARN_RANGE_LOOP_ANALYSIS = YES;
-				CLANG_WARN_STRICT_PROTOTYPES = YES;
-				CLANG_WARN_SUSPICIOUS_MOVE = YES;
-				CLANG_WARN_UNGUARDED_AVAILABILITY = YES_AGGRESSIVE;
-				CLANG_WARN_UNREACHABLE_CODE = YES;
-				CLANG_WARN__DUPLICATE_METHOD_MATCH = YES;
-				COPY_PHASE_STRIP = NO;
-				DEBUG_INFORMATION_FORMAT = dwarf;
-				ENABLE_STRICT_OBJC_MSGSEND = YES;
-				ENABLE_TESTABILITY = YES;
-				GCC_C_LANGUAGE_STANDARD = gnu17;
-				GCC_DYNAMIC_NO_PIC = NO;
-				GCC_NO_COMMON_BLOCKS = YES;
-				GCC_OPTIMIZATION_LEVEL = 0;
-				GCC_PREPROCESSOR_DEFINITIONS = (
-					"DEBUG=1",
-					"$(inherited)",
-				);
-				GCC_WARN_64_TO_32_BIT_CONVERSION = YES;
-				GCC_WARN_ABOUT_RETURN_TYPE = YES_ERROR;
-				GCC_WARN_UNDECLARED_SELECTOR = YES;
-				GCC_WARN_UNINITIALIZED_AUTOS = YES_AGGRESSIVE;
-				GCC_WARN_UNUSED_FUNCTION = YES;
-				GCC_WARN_UNUSED_VARIABLE = YES;
-				IPHONEOS_DEPLOYMENT_TARGET = 17.0;
-				LOCALIZATION_PREFERS_STRING_CATALOGS = YES;
-				MTL_ENABLE_DEBUG_INFO = INCLUDE_SOURCE;
-				MTL_FAST_MATH = YES;
-				ONLY_ACTIVE_ARCH = YES;
-				SDKROOT = iphoneos;
-				SWIFT_ACTIVE_COMPILATION_CONDITIONS = "DEBUG $(inherited)";
-				SWIFT_OPTIMIZATION_LEVEL = "-Onone";
-				ASSETCATALOG_COMPILER_APPICON_NAME = AppIcon;
-				ASSETCATALOG_COMPILER_GLOBAL_ACCENT_COLOR_NAME = AccentColor;
-				CODE_SIGN_STYLE = Automatic;
-				CURRENT_PROJECT_VERSION = 1;
-				DEVELOPMENT_ASSET_PATHS = "";
-				ENABLE_PREVIEWS = YES;
-				GENERATE_INFOPLIST_FILE = YES;
-				INFOPLIST_KEY_UIApplicationSceneManifest_Generation = YES;
-				INFOPLIST_KEY_UIApplicationSupportsIndirectInputEvents = YES;
-				INFOPLIST_KEY_UILaunchScreen_Generation = YES;
-				INFOPLIST_KEY_UISupportedInterfaceOrientations_iPad = "UIInterfaceOrientationPortrait UIInterfaceOrientationPortraitUpsideDown UIInterfaceOrientationLandscapeLeft UIInterfaceOrientationLandscapeRight";
-				INFOPLIST_KEY_UISupportedInterfaceOrientations_iPhone = "UIInterfaceOrientationPortrait UIInterfaceOrientationLandscapeLeft UIInterfaceOrientationLandscapeRight";
-				LD_RUNPATH_SEARCH_PATHS = (
-					"$(inherited)",
-					"@executable_path/Frameworks",
-				);
-				MARKETING_VERSION = 1.0;
-				PRODUCT_BUNDLE_IDENTIFIER = com.tripbro.app;
-				PRODUCT_NAME = "$(TARGET_NAME)";
-				SWIFT_EMIT_LOC_STRINGS = YES;
-				SWIFT_VERSION = 5.0;
-				TARGETED_DEVICE_FAMILY = "1,2";
-			}};
-			name = Debug;
-		}};
-		{build_config_release_uuid} /* Release */ = {{
-			isa = XCBuildConfiguration;
-			buildSettings = {{
-				ALWAYS_SEARCH_USER_PATHS = NO;
-				ASSETCATALOG_COMPILER_GENERATE_SWIFT_ASSET_SYMBOL_EXTENSIONS = YES;
-				CLANG_ANALYZER_NONNULL = YES;
-				CLANG_ANALYZER_NUMBER_OBJECT_CONVERSION = YES_AGGRESSIVE;
-				CLANG_CXX_LANGUAGE_STANDARD = "gnu++20";
-				CLANG_ENABLE_MODULES = YES;
-				CLANG_ENABLE_OBJC_ARC = YES;
-				CLANG_ENABLE_OBJC_WEAK = YES;
-				CLANG_WARN_BLOCK_CAPTURE_AUTORELEASING = YES;
-				CLANG_WARN_BOOL_CONVERSION = YES;
-				CLANG_WARN_COMMA = YES;
-				CLANG_WARN_CONSTANT_CONVERSION = YES;
-				CLANG_WARN_DEPRECATED_OBJC_IMPLEMENTATIONS = YES;
-				CLANG_WARN_DIRECT_OBJC_ISA_USAGE = YES_ERROR;
-				CLANG_WARN_DOCUMENTATION_COMMENTS = YES;
-				CLANG_WARN_EMPTY_BODY = YES;
-				CLANG_WARN_ENUM_CONVERSION = YES;
-				CLANG_WARN_INFINITE_RECURSION = YES;
-				CLANG_WARN_INT_CONVERSION = YES;
-				CLANG_WARN_NON_LITERAL_NULL_CONVERSION = YES;
-				CLANG_WARN_OBJC_IMPLICIT_RETAIN_SELF = YES;
-				CLANG_WARN_OBJC_LITERAL_CONVERSION = YES;
-				CLANG_WARN_OBJC_ROOT_CLASS = YES_ERROR;
-				CLANG_WARN_QUOTED_INCLUDE_IN_FRAMEWORK_HEADER = YES;
-				CLANG_WARN_RANGE_LOOP_ANALYSIS = YES;
-				CLANG_WARN_STRICT_PROTOTYPES = YES;
-				CLANG_WARN_SUSPICIOUS_MOVE = YES;
-				CLANG_WARN_UNGUARDED_AVAILABILITY = YES_AGGRESSIVE;
-				CLANG_WARN_UNREACHABLE_CODE = YES;
-				CLANG_WARN__DUPLICATE_METHOD_MATCH = YES;
-				COPY_PHASE_STRIP = NO;
-				DEBUG_INFORMATION_FORMAT = "dwarf-with-dsym";
-				ENABLE_NS_ASSERTIONS = NO;
-				ENABLE_STRICT_OBJC_MSGSEND = YES;
-				GCC_C_LANGUAGE_STANDARD = gnu17;
-				GCC_NO_COMMON_BLOCKS = YES;
-				GCC_WARN_64_TO_32_BIT_CONVERSION = YES;
-				GCC_WARN_ABOUT_RETURN_TYPE = YES_ERROR;
-				GCC_WARN_UNDECLARED_SELECTOR = YES;
-				GCC_WARN_UNINITIALIZED_AUTOS = YES_AGGRESSIVE;
-				GCC_WARN_UNUSED_FUNCTION = YES;
-				GCC_WARN_UNUSED_VARIABLE = YES;
-				IPHONEOS_DEPLOYMENT_TARGET = 17.0;
-				LOCALIZATION_PREFERS_STRING_CATALOGS = YES;
-				MTL_ENABLE_DEBUG_INFO = NO;
-				MTL_FAST_MATH = YES;
-				SDKROOT = iphoneos;
-				SWIFT_COMPILATION_MODE = wholemodule;
-				VALIDATE_PRODUCT = YES;
-				ASSETCATALOG_COMPILER_APPICON_NAME = AppIcon;
-				ASSETCATALOG_COMPILER_GLOBAL_ACCENT_COLOR_NAME = AccentColor;
-				CODE_SIGN_STYLE = Automatic;
-				CURRENT_PROJECT_VERSION = 1;
-				DEVELOPMENT_ASSET_PATHS = "";
-				ENABLE_PREVIEWS = YES;
-				GENERATE_INFOPLIST_FILE = YES;
-				INFOPLIST_KEY_UIApplicationSceneManifest_Generation = YES;
-				INFOPLIST_KEY_UIApplicationSupportsIndirectInputEvents = YES;
-				INFOPLIST_KEY_UILaunchScreen_Generation = YES;
-				INFOPLIST_KEY_UISupportedInterfaceOrientations_iPad = "UIInterfaceOrientationPortrait UIInterfaceOrientationPortraitUpsideDown UIInterfaceOrientationLandscapeLeft UIInterfaceOrientationLandscapeRight";
-				INFOPLIST_KEY_UISupportedInterfaceOrientations_iPhone = "UIInterfaceOrientationPortrait UIInterfaceOrientationLandscapeLeft UIInterfaceOrientationLandscapeRight";
-				LD_RUNPATH_SEARCH_PATHS = (
-					"$(inherited)",
-					"@executable_path/Frameworks",
-				);
-				MARKETING_VERSION = 1.0;
-				PRODUCT_BUNDLE_IDENTIFIER = com.tripbro.app;
-				PRODUCT_NAME = "$(TARGET_NAME)";
-				SWIFT_EMIT_LOC_STRINGS = YES;
-				SWIFT_VERSION = 5.0;
-				TARGETED_DEVICE_FAMILY = "1,2";
-			}};
-			name = Release;
-		}};
-/* End XCBuildConfiguration section */
-
-/* Begin XCConfigurationList section */
-		{config_list_project_uuid} = {{
-			isa = XCConfigurationList;
-			buildConfigurations = (
-				{build_config_debug_uuid} /* Debug */,
-				{build_config_release_uuid} /* Release */,
-			);
-			defaultConfigurationIsVisible = 0;
-			defaultConfigurationName = Release;
-		}};
-		{config_list_target_uuid} = {{
-			isa = XCConfigurationList;
-			buildConfigurations = (
-				{build_config_debug_uuid} /* Debug */,
-				{build_config_release_uuid} /* Release */,
-			);
-			defaultConfigurationIsVisible = 0;
-			defaultConfigurationName = Release;
-		}};
-/* End XCConfigurationList section */
-	}};
-	rootObject = {project_uuid} /* Project object */;
-}}
-"""
-
-    return content
+    registry = IDRegistry()
+    with collect_sources(registry) as sources:
+        return ''.join(iter_pbxproj(sources, registry, xcconfig))
+
+def write_pbxproj(path, low_memory=False, xcconfig=False, classifier=DEFAULT_CLASSIFIER, synchronized=False):
+    """Stream project.pbxproj straight to path, reusing IDs already in it.
+
+    With xcconfig the shared settings are written to Configs/ next to the
+    .xcodeproj as well; with synchronized the source roots become
+    synchronized folders (see targets.iter_synchronized_project). Returns
+    (number of files, whether path was written), the number being that of
+    membership exceptions in synchronized mode; an unchanged project is
+    left untouched. The project lock is held throughout, as by every other
+    tool that rewrites the project.
+    """
+    with project_lock(path):
+        with profile.phase('registry'):
+            registry = registry_for(path)
+        specs = targets.active_targets()
+        if xcconfig:
+            project_root = os.path.dirname(os.path.dirname(os.path.abspath(path)))
+            write_xcconfigs(targets.target_layers(specs), os.path.join(project_root, XCCONFIG_DIR))
+        if synchronized:
+            with profile.phase('scan'):
+                exceptions = targets.membership_exceptions(specs, classifier)
+            with profile.phase('write'):
+                chunks = targets.iter_synchronized_project(specs, registry, exceptions, xcconfig)
+                written = write_stream(path, profile.timed('render', chunks))
+            return sum(map(len, exceptions.values())), written
+        if low_memory:
+            # The scan streams into the ID assignment; 'scan' is its share
+            paths = profile.timed('scan', targets.iter_source_paths(specs, classifier))
+        else:
+            with profile.phase('scan'):
+                paths = targets.scan_sources(specs, classifier=classifier)
+        with profile.phase('ids'):
+            sources = collect_sources(registry, low_memory, paths, classifier)
+        with sources:
+            with profile.phase('write'):
+                written = write_stream(path, profile.timed('render', iter_pbxproj(sources, registry, xcconfig)))
+            return len(sources), written
 
 if __name__ == "__main__":
-    # Copy all the source files from the existing TripBro directory
-    os.system("cp -r /Users/rogerrocha/Developer/Personal/TripBro/.conductor/salvador/TripBro/TripBro TripBroFinal/")
-    os.chdir("TripBroFinal")
-
-    # Create the Xcode project
-    os.makedirs("TripBro.xcodeproj", exist_ok=True)
-
-    # Generate and write the project file
-    pbxproj_content = create_pbxproj()
-    with open("TripBro.xcodeproj/project.pbxproj", "w") as f:
-        f.write(pbxproj_content)
-
-    print("✅ Complete Xcode project generated with ALL source files!")
+    parser = argparse.ArgumentParser(description="Generate the complete TripBro Xcode project")
+    parser.add_argument("--low-memory", action="store_true",
+                        help="spool the source table to disk so memory stays flat")
+    parser.add_argument("--xcconfig", action="store_true",
+                        help="write build settings to Configs/*.xcconfig instead of inline")
+    parser.add_argument("--synchronized", action="store_true",
+                        help="reference the source roots as synchronized folders (objectVersion 77, Xcode 16+) "
+                             "so adding or removing files needs no project change")
+    parser.add_argument("--source", default=os.environ.get(SOURCE_ENV), required=SOURCE_ENV not in os.environ,
+                        help="checkout holding TripBro/ and the test folders to mirror into TripBroFinal/ "
+                             f"(default: ${SOURCE_ENV})")
+    parser.add_argument("--hash", action="store_true",
+                        help="compare mirrored files by content instead of size and mtime")
+    parser.add_argument("--link", action="store_true",
+                        help="hardlink mirrored files instead of copying them where the filesystem allows")
+    parser.add_argument("--file-type", dest="file_types", action="append", default=[],
+                        metavar="PATTERN=TYPE[:PHASE]",
+                        help="classify files matching PATTERN as TYPE, built in PHASE (sources, resources, "
+                             "frameworks or none); PATTERN=- leaves them out. Repeatable, last match wins")
+    parser.add_argument("--exit-code", action="store_true",
+                        help=f"exit with status {UNCHANGED_EXIT_STATUS} when project.pbxproj did not change")
+    parser.add_argument("--profile", nargs="?", const=PROFILE_PREFIX, metavar="PREFIX",
+                        help="time each phase and trace allocations (slower), writing PREFIX.json and a "
+                             f"Chrome trace to PREFIX.trace.json (default prefix: {PROFILE_PREFIX})")
+    args = parser.parse_args()
+    if args.synchronized and args.low_memory:
+        parser.error("--synchronized lists no files and cannot be combined with --low-memory")
+
+    if not os.path.isdir(os.path.join(args.source, 'TripBro')):
+        parser.error(f"{args.source} has no TripBro/ folder to mirror")
+    try:
+        classifier = Classifier([parse_override(text) for text in args.file_types])
+    except ValueError as e:
+        parser.error(str(e))
+
+    if args.profile:
+        # The project is written from inside TripBroFinal/; the profile goes where the user asked
+        profile_prefix = os.path.abspath(args.profile)
+        profile.enable()
+    with profile.phase('total'):
+        # Mirror every target's sources, copying only what changed since the last run
+        with profile.phase('mirror'):
+            for spec in targets.DEFAULT_TARGETS:
+                source, destination = os.path.join(args.source, spec.root), os.path.join(OUTPUT_DIR, spec.root)
+                if os.path.isdir(source):
+                    result = mirror(source, destination, 'hash' if args.hash else 'stat', args.link)
+                    print(f"🔁 {spec.root}/: {result}")
+                elif os.path.isdir(destination):
+                    shutil.rmtree(destination)
+                    print(f"🗑  {spec.root}/: gone from the source, removed")
+        os.chdir(OUTPUT_DIR)
+
+        # Create the Xcode project
+        os.makedirs("TripBro.xcodeproj", exist_ok=True)
+
+        # Generate and write the project file
+        _, written = write_pbxproj("TripBro.xcodeproj/project.pbxproj",
+                                   low_memory=args.low_memory, xcconfig=args.xcconfig, classifier=classifier,
+                                   synchronized=args.synchronized)
+    if args.profile:
+        print(profile.finish(profile_prefix).summary())
+        print(f"📊 Profile written to {profile_prefix}.json and {profile_prefix}.trace.json")
+
+    if written:
+        print("✅ Complete Xcode project generated with ALL source files!")
+    else:
+        print("✅ Xcode project already up to date; project.pbxproj left untouched")
     print("📂 Project location: TripBroFinal/TripBro.xcodeproj")
-    print("🚀 Open in Xcode and hit Run!")
\ No newline at end of file
+    print("🚀 Open in Xcode and hit Run!")
+    if args.exit_code and not written:
+        sys.exit(UNCHANGED_EXIT_STATUS)
\ No newline at end of file
@@ -0,0 +1,3 @@
+"""
+Shared helpers for generating and updating the TripBro Xcode project
+"""
@@ -0,0 +1,234 @@
+"""
+Swift compile-time hotspots from xcodebuild logs
+
+A build of the CompileTiming configuration (see settings.configurations_for)
+makes the Swift frontend print one line per type-checked function body,
+
+    12.34ms\t/path/Sources/Trip.swift:42:10\tinstance method total()
+
+and a warning for every body over the threshold,
+
+    /path/Sources/Trip.swift:42:10: warning: instance method 'total()' took 123ms
+    to type-check (limit: 100ms)
+
+CompileTimes reads such a log line by line, from a file, a gzipped file or
+stdin, keeping one number per function body, so memory grows with the
+code base rather than the length of the log. A body type-checked more
+than once (one frontend job per architecture) counts at its slowest; a
+file's time is the sum over its functions.
+
+History keeps the totals of earlier runs in a JSON file so a report can
+show how each file and function moved since the last run and over the
+last few.
+"""
+
+import gzip
+import json
+import os
+import re
+import sys
+import time
+
+VERSION = 1
+# Runs kept in the history, and functions recorded per run
+HISTORY_RUNS = 20
+HISTORY_FUNCTIONS = 500
+
+_BODY = re.compile(r'(\d+(?:\.\d+)?)ms\t([^\t\n]+?):(\d+):(\d+)\t([^\t\n]*)')
+_WARNING = re.compile(r'([^\s:][^:\n]*\.swift):(\d+):(\d+): warning: .+? took (\d+)ms to type-check')
+
+
+def open_log(path):
+    """Open a log as text: '-' is stdin, a .gz suffix is decompressed"""
+    if path == '-':
+        return sys.stdin
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rt', encoding='utf-8', errors='replace')
+    return open(path, 'r', encoding='utf-8', errors='replace')
+
+
+class CompileTimes:
+    """Slowest type-check time per function body, and the bodies the compiler warned about.
+
+    functions maps (path, line, column, name) to milliseconds; warnings
+    maps (path, line, column) to the milliseconds the warning reported,
+    since a warning quotes the name differently.
+    """
+
+    def __init__(self):
+        self.functions = {}
+        self.warnings = {}
+        self.lines = 0
+
+    def feed(self, lines):
+        """Add the timings found in an iterable of log lines"""
+        functions, warnings = self.functions, self.warnings
+        for text in lines:
+            self.lines += 1
+            if 'ms' not in text:
+                continue
+            for ms, path, line, column, name in _BODY.findall(text):
+                key = (path, int(line), int(column), name.strip())
+                ms = float(ms)
+                if ms > functions.get(key, -1.0):
+                    functions[key] = ms
+            if 'warning:' in text:
+                for path, line, column, ms in _WARNING.findall(text):
+                    key = (path, int(line), int(column))
+                    warnings[key] = max(warnings.get(key, 0.0), float(ms))
+        return self
+
+    def read(self, path):
+        """Add the timings in the log at path ('-' for stdin)"""
+        f = open_log(path)
+        try:
+            return self.feed(f)
+        finally:
+            if f is not sys.stdin:
+                f.close()
+
+    def relative_to(self, root):
+        """Return a copy with paths below root made relative to it"""
+        root = os.path.abspath(root)
+        result = CompileTimes()
+        result.lines = self.lines
+        for source, target in ((self.functions, result.functions), (self.warnings, result.warnings)):
+            for (path, *rest), ms in source.items():
+                if os.path.isabs(path) and path.startswith(root + os.sep):
+                    path = os.path.relpath(path, root)
+                key = (path, *rest)
+                target[key] = max(target.get(key, 0.0), ms)
+        return result
+
+    def common_root(self):
+        """Return the directory all absolute paths share, or None"""
+        paths = [path for path, _, _, _ in self.functions if os.path.isabs(path)]
+        if not paths:
+            return None
+        return os.path.dirname(os.path.commonprefix(paths)) or None
+
+    def files(self):
+        """Return {path: [total ms, functions]}"""
+        result = {}
+        for (path, _, _, _), ms in self.functions.items():
+            entry = result.setdefault(path, [0.0, 0])
+            entry[0] += ms
+            entry[1] += 1
+        return result
+
+    def total(self):
+        """Return the milliseconds spent type-checking all function bodies"""
+        return sum(self.functions.values())
+
+
+def function_key(path, line, column, name):
+    """The history's name for a function body"""
+    return f"{path}:{line}:{column}\t{name}"
+
+
+class History:
+    """Earlier runs: a list of {label, time, total_ms, files: {path: ms}, functions: {key: ms}}"""
+
+    def __init__(self, path, runs=None):
+        self.path = path
+        self.runs = runs if runs is not None else []
+
+    @classmethod
+    def load(cls, path):
+        """Read the history at path; a missing or unreadable one loads empty"""
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return cls(path)
+        if not isinstance(data, dict) or data.get('version') != VERSION:
+            return cls(path)
+        return cls(path, data.get('runs', []))
+
+    def save(self):
+        """Write the history atomically"""
+        tmp = f"{self.path}.tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump({'version': VERSION, 'runs': self.runs}, f, separators=(',', ':'))
+        os.replace(tmp, self.path)
+
+    def record(self, times, label=None, keep=HISTORY_RUNS):
+        """Append a run, keeping its slowest functions and the last `keep` runs"""
+        slowest = sorted(times.functions.items(), key=lambda item: -item[1])[:HISTORY_FUNCTIONS]
+        self.runs.append({
+            'label': label or time.strftime('%Y-%m-%d %H:%M:%S'),
+            'time': time.time(),
+            'total_ms': round(times.total(), 2),
+            'files': {path: round(ms, 2) for path, (ms, _) in times.files().items()},
+            'functions': {function_key(*key): ms for key, ms in slowest},
+        })
+        del self.runs[:-keep]
+
+
+def _trend(history, kind, key, ms, depth):
+    """Return (ms minus the previous run's, or None if it had none; the last `depth` values, oldest first)"""
+    series = [run[kind].get(key) for run in history[-(depth - 1):]] if depth > 1 else []
+    previous = history[-1][kind].get(key) if history else None
+    return (None if previous is None else round(ms - previous, 2)), series + [round(ms, 2)]
+
+
+def report(times, top=20, history=(), label=None, depth=5):
+    """Return the ranked report for times as plain data.
+
+    history holds earlier runs (History.runs, oldest first); each file and
+    function gets its change since the last of them and its values over
+    the last `depth` runs, this one included (None where a run lacks it).
+    """
+    history = list(history)
+    files = sorted(times.files().items(), key=lambda item: (-item[1][0], item[0]))[:top]
+    functions = sorted(times.functions.items(), key=lambda item: (-item[1], item[0]))[:top]
+    result = {'label': label, 'lines': times.lines, 'total_ms': round(times.total(), 2),
+              'functions_timed': len(times.functions), 'warnings': len(times.warnings),
+              'previous_total_ms': history[-1]['total_ms'] if history else None,
+              'files': [], 'functions': []}
+    for path, (ms, count) in files:
+        delta, series = _trend(history, 'files', path, ms, depth)
+        result['files'].append({'path': path, 'ms': round(ms, 2), 'functions': count,
+                                'delta_ms': delta, 'trend': series})
+    for key, ms in functions:
+        path, line, column, name = key
+        delta, series = _trend(history, 'functions', function_key(*key), ms, depth)
+        result['functions'].append({'path': path, 'line': line, 'column': column, 'name': name,
+                                    'ms': round(ms, 2), 'warned': key[:3] in times.warnings,
+                                    'delta_ms': delta, 'trend': series})
+    return result
+
+
+def _delta(delta):
+    if delta is None:
+        return 'new'
+    return f"{delta:+.1f}ms" if delta else '='
+
+
+def _series(trend):
+    return ' → '.join('-' if ms is None else f"{ms:.0f}" for ms in trend)
+
+
+def format_report(data):
+    """Render report() output as text"""
+    lines = [f"Compile-time report{' ' + data['label'] if data['label'] else ''}: "
+             f"{data['functions_timed']} function bodies, {data['total_ms'] / 1000:.2f}s type-checking, "
+             f"{data['warnings']} over the limit"]
+    if data['previous_total_ms'] is not None:
+        lines[0] += f" ({data['total_ms'] - data['previous_total_ms']:+.0f}ms since the last run)"
+    if not data['functions_timed']:
+        lines.append("No function body timings found; was the log built with -debug-time-function-bodies?")
+        return '\n'.join(lines)
+    lines.append("")
+    lines.append("Slowest files")
+    for rank, entry in enumerate(data['files'], 1):
+        lines.append(f"{rank:4}. {entry['ms']:10.1f}ms  {_delta(entry['delta_ms']):>10}  "
+                     f"{entry['path']} ({entry['functions']} functions)  [{_series(entry['trend'])}]")
+    lines.append("")
+    lines.append("Slowest functions")
+    for rank, entry in enumerate(data['functions'], 1):
+        mark = '⚠️ ' if entry['warned'] else ''
+        lines.append(f"{rank:4}. {entry['ms']:10.1f}ms  {_delta(entry['delta_ms']):>10}  "
+                     f"{mark}{entry['path']}:{entry['line']}:{entry['column']} {entry['name']}  "
+                     f"[{_series(entry['trend'])}]")
+    return '\n'.join(lines)
@@ -0,0 +1,271 @@
+"""
+Structural integrity checks for a parsed project.pbxproj
+
+check() visits every object once. It resolves each reference through the
+objects index, which is a dict, so the whole pass is O(objects +
+references). It reports dangling references, references to the wrong kind
+of object, objects missing an isa and configuration lists that are empty
+or whose default names none of their configurations, then marks
+everything reachable from rootObject; whatever is left unmarked is an
+orphan. fix() removes dangling
+entries from lists, drops build files whose file is gone and sweeps the
+orphans, so a project can be repaired in place and saved. Build
+configurations are never swept while a configuration list has lost some:
+relink_configurations() first puts them back where their names say they
+belong.
+"""
+
+import re
+
+from .pbxproj import PBXArray, PBXDict
+
+# Keys whose values are object IDs (a single ID or a list of them)
+REFERENCE_KEYS = frozenset({
+    'baseConfigurationReference', 'buildConfigurationList', 'buildConfigurations', 'buildPhases',
+    'buildRules', 'children', 'containerPortal', 'dependencies', 'exceptions', 'fileRef', 'files',
+    'fileSystemSynchronizedGroups', 'mainGroup', 'package', 'packageProductDependencies',
+    'packageReferences', 'ProductGroup', 'productRef', 'productRefGroup', 'productReference',
+    'ProjectRef', 'remoteRef', 'target', 'targetProxy', 'targets', 'TestTargetID',
+})
+
+_FILES = frozenset({'PBXFileReference', 'PBXVariantGroup', 'XCVersionGroup', 'PBXReferenceProxy',
+                    'PBXGroup', 'PBXFileSystemSynchronizedRootGroup'})
+_TARGETS = frozenset({'PBXNativeTarget', 'PBXAggregateTarget', 'PBXLegacyTarget'})
+
+# What a reference under these keys must point at
+EXPECTED_ISA = {
+    'baseConfigurationReference': _FILES,
+    'buildConfigurationList': frozenset({'XCConfigurationList'}),
+    'buildConfigurations': frozenset({'XCBuildConfiguration'}),
+    'children': _FILES,
+    'dependencies': frozenset({'PBXTargetDependency'}),
+    'fileRef': _FILES,
+    'files': frozenset({'PBXBuildFile'}),
+    'mainGroup': frozenset({'PBXGroup'}),
+    'productRefGroup': frozenset({'PBXGroup'}),
+    'productReference': _FILES,
+    'target': _TARGETS,
+    'targetProxy': frozenset({'PBXContainerItemProxy'}),
+    'targets': _TARGETS,
+}
+
+# Subtrees that never hold references; skipping them keeps big settings cheap
+_OPAQUE_KEYS = frozenset({'buildSettings'})
+
+# The annotation Xcode writes after a reference, e.g. `/* Debug */`
+_COMMENT = re.compile(r'/\*\s*(.*?)\s*\*/')
+
+
+class Issue:
+    """One problem found by check()"""
+
+    __slots__ = ('kind', 'uuid', 'key', 'ref', 'detail')
+
+    def __init__(self, kind, uuid, key=None, ref=None, detail=None):
+        self.kind = kind
+        self.uuid = uuid
+        self.key = key
+        self.ref = ref
+        self.detail = detail
+
+    def __str__(self):
+        if self.kind == 'dangling':
+            return f"{self.uuid}.{self.key} -> {self.ref}: no such object"
+        if self.kind == 'wrong-isa':
+            return f"{self.uuid}.{self.key} -> {self.ref}: {self.detail}"
+        if self.kind == 'orphan':
+            return f"{self.uuid}: {self.detail or 'object'} unreachable from rootObject"
+        if self.kind == 'config-list':
+            return f"{self.uuid}: {self.detail}"
+        return f"{self.uuid}: object has no isa"
+
+
+def iter_references(obj):
+    """Yield (key, uuid) for every object ID held by obj, nested dicts included"""
+    stack = [obj]
+    while stack:
+        node = stack.pop()
+        for key, value in node.items():
+            if key in _OPAQUE_KEYS:
+                continue
+            if key == 'TargetAttributes' and isinstance(value, PBXDict):
+                for target_uuid, attributes in value.items():
+                    yield key, target_uuid
+                    if isinstance(attributes, PBXDict):
+                        stack.append(attributes)
+                continue
+            if key in REFERENCE_KEYS:
+                if isinstance(value, str):
+                    yield key, value
+                elif isinstance(value, PBXArray):
+                    for item in value:
+                        if isinstance(item, str):
+                            yield key, item
+                continue
+            if isinstance(value, PBXDict):
+                stack.append(value)
+            elif isinstance(value, PBXArray):
+                # e.g. projectReferences: a list of {ProductGroup, ProjectRef}
+                stack.extend(item for item in value if isinstance(item, PBXDict))
+
+
+def check(project):
+    """Return (issues, reachable uuids) for a parsed Project"""
+    objects = project.objects
+    issues = []
+    # uuid -> IDs it references, so marking does not walk the objects again
+    edges = {}
+    for uuid, obj in objects.items():
+        if not isinstance(obj, PBXDict) or obj.get('isa') is None:
+            issues.append(Issue('no-isa', uuid))
+            continue
+        refs = edges[uuid] = []
+        for key, ref in iter_references(obj):
+            refs.append(ref)
+            target = objects.get(ref)
+            if target is None:
+                issues.append(Issue('dangling', uuid, key, ref))
+                continue
+            expected = EXPECTED_ISA.get(key)
+            found = target.get('isa') if isinstance(target, PBXDict) else None
+            if expected is not None and found not in expected:
+                issues.append(Issue('wrong-isa', uuid, key, ref,
+                                    f"{found} where {' or '.join(sorted(expected))} belongs"))
+
+    root = project.root.get('rootObject')
+    # Proxies into other projects name IDs that only exist over there
+    for uuid, proxy in project.objects_of('PBXContainerItemProxy').items():
+        remote = proxy.get('remoteGlobalIDString')
+        if proxy.get('containerPortal') == root and remote not in objects:
+            issues.append(Issue('dangling', uuid, 'remoteGlobalIDString', remote))
+    if root not in objects:
+        issues.append(Issue('dangling', '(document)', 'rootObject', root))
+    for uuid, config_list in project.objects_of('XCConfigurationList').items():
+        configs = config_list.get('buildConfigurations')
+        default = config_list.get('defaultConfigurationName')
+        if not configs:
+            issues.append(Issue('config-list', uuid, detail="configuration list has no buildConfigurations"))
+        elif default is not None and default not in {objects[ref].get('name') for ref in configs
+                                                     if isinstance(objects.get(ref), PBXDict)}:
+            issues.append(Issue('config-list', uuid,
+                                detail=f"defaultConfigurationName {default} names no listed configuration"))
+    reachable = mark(project, edges=edges)
+    for uuid, obj in objects.items():
+        if uuid not in reachable:
+            issues.append(Issue('orphan', uuid, detail=obj.get('isa') if isinstance(obj, PBXDict) else None))
+    return issues, reachable
+
+
+def mark(project, skip=frozenset(), edges=None):
+    """Return the set of object IDs reachable from rootObject, never entering skip.
+
+    edges ({uuid: referenced IDs}) saves re-reading the objects when the
+    caller already collected them.
+    """
+    objects = project.objects
+    root = project.root.get('rootObject')
+    if root not in objects:
+        return set()
+    reachable = {root}
+    stack = [root]
+    while stack:
+        uuid = stack.pop()
+        if edges is not None:
+            refs = edges.get(uuid, ())
+        else:
+            obj = objects.get(uuid)
+            refs = (ref for _, ref in iter_references(obj)) if isinstance(obj, PBXDict) else ()
+        for ref in refs:
+            if ref not in reachable and ref not in skip and ref in objects:
+                reachable.add(ref)
+                stack.append(ref)
+    return reachable
+
+
+def _unlisted_configurations(project):
+    """Return {name: [uuid]} for the XCBuildConfigurations no configuration list holds"""
+    listed = {uuid for config_list in project.objects_of('XCConfigurationList').values()
+              for uuid in config_list.get('buildConfigurations', ())}
+    unlisted = {}
+    for uuid, config in project.objects_of('XCBuildConfiguration').items():
+        if uuid not in listed:
+            unlisted.setdefault(config.get('name'), []).append(uuid)
+    return unlisted
+
+
+def relink_configurations(project):
+    """Point dangling entries of configuration lists back at orphaned configurations.
+
+    A dangling entry takes the unlisted XCBuildConfiguration named by its
+    comment (`/* Debug */`) or, without one, one whose name the list lacks,
+    but only when exactly one configuration fits. Returns the number of
+    entries relinked.
+    """
+    objects = project.objects
+    unlisted = _unlisted_configurations(project)
+    relinked = 0
+    for config_list in project.objects_of('XCConfigurationList').values():
+        configs = config_list.get('buildConfigurations')
+        if not isinstance(configs, PBXArray):
+            continue
+        names = {objects[uuid].get('name') for uuid in configs if isinstance(objects.get(uuid), PBXDict)}
+        for item in configs.items():
+            if item.value in objects:
+                continue
+            comment = _COMMENT.search(item.comma_pre or '')
+            if comment:
+                candidates = unlisted.get(comment.group(1), [])
+            else:
+                candidates = [uuid for name, uuids in unlisted.items() if name not in names for uuid in uuids]
+            if len(candidates) != 1:
+                continue
+            uuid = candidates[0]
+            name = objects[uuid].get('name')
+            unlisted[name].remove(uuid)
+            names.add(name)
+            # A fresh value is annotated anew when written
+            item.value, item.raw, item.comma_pre = uuid, None, None
+            relinked += 1
+    return relinked
+
+
+def fix(project):
+    """Repair what can be repaired in place; returns the number of objects removed.
+
+    Orphaned build configurations are relinked first (see
+    relink_configurations). Dangling IDs are then dropped from lists, build
+    files whose file reference is gone are dropped from their phases, and
+    every object no longer reachable from rootObject is deleted, except
+    build configurations while some configuration list still misses
+    entries: deleting a target's settings is never a repair. Dangling
+    single-valued references (say, a missing buildConfigurationList) cannot
+    be fixed by removal and are left for check() to report.
+    """
+    objects = project.objects
+    if project.root.get('rootObject') not in objects:
+        # Everything would look unreachable
+        return 0
+    relink_configurations(project)
+    kept = set()
+    if any(uuid not in objects for config_list in project.objects_of('XCConfigurationList').values()
+           for uuid in config_list.get('buildConfigurations', ())):
+        kept = {uuid for uuids in _unlisted_configurations(project).values() for uuid in uuids}
+    dead = set()
+    for uuid, obj in objects.items():
+        if isinstance(obj, PBXDict) and obj.get('isa') == 'PBXBuildFile':
+            ref = obj.get('fileRef') or obj.get('productRef')
+            if ref is not None and ref not in objects:
+                dead.add(uuid)
+
+    for obj in objects.values():
+        if not isinstance(obj, PBXDict):
+            continue
+        for key, value in obj.items():
+            if key in REFERENCE_KEYS and isinstance(value, PBXArray):
+                value.remove_all({ref for ref in value if ref not in objects or ref in dead})
+
+    reachable = mark(project, dead)
+    orphans = [uuid for uuid in objects.keys() if uuid not in reachable and uuid not in kept]
+    for uuid in orphans:
+        project.remove_object(uuid)
+    return len(orphans)
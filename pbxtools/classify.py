@@ -0,0 +1,140 @@
+"""
+What each scanned file is and which build phase it belongs in
+
+FILE_TYPES maps a lowercase extension to (lastKnownFileType, phase), where
+phase is SOURCES, RESOURCES, FRAMEWORKS or None for files that only appear
+in their group (headers, xcconfigs, Info.plist). A Classifier resolves a
+path with one dict lookup, after the user's overrides: gitignore-style
+patterns, relative to the project directory, mapped to a (file type,
+phase) of their own or to None to leave matching files out. The last
+matching override wins. Files nothing claims are not part of the project.
+
+Bundle directories such as asset catalogs, .lproj folders and frameworks
+are single entries here: the scanner yields them without entering them
+(see scan.PACKAGE_SUFFIXES). A .lproj folder is copied as a folder
+reference, so its localized files keep their place in the bundle.
+"""
+
+import os
+
+from .scan import IgnoreRules
+
+SOURCES = 'Sources'
+FRAMEWORKS = 'Frameworks'
+RESOURCES = 'Resources'
+# In the order targets list their phases
+PHASES = (SOURCES, FRAMEWORKS, RESOURCES)
+
+FILE_TYPES = {
+    # Compiled
+    '.swift': ('sourcecode.swift', SOURCES),
+    '.m': ('sourcecode.c.objc', SOURCES),
+    '.mm': ('sourcecode.cpp.objcpp', SOURCES),
+    '.c': ('sourcecode.c.c', SOURCES),
+    '.cpp': ('sourcecode.cpp.cpp', SOURCES),
+    '.metal': ('sourcecode.metal', SOURCES),
+    '.mlmodel': ('file.mlmodel', SOURCES),
+    '.intentdefinition': ('file.intentdefinition', SOURCES),
+    '.xcdatamodeld': ('wrapper.xcdatamodeld', SOURCES),
+    # Listed only
+    '.h': ('sourcecode.c.h', None),
+    '.xcconfig': ('text.xcconfig', None),
+    '.entitlements': ('text.plist.entitlements', None),
+    '.md': ('net.daringfireball.markdown', None),
+    # Copied into the bundle
+    '.xcassets': ('folder.assetcatalog', RESOURCES),
+    '.lproj': ('folder', RESOURCES),
+    '.bundle': ('wrapper.plug-in', RESOURCES),
+    '.storyboard': ('file.storyboard', RESOURCES),
+    '.xib': ('file.xib', RESOURCES),
+    '.plist': ('text.plist.xml', RESOURCES),
+    '.strings': ('text.plist.strings', RESOURCES),
+    '.stringsdict': ('text.plist.stringsdict', RESOURCES),
+    '.xcstrings': ('text.json.xcstrings', RESOURCES),
+    '.xcprivacy': ('text.xml', RESOURCES),
+    '.json': ('text.json', RESOURCES),
+    '.txt': ('text', RESOURCES),
+    '.html': ('text.html', RESOURCES),
+    '.png': ('image.png', RESOURCES),
+    '.jpg': ('image.jpeg', RESOURCES),
+    '.jpeg': ('image.jpeg', RESOURCES),
+    '.gif': ('image.gif', RESOURCES),
+    '.pdf': ('image.pdf', RESOURCES),
+    '.ttf': ('file', RESOURCES),
+    '.otf': ('file', RESOURCES),
+    '.mp3': ('audio.mp3', RESOURCES),
+    '.wav': ('audio.wav', RESOURCES),
+    '.mov': ('video.quicktime', RESOURCES),
+    '.mp4': ('video.mpeg4', RESOURCES),
+    # Linked
+    '.framework': ('wrapper.framework', FRAMEWORKS),
+    '.xcframework': ('wrapper.xcframework', FRAMEWORKS),
+    '.a': ('archive.ar', FRAMEWORKS),
+    '.dylib': ('compiled.mach-o.dylib', FRAMEWORKS),
+    '.tbd': ('sourcecode.text-based-dylib-definition', FRAMEWORKS),
+}
+
+# Info.plist is processed through the build settings; copying it is an error
+DEFAULT_OVERRIDES = (('Info.plist', ('text.plist.xml', None)),)
+
+# What an explicitly added file with an unknown extension becomes, as in Xcode
+UNKNOWN = ('file', RESOURCES)
+
+_PHASE_NAMES = {'sources': SOURCES, 'resources': RESOURCES, 'frameworks': FRAMEWORKS, 'none': None}
+
+
+def parse_override(text):
+    """Parse `PATTERN=TYPE[:PHASE]` or `PATTERN=-` into (pattern, kind).
+
+    PHASE is sources, resources, frameworks or none (the default); `-`
+    leaves matching files out. A bare extension such as `.txt` stands for
+    `*.txt`. Raises ValueError on malformed input.
+    """
+    pattern, sep, value = text.partition('=')
+    if not sep or not pattern or not value:
+        raise ValueError(f"{text!r}: expected PATTERN=TYPE[:PHASE] or PATTERN=-")
+    if pattern.startswith('.') and '/' not in pattern:
+        pattern = f"*{pattern}"
+    if value == '-':
+        return pattern, None
+    file_type, _, phase = value.partition(':')
+    if phase.lower() not in _PHASE_NAMES and phase:
+        raise ValueError(f"{text!r}: phase must be one of {', '.join(_PHASE_NAMES)}")
+    return pattern, (file_type, _PHASE_NAMES.get(phase.lower()))
+
+
+class Classifier:
+    """Extension table plus ordered overrides.
+
+    suffixes holds the name endings a scan needs to keep, so everything
+    else is dropped while listing directories; it is None when an override
+    pattern could claim files of any extension. Extensions are matched
+    without regard to case, as Xcode does: Icon.PNG is an image.
+    """
+
+    __slots__ = ('types', 'suffixes', '_overrides')
+
+    def __init__(self, overrides=(), types=FILE_TYPES):
+        self.types = dict(types)
+        overrides = [*DEFAULT_OVERRIDES, *overrides]
+        self._overrides = tuple((IgnoreRules([pattern]), kind) for pattern, kind in reversed(overrides))
+        suffixes = list(self.types)
+        for pattern, kind in overrides:
+            extension = os.path.splitext(pattern)[1].lower()
+            if kind is None:
+                continue
+            if not extension or any(c in extension for c in '*?[\\'):
+                suffixes = None
+                break
+            suffixes.append(extension)
+        self.suffixes = None if suffixes is None else tuple(dict.fromkeys(suffixes))
+
+    def classify(self, path):
+        """Return (lastKnownFileType, phase) for path, or None if it is left out"""
+        for rules, kind in self._overrides:
+            if rules.ignored(path, False):
+                return kind
+        return self.types.get(os.path.splitext(path)[1].lower())
+
+
+DEFAULT_CLASSIFIER = Classifier()
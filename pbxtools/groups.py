@@ -0,0 +1,164 @@
+"""
+Directory-mirroring PBXGroup tree
+
+GroupTrie indexes groups by directory, one node per path component, so
+finding the group for a file, or creating the groups missing on the way to
+it, costs O(depth) no matter how large the project is. iter_groups() fills
+the trie while streaming scan-ordered files and yields the nested groups in
+the same pass; GroupTrie.from_project() rebuilds it from a parsed project
+for incremental updates.
+"""
+
+import os
+
+from .model import Group
+
+
+class GroupNode:
+    __slots__ = ('uuid', 'children')
+
+    def __init__(self, uuid):
+        self.uuid = uuid
+        self.children = {}
+
+
+def _split(dir_path):
+    return dir_path.split('/') if dir_path else []
+
+
+class GroupTrie:
+    """{directory relative to the root group: group UUID}, stored as a trie"""
+
+    __slots__ = ('root',)
+
+    def __init__(self, root_uuid):
+        self.root = GroupNode(root_uuid)
+
+    @classmethod
+    def from_project(cls, project, root_dir=''):
+        """Index the groups of a parsed Project that mirror directories below root_dir.
+
+        Only groups whose path is a single component inside their parent's
+        directory are indexed. Returns None if no group maps to root_dir.
+        """
+        trie = None
+        prefix = f"{root_dir}/" if root_dir else ''
+        for uuid, group, _, dir_path in project.walk_groups():
+            if trie is None:
+                if dir_path == root_dir:
+                    trie = cls(uuid)
+                continue
+            if not dir_path.startswith(prefix) or dir_path == root_dir:
+                continue
+            parent, _, rest = trie.deepest(dir_path[len(prefix):])
+            if rest == [group.get('path')] and group.get('sourceTree') == '<group>':
+                parent.children[rest[0]] = GroupNode(uuid)
+        return trie
+
+    def deepest(self, dir_path):
+        """Return (node, its dir path, missing components) for the longest indexed prefix"""
+        node = self.root
+        parts = _split(dir_path)
+        for i, name in enumerate(parts):
+            child = node.children.get(name)
+            if child is None:
+                return node, '/'.join(parts[:i]), parts[i:]
+            node = child
+        return node, dir_path, []
+
+    def get(self, dir_path):
+        """Return the node for dir_path, or None"""
+        node, _, rest = self.deepest(dir_path)
+        return None if rest else node
+
+    def paths(self):
+        """Return {group UUID: dir path} for every indexed directory, the root included"""
+        result = {}
+        pending = [('', self.root)]
+        while pending:
+            dir_path, node = pending.pop()
+            result[node.uuid] = dir_path
+            pending.extend((f"{dir_path}/{name}" if dir_path else name, child)
+                           for name, child in node.children.items())
+        return result
+
+    def remove(self, dir_path):
+        """Drop dir_path, and everything below it, from the index"""
+        parent = self.get(os.path.dirname(dir_path))
+        if parent is not None:
+            parent.children.pop(os.path.basename(dir_path), None)
+
+
+def _within(dir_path, ancestor):
+    return not ancestor or dir_path == ancestor or dir_path.startswith(ancestor + '/')
+
+
+def iter_groups(trie, files, group_id, root_path=None):
+    """Yield a model Group for every directory of scan-ordered files, deepest first.
+
+    files yields (dir_path, file_reference) pairs in depth-first scan order,
+    with dir_path relative to the trie root. Each directory is added to the
+    trie when first seen, with group_id(dir_path) as its UUID, and its group
+    is yielded as soon as the scan leaves it, so only the groups on the
+    current path are held in memory. The root group, named root_path, comes
+    last.
+    """
+    stack = [('', Group(trie.root.uuid, [], path=root_path), trie.root)]
+    for dir_path, file_ref in files:
+        while len(stack) > 1 and not _within(dir_path, stack[-1][0]):
+            yield stack.pop()[1]
+        top_path, top_group, top_node = stack[-1]
+        for name in _split(dir_path[len(top_path):].lstrip('/')):
+            path = f"{top_path}/{name}" if top_path else name
+            node = top_node.children.get(name)
+            if node is None:
+                node = top_node.children[name] = GroupNode(group_id(path))
+            # The parent only needs a reference; the children stay with the open group
+            top_group.children.append(Group(node.uuid, path=name))
+            top_path, top_group, top_node = path, Group(node.uuid, [], path=name), node
+            stack.append((top_path, top_group, top_node))
+        top_group.children.append(file_ref)
+    while stack:
+        yield stack.pop()[1]
+
+
+def group_order(dir_path):
+    """Sort key for the order iter_groups() yields groups in: below-first, siblings by name"""
+    return [(0, name) for name in _split(dir_path)] + [(1, '')]
+
+
+def child_order(project):
+    """Sort key for the children of a group: the name they are listed under, groups and files alike"""
+    return lambda uuid: (project.get(uuid) or {}).get('path') or (project.get(uuid) or {}).get('name') or ''
+
+
+def missing_groups(trie, dir_path, group_id):
+    """Index the directories missing on the way to dir_path, touching no project.
+
+    Returns (node for dir_path, [(dir path, new node)], outermost first);
+    the caller adds the groups, where its layout wants them.
+    """
+    node, path, rest = trie.deepest(dir_path)
+    created = []
+    for name in rest:
+        path = f"{path}/{name}" if path else name
+        child = node.children[name] = GroupNode(group_id(path))
+        created.append((path, child))
+        node = child
+    return node, created
+
+
+def prune_groups(project, trie, dir_path):
+    """Remove the group for dir_path and every ancestor left without children.
+
+    The trie root is never removed.
+    """
+    while dir_path:
+        node = trie.get(dir_path)
+        if node is None or project.get(node.uuid, {}).get('children'):
+            return
+        parent = trie.get(os.path.dirname(dir_path))
+        project.get(parent.uuid)['children'].remove_all({node.uuid})
+        project.remove_object(node.uuid)
+        trie.remove(dir_path)
+        dir_path = os.path.dirname(dir_path)
@@ -0,0 +1,171 @@
+"""
+Deterministic object IDs for generated Xcode projects
+
+Every object is identified by a (target, section, path) key. The ID is the
+first 24 hex digits of a SHA-1 over that key, so regenerating an unchanged
+tree yields the same IDs and byte-identical output. IDs already present in
+an existing project are offered as seeds and reused when their key is
+requested again.
+"""
+
+import hashlib
+
+
+class IDCollisionError(KeyError):
+    """Raised when a seeded ID is already bound to a different key"""
+
+
+def hash_id(target, section, path, salt=0):
+    """Return the 24-character uppercase hex ID for a key"""
+    text = f"{target}\0{section}\0{path}"
+    if salt:
+        text += f"\0{salt}"
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()[:24].upper()
+
+
+class IDRegistry:
+    """Set-backed registry that hands out one stable ID per key"""
+
+    def __init__(self):
+        self._by_key = {}
+        self._seeds = {}
+        self._taken = set()
+        self._reserved = set()
+        self.collisions = 0
+
+    def __len__(self):
+        return len(self._taken)
+
+    def __contains__(self, uuid):
+        return uuid in self._taken or uuid in self._reserved
+
+    def id_for(self, target, section, path=''):
+        """Return the ID for (target, section, path), allocating it on first use"""
+        key = (target, section, path)
+        uuid = self._by_key.get(key)
+        if uuid is not None:
+            return uuid
+        uuid = self._seeds.pop(key, None)
+        if uuid is not None and uuid not in self._taken:
+            self._taken.add(uuid)
+            self._by_key[key] = uuid
+            return uuid
+        salt = 0
+        uuid = hash_id(target, section, path)
+        while uuid in self._taken or uuid in self._reserved:
+            self.collisions += 1
+            salt += 1
+            uuid = hash_id(target, section, path, salt)
+        self._taken.add(uuid)
+        self._by_key[key] = uuid
+        return uuid
+
+    def lookup(self, target, section, path=''):
+        """Return the ID already bound to a key, or None"""
+        return self._by_key.get((target, section, path))
+
+    def reserve(self, uuid):
+        """Keep an ID from being hashed to any key; a seed may still claim it"""
+        self._reserved.add(uuid)
+
+    def seed(self, target, section, path, uuid):
+        """Offer an existing ID for a key; it is claimed when the key is requested.
+
+        Seeds that are never requested never take up an ID, so a stale key
+        cannot push a current key off its hash.
+        """
+        key = (target, section, path)
+        bound = self._by_key.get(key)
+        if bound is not None and bound != uuid:
+            raise IDCollisionError(f"{key} is already bound to {bound}")
+        self._seeds.setdefault(key, uuid)
+
+    def release(self, target, section, path=''):
+        """Forget a key and free its ID"""
+        uuid = self._by_key.pop((target, section, path), None)
+        if uuid is not None:
+            self._taken.discard(uuid)
+        return uuid
+
+
+def project_keys(project):
+    """Yield ((target, section, path), uuid) for the objects a generator emits.
+
+    Files are keyed by their path relative to the project directory, targets
+    and their phases by target name, dependencies by the name of the target
+    they wait for, and configurations by their name.
+    """
+    root = project.root_object
+    if root is None:
+        return
+    yield ('', 'PBXProject', ''), project.root['rootObject']
+    yield ('', 'XCConfigurationList', ''), root.get('buildConfigurationList')
+    for config_uuid in project.get(root.get('buildConfigurationList'), {}).get('buildConfigurations', ()):
+        yield ('', 'XCBuildConfiguration', project.get(config_uuid, {}).get('name')), config_uuid
+
+    paths = project.file_paths()
+    for group_uuid, group_path in project.group_paths().items():
+        yield ('', 'PBXGroup', group_path), group_uuid
+    for ref_uuid, ref_path in paths.items():
+        yield ('', 'PBXFileReference', ref_path), ref_uuid
+
+    for target_uuid in root.get('targets', ()):
+        target = project.get(target_uuid, {})
+        name = target.get('name')
+        yield (name, 'PBXNativeTarget', ''), target_uuid
+        yield (name, 'XCConfigurationList', ''), target.get('buildConfigurationList')
+        for config_uuid in project.get(target.get('buildConfigurationList'), {}).get('buildConfigurations', ()):
+            yield (name, 'XCBuildConfiguration', project.get(config_uuid, {}).get('name')), config_uuid
+        product = target.get('productReference')
+        if product:
+            yield (name, 'PBXFileReference', project.get(product, {}).get('path')), product
+        for dependency_uuid in target.get('dependencies', ()):
+            dependency = project.get(dependency_uuid, {})
+            host = project.get(dependency.get('target'), {}).get('name')
+            yield (name, 'PBXTargetDependency', host), dependency_uuid
+            yield (name, 'PBXContainerItemProxy', host), dependency.get('targetProxy')
+        for group_uuid in target.get('fileSystemSynchronizedGroups', ()):
+            # Synchronized folders by path, their exception sets by the target they apply to
+            group = project.get(group_uuid, {})
+            yield ('', 'PBXFileSystemSynchronizedRootGroup', group.get('path')), group_uuid
+            for exception_uuid in group.get('exceptions', ()):
+                exception_target = project.get(project.get(exception_uuid, {}).get('target'), {}).get('name')
+                yield (exception_target, 'PBXFileSystemSynchronizedBuildFileExceptionSet',
+                       group.get('path')), exception_uuid
+        for phase_uuid in target.get('buildPhases', ()):
+            phase = project.get(phase_uuid, {})
+            yield (name, phase.get('isa'), ''), phase_uuid
+            for build_uuid in phase.get('files', ()):
+                ref = project.get(build_uuid, {}).get('fileRef')
+                if ref in paths:
+                    yield (name, 'PBXBuildFile', paths[ref]), build_uuid
+
+
+def registry_from_project(project, reserve=True):
+    """Return a registry that reuses the IDs of project.
+
+    With reserve=True every other ID in the project is kept off limits too,
+    which is what in-place updates need; a full regeneration drops objects
+    it does not emit, so it only takes the seeds.
+    """
+    registry = IDRegistry()
+    for (target, section, path), uuid in project_keys(project):
+        if uuid and path is not None:
+            try:
+                registry.seed(target, section, path, uuid)
+            except IDCollisionError:
+                pass
+    if reserve:
+        for uuid in project.objects:
+            registry.reserve(uuid)
+    return registry
+
+
+def registry_for(project_path):
+    """Return a registry seeded from the project a generator is about to rewrite"""
+    from .pbxproj import Project
+    try:
+        project = Project.load(project_path)
+    except (OSError, ValueError):
+        return IDRegistry()
+    return registry_from_project(project, reserve=False)
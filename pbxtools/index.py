@@ -0,0 +1,142 @@
+"""
+Read-only query index over project.pbxproj
+
+ProjectIndex holds the lookups build tooling keeps asking for as plain
+hash maps: path -> file reference, file reference -> build files, build
+file -> phase, and phase -> (target, phase name). It is built from a
+parsed Project in one pass, and load_index() keeps a copy on disk next to
+the .xcodeproj keyed by the SHA-1 of project.pbxproj, so later queries
+against an unchanged project skip the parse entirely.
+"""
+
+import json
+import os
+
+from .classify import SOURCES
+from .manifest import file_digest
+from .pbxproj import Project
+
+VERSION = 1
+
+
+def index_path(pbxproj):
+    """Return the cache location for a project.pbxproj, beside its .xcodeproj"""
+    project_dir = os.path.dirname(os.path.abspath(pbxproj))
+    parent, name = os.path.split(project_dir)
+    return os.path.join(parent, f".{name}.index.json")
+
+
+class ProjectIndex:
+    """Hash indexes from paths to file references, build files, phases and targets.
+
+    phases maps a phase UUID to [target name, phase name, build file UUIDs].
+    """
+
+    def __init__(self, files, build_files, phase_of, phases, digest=None):
+        self.files = files
+        self.build_files = build_files
+        self.phase_of = phase_of
+        self.phases = phases
+        self.digest = digest
+        self.paths = {file_ref: path for path, file_ref in files.items()}
+        self.file_of = {build_uuid: file_ref
+                        for file_ref, build_uuids in build_files.items() for build_uuid in build_uuids}
+
+    @classmethod
+    def from_project(cls, project, digest=None):
+        """Index a parsed Project"""
+        files = {path: uuid for uuid, path in project.file_paths().items()}
+        build_files, phase_of, phases = {}, {}, {}
+        for target in project.objects_of('PBXNativeTarget').values():
+            name = target.get('name')
+            for phase_uuid in target.get('buildPhases', ()):
+                phase = project.get(phase_uuid, {})
+                members = list(phase.get('files', ()))
+                phases[phase_uuid] = [name, project.annotation(phase_uuid), members]
+                for build_uuid in members:
+                    phase_of[build_uuid] = phase_uuid
+                    file_ref = project.get(build_uuid, {}).get('fileRef')
+                    if file_ref:
+                        build_files.setdefault(file_ref, []).append(build_uuid)
+        return cls(files, build_files, phase_of, phases, digest)
+
+    @classmethod
+    def load(cls, path):
+        """Read a cached index; None if it is missing or unreadable"""
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if not isinstance(data, dict) or data.get('version') != VERSION:
+            return None
+        return cls(data['files'], data['build_files'], data['phase_of'], data['phases'], data['digest'])
+
+    def save(self, path):
+        """Write the index atomically"""
+        tmp = f"{path}.tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump({'version': VERSION, 'digest': self.digest, 'files': self.files,
+                       'build_files': self.build_files, 'phase_of': self.phase_of, 'phases': self.phases},
+                      f, separators=(',', ':'))
+        os.replace(tmp, path)
+
+    def file_ref(self, path):
+        """Return the file reference UUID for a path relative to the project directory"""
+        return self.files.get(os.path.normpath(path))
+
+    def memberships(self, path):
+        """Return [(target, phase name)] for every build phase that includes path"""
+        result = []
+        for build_uuid in self.build_files.get(self.file_ref(path), ()):
+            phase_uuid = self.phase_of.get(build_uuid)
+            if phase_uuid in self.phases:
+                result.append(tuple(self.phases[phase_uuid][:2]))
+        return result
+
+    def targets_for(self, path):
+        """Return the names of the targets that build path, in project order"""
+        return list(dict.fromkeys(target for target, _ in self.memberships(path)))
+
+    def phase_files(self, target, phase=SOURCES):
+        """Return the paths in a target's build phase, in phase order.
+
+        Build files whose reference has no path (products, packages) are
+        left out.
+        """
+        members = [build_uuids for name, title, build_uuids in self.phases.values()
+                   if name == target and title == phase]
+        if not members:
+            raise KeyError(f"Target {target} has no {phase} build phase")
+        paths = (self.paths.get(self.file_of.get(build_uuid))
+                 for build_uuids in members for build_uuid in build_uuids)
+        return [path for path in paths if path is not None]
+
+    def targets(self):
+        """Return {target: [phase names]}"""
+        result = {}
+        for name, title, _ in self.phases.values():
+            result.setdefault(name, []).append(title)
+        return result
+
+
+def load_index(pbxproj, cache=True):
+    """Return the ProjectIndex for project.pbxproj, from the cache when it is current.
+
+    The cache is keyed by the content hash of project.pbxproj, so any edit,
+    by Xcode or by our tools, invalidates it. It is rebuilt and saved when
+    stale; with cache=False it is neither read nor written.
+    """
+    digest = file_digest(pbxproj)
+    path = index_path(pbxproj)
+    if cache:
+        index = ProjectIndex.load(path)
+        if index is not None and index.digest == digest:
+            return index
+    index = ProjectIndex.from_project(Project.load(pbxproj), digest)
+    if cache:
+        try:
+            index.save(path)
+        except OSError:
+            pass
+    return index
@@ -0,0 +1,33 @@
+"""
+Advisory file lock serialising writers of one project.pbxproj
+
+The lock file sits next to the .xcodeproj, hidden like the generator
+manifest. Every tool that rewrites the project (the updater, the project
+server, the generators) holds it from reading the file until the new
+version is saved, so their read-modify-write cycles never interleave.
+flock locks belong to an open file, so a process must not take the lock
+again while holding it; the generators take it once, around a whole run.
+"""
+
+import contextlib
+import fcntl
+import os
+
+
+def lock_path(pbxproj):
+    """Return the lock file used for a project.pbxproj path"""
+    project_dir = os.path.dirname(os.path.abspath(pbxproj))
+    parent, name = os.path.split(project_dir)
+    return os.path.join(parent, f".{name}.lock")
+
+
+@contextlib.contextmanager
+def project_lock(pbxproj):
+    """Hold the exclusive lock for pbxproj, waiting for other writers"""
+    fd = os.open(lock_path(pbxproj), os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        yield
+    finally:
+        # Closing the descriptor releases the lock
+        os.close(fd)
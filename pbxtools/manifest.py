@@ -0,0 +1,123 @@
+"""
+Persistent manifest of scanned source files
+
+The manifest lives next to the .xcodeproj and records, for every file seen
+by the last generator run, its size, mtime and (optionally) content hash,
+followed by any extra values the caller wants to keep, such as object IDs.
+Comparing a fresh scan against it yields just the added, removed and
+changed paths, so an unchanged tree can be recognised without rendering.
+"""
+
+import hashlib
+import json
+import os
+
+VERSION = 1
+
+
+def manifest_path(project_dir):
+    """Return the manifest location for a .xcodeproj directory"""
+    parent, name = os.path.split(os.path.normpath(project_dir))
+    return os.path.join(parent, f".{name}.manifest.json")
+
+
+def file_digest(path):
+    """Return the SHA-1 hex digest of a file's contents.
+
+    A directory, such as an asset catalog, hashes the relative paths and
+    contents of every file below it.
+    """
+    digest = hashlib.sha1()
+    if os.path.isdir(path):
+        for directory, dirs, files in os.walk(path):
+            dirs.sort()
+            for name in sorted(files):
+                file_path = os.path.join(directory, name)
+                digest.update(os.path.relpath(file_path, path).encode('utf-8') + b'\0')
+                digest.update(file_digest(file_path).encode('ascii'))
+        return digest.hexdigest()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def stat_key(path):
+    """Return (size, mtime_ns) for path, or None if it does not exist"""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return [st.st_size, st.st_mtime_ns]
+
+
+class Manifest:
+    """path -> [size, mtime_ns, content_hash, *extra] plus free-form metadata"""
+
+    def __init__(self, path, files=None, meta=None):
+        self.path = path
+        self.files = files if files is not None else {}
+        self.meta = meta if meta is not None else {}
+
+    @classmethod
+    def load(cls, path):
+        """Read the manifest at path; a missing or unreadable one loads empty"""
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return cls(path)
+        if not isinstance(data, dict) or data.get('version') != VERSION:
+            return cls(path)
+        return cls(path, data.get('files', {}), data.get('meta', {}))
+
+    def save(self):
+        """Write the manifest atomically"""
+        tmp = f"{self.path}.tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump({'version': VERSION, 'meta': self.meta, 'files': self.files},
+                      f, separators=(',', ':'), sort_keys=True)
+        os.replace(tmp, self.path)
+
+    def discard(self):
+        """Forget every file so the next run starts from scratch.
+
+        The emptied manifest is still written: it marks the project as a
+        generated one, which is what --batch goes by.
+        """
+        self.files = {}
+        self.meta = {}
+        self.save()
+
+    def diff(self, scanned, root=None):
+        """Compare a scan {path: (size, mtime_ns)} against the manifest.
+
+        Returns sorted (added, removed, changed) path lists. A file whose size
+        or mtime moved counts as changed; when root is given its content hash
+        is checked too, so files that were only touched are not reported.
+        Recorded stats and hashes are refreshed for every file that is kept.
+        """
+        files = self.files
+        added = [path for path in scanned if path not in files]
+        removed = [path for path in files if path not in scanned]
+        changed = []
+        for path, (size, mtime_ns) in scanned.items():
+            entry = files.get(path)
+            if entry is None or (entry[0] == size and entry[1] == mtime_ns):
+                continue
+            if root is not None:
+                digest = file_digest(os.path.join(root, path))
+                if digest == entry[2]:
+                    entry[0], entry[1] = size, mtime_ns
+                    continue
+                entry[2] = digest
+            entry[0], entry[1] = size, mtime_ns
+            changed.append(path)
+        return sorted(added), sorted(removed), sorted(changed)
+
+    def record(self, path, size, mtime_ns, digest=None, *extra):
+        """Add or replace the entry for path"""
+        self.files[path] = [size, mtime_ns, digest, *extra]
+
+    def forget(self, path):
+        return self.files.pop(path, None)
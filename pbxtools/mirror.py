@@ -0,0 +1,171 @@
+"""
+Incremental directory mirroring
+
+mirror() makes a destination tree an exact copy of a source tree while
+touching only what differs. Files count as unchanged when size and mtime
+match (copies keep the source mtime, so this holds on the next run) or,
+with compare='hash', when their contents hash the same. Changed files are
+hardlinked when asked to and the filesystem allows it, otherwise copied
+with os.copy_file_range (in-kernel, and reflinked on filesystems that
+support it) or shutil.copyfile, through a temporary file and a rename so
+readers never see a half-written file. Copies run on a thread pool.
+Anything in the destination that is no longer in the source is deleted.
+"""
+
+import errno
+import os
+import secrets
+import shutil
+import stat
+from concurrent.futures import ThreadPoolExecutor
+
+from .manifest import file_digest
+from .scan import DEFAULT_WORKERS
+
+MIRROR_IGNORES = ('.DS_Store',)
+
+# copy_file_range failures that mean "not here", not "failed"
+_NO_COPY_RANGE = {errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP, errno.EPERM}
+# os.link failures that fall back to copying
+_NO_LINK = {errno.EXDEV, errno.EPERM, errno.EMLINK, errno.ENOTSUP, errno.EACCES}
+
+
+class MirrorResult:
+    """Counts of what mirror() did"""
+
+    __slots__ = ('copied', 'linked', 'unchanged', 'removed')
+
+    def __init__(self):
+        self.copied = self.linked = self.unchanged = self.removed = 0
+
+    def __str__(self):
+        return (f"{self.copied} copied, {self.linked} linked, "
+                f"{self.unchanged} unchanged, {self.removed} removed")
+
+
+def _walk(root, ignore):
+    """Return ({path: lstat} for files and symlinks, [directories], parents first)"""
+    files, dirs = {}, []
+    if not os.path.isdir(root):
+        return files, dirs
+    stack = ['']
+    while stack:
+        rel = stack.pop()
+        with os.scandir(os.path.join(root, rel) if rel else root) as it:
+            for entry in it:
+                if entry.name in ignore:
+                    continue
+                path = f"{rel}/{entry.name}" if rel else entry.name
+                if entry.is_dir(follow_symlinks=False):
+                    dirs.append(path)
+                    stack.append(path)
+                else:
+                    files[path] = entry.stat(follow_symlinks=False)
+    return files, dirs
+
+
+def _unchanged(src, dst, src_stat, dst_stat, compare):
+    if stat.S_ISLNK(src_stat.st_mode) or stat.S_ISLNK(dst_stat.st_mode):
+        return (stat.S_ISLNK(src_stat.st_mode) and stat.S_ISLNK(dst_stat.st_mode)
+                and os.readlink(src) == os.readlink(dst))
+    if (src_stat.st_ino, src_stat.st_dev) == (dst_stat.st_ino, dst_stat.st_dev):
+        return True
+    if src_stat.st_size != dst_stat.st_size:
+        return False
+    if compare == 'hash':
+        return file_digest(src) == file_digest(dst)
+    return src_stat.st_mtime_ns == dst_stat.st_mtime_ns
+
+
+def _temp_name(dst):
+    directory, name = os.path.split(dst)
+    return os.path.join(directory, f".{name}.mirror-{secrets.token_hex(4)}")
+
+
+def _copy_data(src, tmp):
+    copy_range = getattr(os, 'copy_file_range', None)
+    if copy_range is not None:
+        with open(src, 'rb') as fin, open(tmp, 'wb') as fout:
+            try:
+                while copy_range(fin.fileno(), fout.fileno(), 1 << 30):
+                    pass
+                return
+            except OSError as e:
+                if e.errno not in _NO_COPY_RANGE:
+                    raise
+    # sendfile on Linux, fcopyfile on macOS
+    shutil.copyfile(src, tmp)
+
+
+def _sync_file(src, dst, src_stat, link):
+    """Bring one destination file up to date; returns 'copied' or 'linked'"""
+    tmp = _temp_name(dst)
+    try:
+        if stat.S_ISLNK(src_stat.st_mode):
+            os.symlink(os.readlink(src), tmp)
+            os.replace(tmp, dst)
+            return 'copied'
+        if link:
+            try:
+                os.link(src, tmp)
+                os.replace(tmp, dst)
+                return 'linked'
+            except OSError as e:
+                if e.errno not in _NO_LINK:
+                    raise
+        _copy_data(src, tmp)
+        os.chmod(tmp, stat.S_IMODE(src_stat.st_mode))
+        os.utime(tmp, ns=(src_stat.st_atime_ns, src_stat.st_mtime_ns))
+        os.replace(tmp, dst)
+        return 'copied'
+    except BaseException:
+        if os.path.lexists(tmp):
+            os.unlink(tmp)
+        raise
+
+
+def _remove(path):
+    if os.path.isdir(path) and not os.path.islink(path):
+        shutil.rmtree(path)
+    elif os.path.lexists(path):
+        os.unlink(path)
+
+
+def mirror(src, dst, compare='stat', link=False, workers=DEFAULT_WORKERS, ignore=MIRROR_IGNORES):
+    """Make dst an exact copy of the src tree; returns a MirrorResult.
+
+    compare is 'stat' (size and mtime) or 'hash' (content). With link,
+    files are hardlinked where possible instead of copied.
+    """
+    src_files, src_dirs = _walk(src, ignore)
+    dst_files, dst_dirs = _walk(dst, ignore)
+    result = MirrorResult()
+
+    # Stale entries first, so paths that changed between file and directory are free
+    wanted_dirs = set(src_dirs)
+    for path in reversed(dst_dirs):
+        if path not in wanted_dirs:
+            _remove(os.path.join(dst, path))
+            result.removed += 1
+    for path in dst_files:
+        if path not in src_files and os.path.lexists(os.path.join(dst, path)):
+            _remove(os.path.join(dst, path))
+            result.removed += 1
+
+    os.makedirs(dst, exist_ok=True)
+    for path in src_dirs:
+        os.makedirs(os.path.join(dst, path), exist_ok=True)
+
+    todo = []
+    for path, src_stat in src_files.items():
+        dst_stat = dst_files.get(path)
+        source, target = os.path.join(src, path), os.path.join(dst, path)
+        if dst_stat is not None and _unchanged(source, target, src_stat, dst_stat, compare):
+            result.unchanged += 1
+        else:
+            todo.append((source, target, src_stat, link))
+
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(todo)))) as pool:
+        for outcome in pool.map(lambda job: _sync_file(*job), todo):
+            setattr(result, outcome, getattr(result, outcome) + 1)
+    return result
@@ -0,0 +1,509 @@
+"""
+Compact object model for generated project.pbxproj files
+
+Every object kind the generators and the updater create is a small
+__slots__ class: no per-instance __dict__, references to other objects
+held directly, and display names derived on demand instead of stored.
+Objects render themselves in Xcode's own layout, so a generator can build
+them lazily from a FileTable row, write them and drop them again, and
+to_dict() turns one into the plain value Project.add_object() expects.
+
+Measured with measure() on CPython 3.11, a PBXFileReference costs about
+64 bytes and a PBXBuildFile about 56, excluding the path and ID strings
+they share with the caller.
+"""
+
+import os
+import sys
+import tracemalloc
+from collections.abc import Mapping
+
+from .pbxproj import HEADER, quote
+
+
+class PBXObject:
+    """Base class: a UUID plus the fields Xcode writes after `isa`"""
+
+    __slots__ = ('uuid',)
+
+    isa = None
+    inline = False
+
+    def __init__(self, uuid):
+        self.uuid = uuid
+
+    def comment(self):
+        """Return the `/* ... */` annotation Xcode puts next to references"""
+        return None
+
+    def fields(self):
+        """Yield (key, value) pairs in output order, `isa` excluded"""
+        return ()
+
+    def reference(self):
+        """Return `uuid /* comment */` as written wherever this is referenced"""
+        comment = self.comment()
+        return f"{self.uuid} /* {comment} */" if comment else self.uuid
+
+    def render(self):
+        """Return this object's entry inside `objects = {...}`, leading newline included"""
+        head = f"\n\t\t{self.reference()} = "
+        fields = [('isa', self.isa), *self.fields()]
+        if self.inline:
+            body = ' '.join(f"{_key(k)} = {_render(v, 3, True)};" for k, v in fields)
+            return f"{head}{{{body} }};"
+        body = ''.join(f"\n\t\t\t{_key(k)} = {_render(v, 3)};" for k, v in fields)
+        return f"{head}{{{body}\n\t\t}};"
+
+    def to_dict(self):
+        """Return the object as plain dicts, lists and UUID strings"""
+        return {'isa': self.isa, **{k: _plain(v) for k, v in self.fields()}}
+
+
+class BuildSettings(Mapping):
+    """Immutable build settings, kept sorted the way Xcode writes them.
+
+    Instances are hashable, so equal layers can be shared and merged
+    results memoized, and each renders its `{...}` block at most once per
+    indentation depth however many configurations point at it.
+    """
+
+    __slots__ = ('_values', '_hash', '_rendered')
+
+    def __init__(self, values=()):
+        values = dict(values)
+        self._values = {k: tuple(v) if isinstance(v, list) else v for k, v in sorted(values.items())}
+        self._hash = None
+        self._rendered = {}
+
+    def __getitem__(self, key):
+        return self._values[key]
+
+    def __iter__(self):
+        return iter(self._values)
+
+    def __len__(self):
+        return len(self._values)
+
+    def __eq__(self, other):
+        if isinstance(other, BuildSettings):
+            return self._values == other._values
+        return NotImplemented
+
+    def __hash__(self):
+        if self._hash is None:
+            self._hash = hash(tuple(self._values.items()))
+        return self._hash
+
+    def __repr__(self):
+        return f"BuildSettings({self._values!r})"
+
+    def render(self, depth):
+        """Return the `{...}` block for these settings at the given depth"""
+        text = self._rendered.get(depth)
+        if text is None:
+            text = self._rendered[depth] = _render(self._values, depth)
+        return text
+
+
+def _key(key):
+    return key.uuid if isinstance(key, PBXObject) else quote(key)
+
+
+def _render(value, depth, inline=False):
+    if isinstance(value, PBXObject):
+        return value.reference()
+    if isinstance(value, str):
+        return quote(value)
+    if isinstance(value, int):
+        return str(value)
+    if isinstance(value, BuildSettings):
+        return value.render(depth)
+    if isinstance(value, dict):
+        if inline:
+            return '{' + ''.join(f"{_key(k)} = {_render(v, depth, True)}; " for k, v in value.items()) + '}'
+        indent = '\t' * depth
+        body = ''.join(f"\n{indent}\t{_key(k)} = {_render(v, depth + 1)};" for k, v in value.items())
+        return f"{{{body}\n{indent}}}"
+    if inline:
+        return '(' + ''.join(f"{_render(v, depth, True)}, " for v in value) + ')'
+    indent = '\t' * depth
+    body = ''.join(f"\n{indent}\t{_render(v, depth + 1)}," for v in value)
+    return f"({body}\n{indent})"
+
+
+def _plain(value):
+    if isinstance(value, PBXObject):
+        return value.uuid
+    if isinstance(value, (str, int)):
+        return value
+    if isinstance(value, Mapping):
+        return {_plain(k): _plain(v) for k, v in value.items()}
+    return [_plain(v) for v in value]
+
+
+class FileReference(PBXObject):
+    """A source file, relative to its group unless source_tree says otherwise"""
+
+    __slots__ = ('path', 'file_type', 'source_tree')
+
+    isa = 'PBXFileReference'
+    inline = True
+
+    def __init__(self, uuid, path, file_type, source_tree='<group>'):
+        self.uuid = uuid
+        self.path = path
+        self.file_type = file_type
+        self.source_tree = source_tree
+
+    def comment(self):
+        return os.path.basename(self.path)
+
+    def fields(self):
+        yield 'lastKnownFileType', self.file_type
+        yield 'path', self.path
+        yield 'sourceTree', self.source_tree
+
+
+class ProductReference(FileReference):
+    """The built product of a target, e.g. TripBro.app"""
+
+    __slots__ = ()
+
+    def fields(self):
+        yield 'explicitFileType', self.file_type
+        yield 'includeInIndex', 0
+        yield 'path', self.path
+        yield 'sourceTree', self.source_tree
+
+
+class BuildFile(PBXObject):
+    """Membership of a file reference in one build phase"""
+
+    __slots__ = ('file_ref', 'phase')
+
+    isa = 'PBXBuildFile'
+    inline = True
+
+    def __init__(self, uuid, file_ref, phase='Sources'):
+        self.uuid = uuid
+        self.file_ref = file_ref
+        self.phase = phase
+
+    def comment(self):
+        return f"{self.file_ref.comment()} in {self.phase}"
+
+    def fields(self):
+        yield 'fileRef', self.file_ref
+
+
+class Group(PBXObject):
+    """A PBXGroup; children may be any iterable, consumed once per render"""
+
+    __slots__ = ('children', 'path', 'name', 'source_tree')
+
+    isa = 'PBXGroup'
+
+    def __init__(self, uuid, children=(), path=None, name=None, source_tree='<group>'):
+        self.uuid = uuid
+        self.children = children
+        self.path = path
+        self.name = name
+        self.source_tree = source_tree
+
+    def comment(self):
+        return self.name or self.path
+
+    def fields(self):
+        yield 'children', self.children
+        if self.name is not None:
+            yield 'name', self.name
+        if self.path is not None:
+            yield 'path', self.path
+        yield 'sourceTree', self.source_tree
+
+
+class SynchronizedRootGroup(PBXObject):
+    """A folder Xcode keeps in sync with the disk itself (objectVersion 77)"""
+
+    __slots__ = ('path', 'exceptions', 'source_tree')
+
+    isa = 'PBXFileSystemSynchronizedRootGroup'
+
+    def __init__(self, uuid, path, exceptions=(), source_tree='<group>'):
+        self.uuid = uuid
+        self.path = path
+        self.exceptions = exceptions
+        self.source_tree = source_tree
+
+    def comment(self):
+        return self.path
+
+    def fields(self):
+        if self.exceptions:
+            yield 'exceptions', self.exceptions
+        yield 'path', self.path
+        yield 'sourceTree', self.source_tree
+
+
+class BuildFileExceptionSet(PBXObject):
+    """Paths in a synchronized folder whose membership in target is inverted.
+
+    For the target the folder belongs to they are left out; for any other
+    target they are built in addition to its own folders.
+    """
+
+    __slots__ = ('group', 'target', 'paths')
+
+    isa = 'PBXFileSystemSynchronizedBuildFileExceptionSet'
+
+    def __init__(self, uuid, group, target, paths):
+        self.uuid = uuid
+        self.group = group
+        self.target = target
+        self.paths = paths
+
+    def comment(self):
+        return f'Exceptions for "{self.group.path}" folder in "{self.target.name}" target'
+
+    def fields(self):
+        yield 'membershipExceptions', self.paths
+        yield 'target', self.target
+
+
+class BuildPhase(PBXObject):
+    """Base for the standard build phases; files may be any iterable"""
+
+    __slots__ = ('files',)
+
+    title = None
+
+    def __init__(self, uuid, files=()):
+        self.uuid = uuid
+        self.files = files
+
+    def comment(self):
+        return self.title
+
+    def fields(self):
+        yield 'buildActionMask', 2147483647
+        yield 'files', self.files
+        yield 'runOnlyForDeploymentPostprocessing', 0
+
+
+class SourcesBuildPhase(BuildPhase):
+    __slots__ = ()
+    isa = 'PBXSourcesBuildPhase'
+    title = 'Sources'
+
+
+class FrameworksBuildPhase(BuildPhase):
+    __slots__ = ()
+    isa = 'PBXFrameworksBuildPhase'
+    title = 'Frameworks'
+
+
+class ResourcesBuildPhase(BuildPhase):
+    __slots__ = ()
+    isa = 'PBXResourcesBuildPhase'
+    title = 'Resources'
+
+
+class BuildConfiguration(PBXObject):
+    """One named XCBuildConfiguration, optionally based on an .xcconfig file"""
+
+    __slots__ = ('name', 'settings', 'base')
+
+    isa = 'XCBuildConfiguration'
+
+    def __init__(self, uuid, name, settings, base=None):
+        self.uuid = uuid
+        self.name = name
+        self.settings = settings
+        self.base = base
+
+    def comment(self):
+        return self.name
+
+    def fields(self):
+        if self.base is not None:
+            yield 'baseConfigurationReference', self.base
+        yield 'buildSettings', self.settings
+        yield 'name', self.name
+
+
+class ConfigurationList(PBXObject):
+    __slots__ = ('configurations', 'default')
+
+    isa = 'XCConfigurationList'
+
+    def __init__(self, uuid, configurations, default='Release'):
+        self.uuid = uuid
+        self.configurations = configurations
+        self.default = default
+
+    def fields(self):
+        yield 'buildConfigurations', self.configurations
+        yield 'defaultConfigurationIsVisible', 0
+        yield 'defaultConfigurationName', self.default
+
+
+class NativeTarget(PBXObject):
+    """A target; synchronized_groups, when set, lists its synchronized folders"""
+
+    __slots__ = ('name', 'config_list', 'phases', 'product', 'product_type', 'dependencies',
+                 'synchronized_groups')
+
+    isa = 'PBXNativeTarget'
+
+    def __init__(self, uuid, name, config_list, phases, product,
+                 product_type='com.apple.product-type.application', dependencies=(), synchronized_groups=None):
+        self.uuid = uuid
+        self.name = name
+        self.config_list = config_list
+        self.phases = phases
+        self.product = product
+        self.product_type = product_type
+        self.dependencies = dependencies
+        self.synchronized_groups = synchronized_groups
+
+    def comment(self):
+        return self.name
+
+    def fields(self):
+        yield 'buildConfigurationList', self.config_list
+        yield 'buildPhases', self.phases
+        yield 'buildRules', ()
+        yield 'dependencies', self.dependencies
+        if self.synchronized_groups is not None:
+            yield 'fileSystemSynchronizedGroups', self.synchronized_groups
+        yield 'name', self.name
+        if self.synchronized_groups is not None:
+            yield 'packageProductDependencies', ()
+        yield 'productName', self.name
+        yield 'productReference', self.product
+        yield 'productType', self.product_type
+
+
+class ContainerItemProxy(PBXObject):
+    """Reference from a dependency to a target inside this project"""
+
+    __slots__ = ('portal', 'target')
+
+    isa = 'PBXContainerItemProxy'
+
+    def __init__(self, uuid, portal, target):
+        self.uuid = uuid
+        self.portal = portal
+        self.target = target
+
+    def comment(self):
+        return self.isa
+
+    def fields(self):
+        yield 'containerPortal', self.portal
+        yield 'proxyType', 1
+        yield 'remoteGlobalIDString', self.target.uuid
+        yield 'remoteInfo', self.target.name
+
+
+class TargetDependency(PBXObject):
+    """Build `target` before the target listing this dependency"""
+
+    __slots__ = ('target', 'proxy')
+
+    isa = 'PBXTargetDependency'
+
+    def __init__(self, uuid, target, proxy):
+        self.uuid = uuid
+        self.target = target
+        self.proxy = proxy
+
+    def comment(self):
+        return self.isa
+
+    def fields(self):
+        yield 'target', self.target
+        yield 'targetProxy', self.proxy
+
+
+class ProjectObject(PBXObject):
+    """The root PBXProject; attributes is written verbatim.
+
+    object_version 77 writes the fields Xcode 16 uses in place of
+    compatibilityVersion.
+    """
+
+    __slots__ = ('attributes', 'config_list', 'main_group', 'products_group', 'targets', 'object_version')
+
+    isa = 'PBXProject'
+
+    def __init__(self, uuid, attributes, config_list, main_group, products_group, targets, object_version=56):
+        self.uuid = uuid
+        self.attributes = attributes
+        self.config_list = config_list
+        self.main_group = main_group
+        self.products_group = products_group
+        self.targets = targets
+        self.object_version = object_version
+
+    def comment(self):
+        return 'Project object'
+
+    def fields(self):
+        yield 'attributes', self.attributes
+        yield 'buildConfigurationList', self.config_list
+        if self.object_version < 77:
+            yield 'compatibilityVersion', 'Xcode 14.0'
+        yield 'developmentRegion', 'en'
+        yield 'hasScannedForEncodings', 0
+        yield 'knownRegions', ('en', 'Base')
+        yield 'mainGroup', self.main_group
+        if self.object_version >= 77:
+            yield 'minimizedProjectReferenceProxies', 1
+            yield 'preferredProjectObjectVersion', self.object_version
+        yield 'productRefGroup', self.products_group
+        yield 'projectDirPath', ''
+        yield 'projectRoot', ''
+        yield 'targets', self.targets
+
+
+def iter_document(root, sections, object_version=56):
+    """Yield a whole project.pbxproj from (isa, objects) pairs in section order.
+
+    Objects may also be entries rendered ahead of time, as strings. Sections
+    without objects are left out, as Xcode does.
+    """
+    yield (f"{HEADER}{{\n\tarchiveVersion = 1;\n\tclasses = {{}};\n"
+           f"\tobjectVersion = {object_version};\n\tobjects = {{\n")
+    for isa, objects in sections:
+        started = False
+        for obj in objects:
+            if not started:
+                yield f"\n/* Begin {isa} section */"
+                started = True
+            yield obj if isinstance(obj, str) else obj.render()
+        if started:
+            yield f"\n/* End {isa} section */\n"
+    yield f"\t}};\n\trootObject = {root.reference()};\n}}\n"
+
+
+def measure(factory, count=100_000):
+    """Return the average bytes allocated per object for factory(i), i < count.
+
+    Only what the objects themselves add is counted: build the strings they
+    refer to inside factory and they are included too.
+    """
+    # Leave tracing running for whoever started it
+    tracing = tracemalloc.is_tracing()
+    if not tracing:
+        tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        objects = [factory(i) for i in range(count)]
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        if not tracing:
+            tracemalloc.stop()
+    # The list holding them is not part of the per-object cost
+    return (after - before - sys.getsizeof(objects)) / count
@@ -0,0 +1,243 @@
+"""
+JSON form of project.pbxproj, for post-processing with ordinary JSON tools
+
+to_json() turns a parsed Project into a document whose "project" member is
+the plain object graph (dicts, lists and strings, in file order) and whose
+"trivia" member mirrors it with everything the graph cannot hold: the
+whitespace and comments around each token and each scalar as written
+(quoted or bare). from_json() rebuilds the Project, so to_json followed by
+from_json reproduces the file byte for byte.
+
+The graph can be edited freely in between. Trivia is matched back by key
+in dictionaries and by value (scalars) or position (nested containers) in
+arrays; a scalar whose value changed loses its recorded spelling and
+comment and is rendered the way any edit through Project would be.
+Without trivia the project is laid out as Xcode does, objects grouped in
+isa sections.
+"""
+
+import json
+
+from .pbxproj import HEADER, PBXArray, PBXDict, Project, unquote
+
+VERSION = 1
+
+
+def _plain(value):
+    if isinstance(value, PBXDict):
+        return {key: _plain(child) for key, child in value.items()}
+    if isinstance(value, PBXArray):
+        return [_plain(child) for child in value]
+    return value
+
+
+def _record(key, entry):
+    """Trivia for one dictionary entry, the value's own trivia last"""
+    return [None if entry.key_raw == key else entry.key_raw, entry.key_pre, entry.eq_pre,
+            entry.val_pre, entry.semi_pre, entry.post, _trivia(entry.value, entry.val_raw)]
+
+
+def _trivia(value, raw):
+    """Trivia for one value: its raw spelling for a scalar, a nested record for a container"""
+    if isinstance(value, PBXDict):
+        return {'close': value.close_pre,
+                'entries': {key: _record(key, entry) for key, entry in value.iter_entries()}}
+    if isinstance(value, PBXArray):
+        return {'close': value.close_pre,
+                'items': [[item.pre, item.comma_pre, _trivia(item.value, item.raw)] for item in value.items()]}
+    return raw
+
+
+def to_json(project, trivia=True):
+    """Return project as a JSON-ready document; trivia=False keeps only the graph"""
+    document = {'pbxproj': VERSION, 'header': project.header, 'trailing': project.trailing,
+                'project': _plain(project.root)}
+    if trivia:
+        document['trivia'] = _trivia(project.root, None)
+    return document
+
+
+def _dumps(value):
+    return json.dumps(value, ensure_ascii=False)
+
+
+def _iter_members(members):
+    """Yield a JSON object one member per line from (key, chunks) pairs"""
+    yield '{'
+    separator = '\n'
+    for key, chunks in members:
+        yield f"{separator}{_dumps(key)}:"
+        yield from chunks
+        separator = ',\n'
+    yield '\n}'
+
+
+def _iter_elements(elements):
+    """Yield a JSON array one element per line from chunk iterables"""
+    yield '['
+    separator = '\n'
+    for chunks in elements:
+        yield separator
+        yield from chunks
+        separator = ',\n'
+    yield '\n]'
+
+
+def _iter_graph(root):
+    for key, value in root.items():
+        if key == 'objects' and isinstance(value, PBXDict):
+            yield key, _iter_members((uuid, [_dumps(_plain(obj))]) for uuid, obj in value.items())
+        else:
+            yield key, [_dumps(_plain(value))]
+
+
+def _iter_trivia(root):
+    for key, entry in root.iter_entries():
+        if key == 'objects' and isinstance(entry.value, PBXDict):
+            objects = _iter_members((uuid, [_dumps(_record(uuid, object_entry))])
+                                    for uuid, object_entry in entry.value.iter_entries())
+            record = _iter_members([('close', [_dumps(entry.value.close_pre)]), ('entries', objects)])
+            fields = [None if entry.key_raw == key else entry.key_raw, entry.key_pre, entry.eq_pre,
+                      entry.val_pre, entry.semi_pre, entry.post]
+            yield key, _iter_elements([*([_dumps(field)] for field in fields), record])
+        else:
+            yield key, [_dumps(_record(key, entry))]
+
+
+def iter_json(project, trivia=True):
+    """Yield the JSON text of to_json(project) in chunks, for write_stream.
+
+    The text is encoded straight from the parsed project: the containers
+    leading to the objects are written piece by piece and each object, with
+    its trivia, by a single json.dumps call on one line. Only one object is
+    ever converted to plain data at a time, never the whole graph.
+    """
+    members = [('pbxproj', [_dumps(VERSION)]), ('header', [_dumps(project.header)]),
+               ('trailing', [_dumps(project.trailing)]), ('project', _iter_members(_iter_graph(project.root)))]
+    if trivia:
+        root = project.root
+        members.append(('trivia', _iter_members([('close', [_dumps(root.close_pre)]),
+                                                  ('entries', _iter_members(_iter_trivia(root)))])))
+    return _iter_members(members)
+
+
+def _matches(value, trivia):
+    """True if the recorded trivia still describes value"""
+    if isinstance(value, dict):
+        return isinstance(trivia, dict) and 'entries' in trivia
+    if isinstance(value, list):
+        return isinstance(trivia, dict) and 'items' in trivia
+    return isinstance(trivia, str) and unquote(trivia) == value
+
+
+def _scalar(value):
+    if isinstance(value, bool):
+        return 'YES' if value else 'NO'
+    if isinstance(value, (int, float)):
+        return str(value)
+    if not isinstance(value, str):
+        raise ValueError(f"unsupported JSON value {value!r}")
+    return value
+
+
+def _markers(recorded, value):
+    """Return ({key: key_pre}, {key: post}) moving the comments of dropped entries to their neighbours.
+
+    Section markers live on the first and last entry of a section; when the
+    graph no longer has those entries, Begin moves to the next surviving
+    entry and End to the previous one, and a section dropped whole loses both.
+    """
+    pre, post = {}, {}
+    carry = last = None
+    for key, record in recorded.items():
+        key_pre, entry_post = record[1], record[5]
+        if key in value:
+            if carry is not None and not (key_pre and '/*' in key_pre):
+                pre[key] = carry
+            carry, last = None, key
+            continue
+        if key_pre and '/*' in key_pre:
+            carry = key_pre
+        if entry_post:
+            if carry is not None:
+                carry = None
+            elif last is not None:
+                post[last] = entry_post
+    return pre, post
+
+
+def _restore(value, trivia):
+    """Rebuild a PBXDict, PBXArray or string from the graph and its trivia"""
+    if isinstance(value, dict):
+        node = PBXDict()
+        recorded = trivia['entries'] if trivia else {}
+        moved_pre, moved_post = _markers(recorded, value)
+        for key, child in value.items():
+            record = recorded.get(key)
+            fits = record is not None and _matches(child, record[6])
+            node[key] = _restore(child, record[6] if fits else None)
+            if record is None:
+                continue
+            entry = node.entry(key)
+            key_raw, entry.key_pre, entry.eq_pre, val_pre, semi_pre, entry.post, raw = record
+            entry.key_raw = key if key_raw is None else key_raw
+            entry.key_pre = moved_pre.get(key, entry.key_pre)
+            entry.post = moved_post.get(key, entry.post)
+            if fits:
+                entry.val_pre, entry.semi_pre = val_pre, semi_pre
+                entry.val_raw = raw if isinstance(raw, str) else None
+        if trivia:
+            node.close_pre = trivia['close']
+            node.inline = '\n' not in node.close_pre
+        return node
+    if isinstance(value, list):
+        node = PBXArray()
+        records = trivia['items'] if trivia else []
+        # Scalars find their trivia by value, so inserting or removing items leaves the rest intact
+        by_value = {}
+        for record in records:
+            if isinstance(record[2], str):
+                by_value.setdefault(unquote(record[2]), []).append(record)
+        for i, child in enumerate(value):
+            if isinstance(child, (dict, list)):
+                record = records[i] if i < len(records) and _matches(child, records[i][2]) else None
+            else:
+                child = _scalar(child)
+                candidates = by_value.get(child)
+                record = candidates.pop(0) if candidates else None
+            node.append(_restore(child, record[2] if record else None))
+            if record is not None:
+                item = node.items()[-1]
+                item.pre, item.comma_pre = record[0], record[1]
+                item.raw = record[2] if isinstance(record[2], str) else None
+        if trivia:
+            node.close_pre = trivia['close']
+            node.inline = '\n' not in node.close_pre
+        return node
+    return _scalar(value)
+
+
+def from_json(document):
+    """Return the Project described by a to_json() document"""
+    if not isinstance(document, dict) or not isinstance(document.get('project'), dict):
+        raise ValueError("not a pbxproj JSON document: no \"project\" object")
+    if document.get('pbxproj', VERSION) != VERSION:
+        raise ValueError(f"unsupported pbxproj JSON version {document['pbxproj']!r}")
+    graph = document['project']
+    trivia = document.get('trivia')
+    root = _restore(graph, trivia if _matches(graph, trivia) else None)
+    project = Project(root, document.get('header', HEADER), document.get('trailing', '\n'))
+    record = trivia['entries'].get('objects') if trivia and _matches(graph, trivia) else None
+    recorded = record[6]['entries'] if record is not None and isinstance(record[6], dict) else None
+    if recorded is None and project.objects:
+        # No recorded layout: regroup the objects into isa sections, as Xcode writes them
+        objects = project.objects.items()
+        project.objects = root['objects'] = PBXDict()
+        project.by_isa = {}
+        for uuid, obj in sorted(objects, key=lambda item: item[1].get('isa') or ''):
+            project.add_object(uuid, obj)
+    elif recorded is not None:
+        # Objects the JSON added go to the end of their isa section
+        for uuid in [uuid for uuid in project.objects if uuid not in recorded]:
+            project.add_object(uuid, project.remove_object(uuid))
+    return project
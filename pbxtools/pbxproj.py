@@ -0,0 +1,789 @@
+"""
+OpenStep plist parser and writer for project.pbxproj
+
+The text is tokenized and parsed in a single pass. Whitespace and comments
+are kept as trivia on the entries they belong to, so an untouched project
+serializes back byte for byte and an edit only re-renders what it changed.
+Project.load tokenizes a memory map of the file, decoding one token at a
+time, so the text is never held as a second full-size string.
+"""
+
+import bisect
+import mmap
+import os
+import re
+import stat
+
+from .writer import write_stream
+
+HEADER = '// !$*UTF8*$!\n'
+
+_TOKEN = re.compile(r'''
+    (?P<trivia>(?:\s+|/\*.*?\*/|//[^\n]*)+)
+  | (?P<punct>[{}()=;,])
+  | "(?P<quoted>(?:[^"\\]|\\.)*)"
+  | (?P<bare>(?:[^\s{}()=;,"/]|/(?![*/]))+)
+''', re.S | re.X)
+
+_TOKEN_BYTES = re.compile(_TOKEN.pattern.encode('ascii'), re.S | re.X)
+
+_SAFE = re.compile(r'[A-Za-z0-9_$/:.]+\Z')
+_ESCAPE = re.compile(r'\\(U[0-9A-Fa-f]{4}|.)', re.S)
+_UNESCAPES = {'n': '\n', 't': '\t', 'r': '\r', '"': '"', '\\': '\\', "'": "'"}
+
+_DELETED = object()
+
+
+class PBXParseError(ValueError):
+    """Raised when project.pbxproj text is not a valid OpenStep plist"""
+
+
+def quote(value):
+    """Render a string the way Xcode does, quoting only when required"""
+    if _SAFE.match(value) and '___' not in value and '//' not in value:
+        return value
+    value = (value.replace('\\', '\\\\').replace('"', '\\"')
+             .replace('\n', '\\n').replace('\t', '\\t'))
+    return f'"{value}"'
+
+
+def unquote(raw):
+    """Return the value of a scalar as written in the file, quoted or bare"""
+    if raw.startswith('"') and raw.endswith('"') and len(raw) > 1:
+        return _decode('quoted', raw[1:-1])
+    return raw
+
+
+def _unescape(match):
+    code = match.group(1)
+    if code[0] == 'U' and len(code) == 5:
+        return chr(int(code[1:], 16))
+    return _UNESCAPES.get(code, code)
+
+
+def _decode(kind, text):
+    if kind == 'quoted':
+        return _ESCAPE.sub(_unescape, text) if '\\' in text else text
+    return text
+
+
+class Entry:
+    """One `key = value;` pair plus the trivia around each of its tokens"""
+
+    __slots__ = ('value', 'key_raw', 'key_pre', 'eq_pre', 'val_pre', 'val_raw',
+                 'semi_pre', 'post')
+
+    def __init__(self, value):
+        self.value = value
+        self.key_raw = self.key_pre = self.eq_pre = None
+        self.val_pre = self.val_raw = self.semi_pre = self.post = None
+
+
+class Item:
+    """One array element plus its trivia; comma_pre is None when no comma follows"""
+
+    __slots__ = ('value', 'pre', 'raw', 'comma_pre')
+
+    def __init__(self, value, pre=None, raw=None, comma_pre=''):
+        self.value = value
+        self.pre = pre
+        self.raw = raw
+        self.comma_pre = comma_pre
+
+
+class PBXDict:
+    """Ordered mapping that remembers the source formatting of its entries.
+
+    Keys can be placed after or before an existing key in O(1) with
+    insert_after and insert_before, and deleted keys that carried comments
+    (such as section markers) are kept as tombstones so the surrounding
+    layout survives.
+    """
+
+    __slots__ = ('_entries', '_after', '_before', '_anchored', '_len', 'close_pre', 'inline')
+
+    def __init__(self, items=None):
+        self._entries = {}
+        self._after = {}
+        self._before = {}
+        self._anchored = set()
+        self._len = 0
+        self.close_pre = None
+        self.inline = None
+        if items:
+            for key, value in items.items() if hasattr(items, 'items') else items:
+                self[key] = value
+
+    def __len__(self):
+        return self._len
+
+    def __contains__(self, key):
+        entry = self._entries.get(key)
+        return entry is not None and entry.value is not _DELETED
+
+    def __getitem__(self, key):
+        entry = self._entries.get(key)
+        if entry is None or entry.value is _DELETED:
+            raise KeyError(key)
+        return entry.value
+
+    def get(self, key, default=None):
+        entry = self._entries.get(key)
+        if entry is None or entry.value is _DELETED:
+            return default
+        return entry.value
+
+    def __setitem__(self, key, value):
+        value = wrap(value)
+        entry = self._entries.get(key)
+        if entry is None:
+            self._entries[key] = Entry(value)
+            self._len += 1
+            return
+        if entry.value is _DELETED:
+            self._len += 1
+        elif entry.value == value or entry.value is value:
+            return
+        entry.value = value
+        entry.val_raw = entry.val_pre = entry.semi_pre = None
+
+    def insert_after(self, anchor, key, value):
+        """Add key so that it serializes directly after anchor"""
+        if key in self._entries:
+            raise KeyError(f"{key} already present")
+        self[key] = value
+        self._anchored.add(key)
+        self._after.setdefault(anchor, []).append(key)
+
+    def insert_before(self, anchor, key, value):
+        """Add key so that it serializes directly before anchor, after keys inserted there earlier"""
+        if key in self._entries:
+            raise KeyError(f"{key} already present")
+        self[key] = value
+        self._anchored.add(key)
+        self._before.setdefault(anchor, []).append(key)
+
+    def __delitem__(self, key):
+        entry = self._entries.get(key)
+        if entry is None or entry.value is _DELETED:
+            raise KeyError(key)
+        self._len -= 1
+        if (self._after.get(key) or self._before.get(key) or (entry.key_pre and '/*' in entry.key_pre)
+                or entry.post):
+            entry.value = _DELETED
+        else:
+            del self._entries[key]
+            self._anchored.discard(key)
+
+    def pop(self, key, *default):
+        if key not in self:
+            if default:
+                return default[0]
+            raise KeyError(key)
+        value = self[key]
+        del self[key]
+        return value
+
+    def entry(self, key):
+        """Return the raw Entry for key, including its trivia"""
+        return self._entries[key]
+
+    def _walk(self, key):
+        # Depth-first without recursion: runs of insert_after calls can be arbitrarily long.
+        # A key is expanded into (keys inserted before it, itself, keys inserted after it).
+        after, before = self._after, self._before
+        stack = [(key, False)]
+        while stack:
+            key, expanded = stack.pop()
+            if expanded:
+                yield key
+                continue
+            stack.extend((k, False) for k in reversed(after.get(key, ())))
+            stack.append((key, True))
+            stack.extend((k, False) for k in reversed(before.get(key, ())))
+
+    def iter_entries(self, deleted=False):
+        """Yield (key, Entry) in serialization order"""
+        anchored = self._anchored
+        entries = self._entries
+        if not self._after and not self._before:
+            # Nothing inserted out of order: plain dict order, no walking
+            for key, entry in list(entries.items()):
+                if deleted or entry.value is not _DELETED:
+                    yield key, entry
+            return
+        for key in list(entries):
+            if key in anchored:
+                continue
+            for k in self._walk(key) if key in self._after or key in self._before else (key,):
+                entry = entries.get(k)
+                if entry is not None and (deleted or entry.value is not _DELETED):
+                    yield k, entry
+
+    def __iter__(self):
+        for key, _ in self.iter_entries():
+            yield key
+
+    def keys(self):
+        return list(self)
+
+    def values(self):
+        return [entry.value for _, entry in self.iter_entries()]
+
+    def items(self):
+        return [(key, entry.value) for key, entry in self.iter_entries()]
+
+    def __eq__(self, other):
+        if isinstance(other, PBXDict):
+            return self.items() == other.items()
+        if isinstance(other, dict):
+            return dict(self.items()) == other
+        return NotImplemented
+
+    def __repr__(self):
+        return f"PBXDict({dict(self.items())!r})"
+
+
+class PBXArray:
+    """List of values that remembers the source formatting of its items"""
+
+    __slots__ = ('_items', 'close_pre', 'inline')
+
+    def __init__(self, values=()):
+        self._items = [Item(wrap(v), comma_pre=None) for v in values]
+        self.close_pre = None
+        self.inline = None
+
+    def __len__(self):
+        return len(self._items)
+
+    def __iter__(self):
+        return (item.value for item in self._items)
+
+    def __getitem__(self, index):
+        return self._items[index].value
+
+    def __contains__(self, value):
+        return any(item.value == value for item in self._items)
+
+    def index(self, value):
+        for i, item in enumerate(self._items):
+            if item.value == value:
+                return i
+        raise ValueError(value)
+
+    def append(self, value):
+        self._items.append(Item(wrap(value), comma_pre=None))
+
+    def extend(self, values):
+        self._items.extend(Item(wrap(v), comma_pre=None) for v in values)
+
+    def insert(self, index, value):
+        self._items.insert(index, Item(wrap(value), comma_pre=None))
+
+    def remove(self, value):
+        del self._items[self.index(value)]
+
+    def remove_all(self, values):
+        """Drop every item contained in the set values in one pass"""
+        before = len(self._items)
+        self._items = [item for item in self._items if item.value not in values]
+        return before - len(self._items)
+
+    def items(self):
+        return self._items
+
+    def __eq__(self, other):
+        if isinstance(other, (PBXArray, list, tuple)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __repr__(self):
+        return f"PBXArray({list(self)!r})"
+
+
+def wrap(value):
+    """Convert plain dicts and lists into PBXDict/PBXArray recursively"""
+    if isinstance(value, (PBXDict, PBXArray, str)):
+        return value
+    if isinstance(value, dict):
+        return PBXDict(value)
+    if isinstance(value, (list, tuple)):
+        return PBXArray(value)
+    if isinstance(value, (int, float)):
+        return str(value)
+    raise TypeError(f"unsupported pbxproj value {value!r}")
+
+
+def _tokenize(text):
+    """Yield (kind, raw, decoded, leading_trivia); ends with an 'eof' token.
+
+    text is a str, or UTF-8 bytes in any buffer (bytes, mmap) whose tokens
+    are decoded as they are matched.
+    """
+    if not isinstance(text, str):
+        yield from _tokenize_buffer(text)
+        return
+    match = _TOKEN.match
+    pos = 0
+    end = len(text)
+    pre = ''
+    while pos < end:
+        m = match(text, pos)
+        if m is None:
+            raise PBXParseError(f"unexpected character {text[pos]!r} at offset {pos}")
+        pos = m.end()
+        kind = m.lastgroup
+        if kind == 'trivia':
+            pre = m.group(0)
+            continue
+        raw = m.group(0)
+        if kind == 'punct':
+            yield raw, raw, raw, pre
+        else:
+            yield 'string', raw, _decode(kind, m.group(kind)), pre
+        pre = ''
+    yield 'eof', '', '', pre
+
+
+def _tokenize_buffer(buffer):
+    match = _TOKEN_BYTES.match
+    pos = 0
+    end = len(buffer)
+    pre = ''
+    while pos < end:
+        m = match(buffer, pos)
+        if m is None:
+            raise PBXParseError(f"unexpected character {buffer[pos:pos + 1]!r} at offset {pos}")
+        pos = m.end()
+        kind = m.lastgroup
+        if kind == 'trivia':
+            pre = m.group(0).decode('utf-8')
+            continue
+        raw = m.group(0).decode('utf-8')
+        if kind == 'punct':
+            yield raw, raw, raw, pre
+        elif kind == 'quoted':
+            yield 'string', raw, _decode(kind, raw[1:-1]), pre
+        else:
+            yield 'string', raw, raw, pre
+        pre = ''
+    yield 'eof', '', '', pre
+
+
+class _Parser:
+
+    def __init__(self, text):
+        self._tokens = _tokenize(text)
+        self._advance()
+
+    def _advance(self):
+        self.kind, self.raw, self.value, self.pre = next(self._tokens)
+
+    def _expect(self, kind):
+        if self.kind != kind:
+            raise PBXParseError(f"expected {kind!r}, found {self.raw or self.kind!r}")
+        pre = self.pre
+        self._advance()
+        return pre
+
+    def parse_value(self):
+        """Parse one value; returns (value, leading_trivia, raw_scalar)"""
+        pre = self.pre
+        if self.kind == '{':
+            self._advance()
+            return self._dict(), pre, None
+        if self.kind == '(':
+            self._advance()
+            return self._array(), pre, None
+        if self.kind == 'string':
+            raw, value = self.raw, self.value
+            self._advance()
+            return value, pre, raw
+        raise PBXParseError(f"unexpected {self.raw or self.kind!r}")
+
+    def _dict(self):
+        node = PBXDict()
+        entries = node._entries
+        while self.kind != '}':
+            if self.kind != 'string':
+                raise PBXParseError(f"expected key, found {self.raw or self.kind!r}")
+            key, key_raw, key_pre = self.value, self.raw, self.pre
+            self._advance()
+            eq_pre = self._expect('=')
+            value, val_pre, val_raw = self.parse_value()
+            entry = Entry(value)
+            entry.key_raw, entry.key_pre, entry.eq_pre = key_raw, key_pre, eq_pre
+            entry.val_pre, entry.val_raw = val_pre, val_raw
+            entry.semi_pre = self._expect(';')
+            entry.post = ''
+            if key not in entries:
+                node._len += 1
+            entries[key] = entry
+        node.close_pre = self._expect('}')
+        node.inline = '\n' not in node.close_pre
+        return node
+
+    def _array(self):
+        node = PBXArray()
+        items = node._items
+        while self.kind != ')':
+            value, pre, raw = self.parse_value()
+            item = Item(value, pre, raw, None)
+            items.append(item)
+            if self.kind == ',':
+                item.comma_pre = self._expect(',')
+            elif self.kind != ')':
+                raise PBXParseError(f"expected ',' or ')', found {self.raw or self.kind!r}")
+        node.close_pre = self._expect(')')
+        node.inline = '\n' not in node.close_pre
+        return node
+
+    def document(self):
+        root, pre, _ = self.parse_value()
+        if not isinstance(root, PBXDict):
+            raise PBXParseError("project root must be a dictionary")
+        if self.kind != 'eof':
+            raise PBXParseError(f"unexpected {self.raw!r} after project root")
+        return pre, root, self.pre
+
+
+class _Writer:
+    """Serializes a PBXDict tree, reusing recorded trivia wherever it is still valid"""
+
+    INLINE_ISA = ('PBXBuildFile', 'PBXFileReference')
+
+    def __init__(self, annotate):
+        self.annotate = annotate
+        self.parts = []
+
+    def comment(self, value):
+        name = self.annotate(value) if isinstance(value, str) else None
+        return f' /* {name} */' if name else ''
+
+    def scalar(self, value, raw):
+        if raw is not None:
+            return raw
+        return quote(value)
+
+    def write(self, value, depth, inline, raw=None):
+        if isinstance(value, PBXDict):
+            self.write_dict(value, depth, inline)
+        elif isinstance(value, PBXArray):
+            self.write_array(value, depth, inline)
+        else:
+            self.parts.append(self.scalar(value, raw))
+
+    def write_dict(self, node, depth, inline, objects=False):
+        out = self.parts.append
+        inline = node.inline if node.inline is not None else inline
+        out('{')
+        first = True
+        for key, entry in node.iter_entries(deleted=True):
+            if entry.value is _DELETED:
+                pre = entry.key_pre or ''
+                out(pre[:pre.rfind('\n')] if '\n' in pre else '')
+                out(entry.post or '')
+                continue
+            if entry.key_pre is not None:
+                out(entry.key_pre)
+            elif inline:
+                out('' if first else ' ')
+            else:
+                out('\n' + '\t' * (depth + 1))
+            first = False
+            out(entry.key_raw if entry.key_raw is not None else quote(key))
+            value = entry.value
+            child_inline = inline
+            if objects:
+                child_inline = (isinstance(value, PBXDict)
+                                and value.get('isa') in self.INLINE_ISA)
+            if entry.eq_pre is not None:
+                out(entry.eq_pre)
+            else:
+                out((self.comment(key) if objects else '') + ' ')
+            out('=')
+            out(entry.val_pre if entry.val_pre is not None else ' ')
+            self.write(value, depth + 1, child_inline, entry.val_raw)
+            if entry.semi_pre is not None:
+                out(entry.semi_pre)
+            elif not objects:
+                out(self.comment(value))
+            out(';')
+            if entry.post:
+                out(entry.post)
+        if node.close_pre is not None:
+            out(node.close_pre)
+        else:
+            out(' ' if inline else '\n' + '\t' * depth)
+        out('}')
+
+    def write_array(self, node, depth, inline):
+        out = self.parts.append
+        inline = node.inline if node.inline is not None else inline
+        out('(')
+        for item in node._items:
+            if item.pre is not None:
+                out(item.pre)
+            else:
+                out(' ' if inline else '\n' + '\t' * (depth + 1))
+            self.write(item.value, depth + 1, inline, item.raw)
+            if item.comma_pre is not None:
+                out(item.comma_pre)
+            else:
+                out(self.comment(item.value))
+            out(',')
+        if node.close_pre is not None:
+            out(node.close_pre)
+        else:
+            out(' ' if inline else '\n' + '\t' * depth)
+        out(')')
+
+
+def insert_sorted(array, values, order):
+    """Insert values into a PBXArray kept in order(value) order"""
+    keys = [order(value) for value in array]
+    for value in sorted(values, key=order):
+        key = order(value)
+        index = bisect.bisect_right(keys, key)
+        keys.insert(index, key)
+        array.insert(index, value)
+
+
+def _join(parent, child):
+    return f"{parent}/{child}" if parent else child
+
+
+class Project:
+    """project.pbxproj loaded as an object graph indexed by UUID and by isa"""
+
+    def __init__(self, root, header=HEADER, trailing='\n'):
+        self.root = root
+        self.header = header
+        self.trailing = trailing
+        if 'objects' not in root:
+            root['objects'] = PBXDict()
+        self.objects = root['objects']
+        self.by_isa = {}
+        # isa sections whose by_isa order no longer follows the file, after add_object(before=...)
+        self._unordered = set()
+        self._phase_of = None
+        for uuid, obj in self.objects.items():
+            self.by_isa.setdefault(obj.get('isa'), {})[uuid] = obj
+
+    @classmethod
+    def parse(cls, text):
+        header, root, trailing = _Parser(text).document()
+        return cls(root, header, trailing)
+
+    @classmethod
+    def load(cls, path):
+        """Parse the file at path through a read-only memory map"""
+        with open(path, 'rb') as f:
+            st = os.fstat(f.fileno())
+            if not st.st_size or not stat.S_ISREG(st.st_mode):
+                # Nothing to map: empty files, pipes
+                return cls.parse(f.read())
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                return cls.parse(buffer)
+
+    @property
+    def root_object(self):
+        return self.objects.get(self.root.get('rootObject'))
+
+    def get(self, uuid, default=None):
+        return self.objects.get(uuid, default)
+
+    def __contains__(self, uuid):
+        return uuid in self.objects
+
+    def objects_of(self, isa):
+        """Return {uuid: object} for every object of the given isa, in file order"""
+        if isa in self._unordered:
+            self._reorder(isa)
+        return self.by_isa.get(isa, {})
+
+    def _reorder(self, isa):
+        self.by_isa[isa] = {uuid: obj for uuid, obj in self.objects.items() if obj.get('isa') == isa}
+        self._unordered.discard(isa)
+
+    def find(self, isa, **fields):
+        """Return the first (uuid, object) of isa whose fields all match"""
+        for uuid, obj in self.objects_of(isa).items():
+            if all(obj.get(k) == v for k, v in fields.items()):
+                return uuid, obj
+        return None, None
+
+    def walk_groups(self):
+        """Yield (uuid, group, key_path, dir_path) for mainGroup and every group below it.
+
+        key_path names the group by its position in the tree (path or name of
+        each ancestor); dir_path is the directory its children are relative to.
+        """
+        root = self.root_object
+        main = root.get('mainGroup') if root else None
+        stack = [(main, '', '')] if main else []
+        while stack:
+            uuid, key_path, dir_path = stack.pop()
+            group = self.get(uuid)
+            yield uuid, group, key_path, dir_path
+            for child_uuid in reversed(group.get('children', ())):
+                child = self.get(child_uuid)
+                if child is None or child.get('isa') not in ('PBXGroup', 'PBXVariantGroup'):
+                    continue
+                path = child.get('path')
+                component = path or child.get('name') or ''
+                child_dir = dir_path
+                if path:
+                    child_dir = path if child.get('sourceTree') == 'SOURCE_ROOT' else _join(dir_path, path)
+                stack.append((child_uuid, _join(key_path, component), child_dir))
+
+    def group_paths(self):
+        """Return {group uuid: key_path} for every reachable group"""
+        return {uuid: key_path for uuid, _, key_path, _ in self.walk_groups()}
+
+    def file_paths(self):
+        """Return {file reference uuid: path relative to the project directory}"""
+        paths = {}
+        for _, group, _, dir_path in self.walk_groups():
+            for child_uuid in group.get('children', ()):
+                child = self.get(child_uuid)
+                if child is None or child.get('isa') != 'PBXFileReference':
+                    continue
+                path = child.get('path')
+                tree = child.get('sourceTree')
+                if path and tree == '<group>':
+                    paths[child_uuid] = _join(dir_path, path)
+                elif path and tree == 'SOURCE_ROOT':
+                    paths[child_uuid] = path
+        return paths
+
+    def add_object(self, uuid, obj, before=None):
+        """Insert obj at the end of its isa section, creating the section if needed.
+
+        With before, the UUID of an object in the same section, obj goes
+        directly in front of that object instead. Adding a run of objects in
+        file order costs one pass over the project at most, for the first
+        object appended after them.
+        """
+        obj = wrap(obj)
+        isa = obj['isa']
+        if uuid in self.objects:
+            raise KeyError(f"object {uuid} already exists")
+        section = self.by_isa.setdefault(isa, {})
+        if before is not None:
+            if before not in section:
+                raise KeyError(f"object {before} is not in the {isa} section")
+            self.objects.insert_before(before, uuid, obj)
+            # a section's Begin marker stays in front of its first object
+            anchor_entry = self.objects.entry(before)
+            if anchor_entry.key_pre and '/*' in anchor_entry.key_pre:
+                self.objects.entry(uuid).key_pre, anchor_entry.key_pre = anchor_entry.key_pre, None
+            self._unordered.add(isa)
+        elif section:
+            if isa in self._unordered:
+                self._reorder(isa)
+                section = self.by_isa[isa]
+            anchor = next(reversed(section))
+            self.objects.insert_after(anchor, uuid, obj)
+            # keep the section's End marker after the new last object
+            anchor_entry = self.objects.entry(anchor)
+            entry = self.objects.entry(uuid)
+            entry.post, anchor_entry.post = anchor_entry.post, ''
+        else:
+            self.objects[uuid] = obj
+            entry = self.objects.entry(uuid)
+            entry.key_pre = f'\n\n/* Begin {isa} section */\n\t\t'
+            entry.post = f'\n/* End {isa} section */'
+        section[uuid] = obj
+        return obj
+
+    def add_sorted(self, additions, order):
+        """Add {uuid: object} to their isa sections, each where order(uuid) puts it.
+
+        Sections are taken to be in order() order already; the keys of their
+        objects are computed once, so a batch costs one pass per section.
+        """
+        by_isa = {}
+        for uuid, obj in additions.items():
+            by_isa.setdefault(obj['isa'], []).append(uuid)
+        for isa, uuids in by_isa.items():
+            existing = list(self.objects_of(isa))
+            keys = [order(uuid) for uuid in existing]
+            for uuid in sorted(uuids, key=order):
+                index = bisect.bisect_right(keys, order(uuid))
+                self.add_object(uuid, additions[uuid], before=existing[index] if index < len(existing) else None)
+
+    def remove_object(self, uuid):
+        """Delete an object and drop it from the isa index"""
+        obj = self.objects.pop(uuid)
+        section = self.by_isa.get(obj.get('isa'))
+        if section is not None:
+            section.pop(uuid, None)
+        return obj
+
+    def annotation(self, uuid):
+        """Return the comment Xcode writes next to a reference to uuid"""
+        obj = self.objects.get(uuid)
+        if not isinstance(obj, PBXDict):
+            return None
+        isa = obj.get('isa')
+        if isa == 'PBXBuildFile':
+            ref = obj.get('fileRef') or obj.get('productRef')
+            name = self.annotation(ref) if ref else None
+            return f"{name} in {self._phase_name(uuid)}" if name else None
+        if isa == 'PBXProject':
+            return 'Project object'
+        if isa == 'XCConfigurationList':
+            return None
+        if isa in ('PBXContainerItemProxy', 'PBXTargetDependency'):
+            return isa
+        if isa and isa.endswith('BuildPhase'):
+            return obj.get('name') or isa[3:-len('BuildPhase')]
+        name = obj.get('name') or obj.get('path')
+        return name.rsplit('/', 1)[-1] if name else None
+
+    def _phase_name(self, build_uuid):
+        if self._phase_of is None:
+            self._phase_of = {}
+            for isa, objs in self.by_isa.items():
+                if not isa or not isa.endswith('BuildPhase'):
+                    continue
+                for phase_uuid, phase in objs.items():
+                    for file_uuid in phase.get('files', ()):
+                        self._phase_of[file_uuid] = phase_uuid
+        phase_uuid = self._phase_of.get(build_uuid)
+        return self.annotation(phase_uuid) if phase_uuid else 'Sources'
+
+    def iter_chunks(self):
+        """Yield the serialized project in pieces suitable for write_stream"""
+        self._phase_of = None
+        writer = _Writer(self.annotation)
+        out = writer.parts.append
+        out(self.header)
+        out('{')
+        for key, entry in self.root.iter_entries():
+            out(entry.key_pre if entry.key_pre is not None else '\n\t')
+            out(entry.key_raw if entry.key_raw is not None else quote(key))
+            out(entry.eq_pre if entry.eq_pre is not None else ' ')
+            out('=')
+            out(entry.val_pre if entry.val_pre is not None else ' ')
+            if entry.value is self.objects:
+                writer.write_dict(entry.value, 1, False, objects=True)
+            else:
+                writer.write(entry.value, 1, False, entry.val_raw)
+            out(entry.semi_pre if entry.semi_pre is not None else writer.comment(entry.value))
+            out(';')
+            yield ''.join(writer.parts)
+            writer.parts.clear()
+        out(self.root.close_pre if self.root.close_pre is not None else '\n')
+        out('}')
+        out(self.trailing)
+        yield ''.join(writer.parts)
+
+    def dumps(self):
+        return ''.join(self.iter_chunks())
+
+    def save(self, path):
+        """Write the project to path if it changed; returns True if it was written"""
+        return write_stream(path, self.iter_chunks())
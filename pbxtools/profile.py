@@ -0,0 +1,259 @@
+"""
+Opt-in phase profiler for the generators
+
+Call sites mark coarse phases with `with profile.phase('scan'):` and wrap
+lazily consumed iterators with profile.timed('render', chunks), so time
+spent producing chunks is told apart from time spent writing them. Until
+enable() is called, phase() hands out one shared null context, timed() and
+counted() return their argument unchanged, and nothing is measured.
+
+When enabled, each phase records its wall time and, through tracemalloc,
+the bytes it left allocated and its peak above its starting point (nested
+phases included). Object counts by isa are collected from the rendered
+sections or a parsed project. finish() writes a JSON report and a Chrome
+trace (chrome://tracing, Perfetto) and returns the report.
+"""
+
+import contextlib
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+
+_NULL = contextlib.nullcontext()
+_active = None
+
+
+class _Phase:
+    __slots__ = ('name', 'depth', 'start', 'wall', 'alloc', 'peak', 'calls', 'end')
+
+    def __init__(self, name, depth, start):
+        self.name = name
+        self.depth = depth
+        self.start = start
+        self.end = start
+        self.wall = 0
+        self.alloc = None
+        self.peak = None
+        self.calls = 0
+
+
+class Profiler:
+    """Phase timings, allocations and object counts for one run"""
+
+    def __init__(self, memory=True):
+        self.memory = memory
+        self.phases = []
+        self.objects = {}
+        self._accumulated = {}
+        self._stack = []
+        self._origin = time.perf_counter_ns()
+        self._started = time.time()
+        # Only stop tracing in finish() if it was not already on
+        self.owns_tracing = memory and not tracemalloc.is_tracing()
+        if self.owns_tracing:
+            tracemalloc.start()
+
+    def _now(self):
+        return time.perf_counter_ns() - self._origin
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        """Measure the enclosed block as one phase, nested in any open one"""
+        record = _Phase(name, len(self._stack), self._now())
+        self.phases.append(record)
+        if self.memory:
+            current, peak = tracemalloc.get_traced_memory()
+            if self._stack:
+                parent = self._stack[-1]
+                # The parent's peak so far, before it is reset for this phase
+                parent[1] = max(parent[1], peak)
+            tracemalloc.reset_peak()
+            frame = [current, current]
+        else:
+            frame = [0, 0]
+        self._stack.append(frame)
+        try:
+            yield
+        finally:
+            self._stack.pop()
+            record.end = self._now()
+            record.wall = record.end - record.start
+            record.calls = 1
+            if self.memory:
+                current, peak = tracemalloc.get_traced_memory()
+                peak = max(frame[1], peak)
+                record.alloc = current - frame[0]
+                record.peak = peak - frame[0]
+                if self._stack:
+                    parent = self._stack[-1]
+                    parent[1] = max(parent[1], peak)
+                tracemalloc.reset_peak()
+
+    def timed(self, name, iterable):
+        """Yield from iterable, adding the time spent inside it to phase name"""
+        record = self._accumulated.get(name)
+        if record is None:
+            record = self._accumulated[name] = _Phase(name, len(self._stack), None)
+            self.phases.append(record)
+        clock = time.perf_counter_ns
+        iterator = iter(iterable)
+        while True:
+            start = clock()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                self._add(record, start, clock())
+                return
+            self._add(record, start, clock())
+            yield item
+
+    def _add(self, record, start, end):
+        start -= self._origin
+        end -= self._origin
+        if record.start is None:
+            record.start = start
+        record.end = end
+        record.wall += end - start
+        record.calls += 1
+
+    def counted(self, sections):
+        """Wrap (isa, objects) pairs so every object passing through is counted"""
+        return [(isa, self._count(isa, objects)) for isa, objects in sections]
+
+    def _count(self, isa, objects):
+        n = 0
+        for obj in objects:
+            n += 1
+            yield obj
+        if n:
+            self.objects[isa] = self.objects.get(isa, 0) + n
+
+    def count_project(self, project):
+        """Record the object counts of a parsed Project"""
+        for isa, objects in project.by_isa.items():
+            if isa:
+                self.objects[isa] = self.objects.get(isa, 0) + len(objects)
+
+    def report(self):
+        """Return the report as plain JSON values"""
+        ms = 1e-6
+        phases = []
+        for record in sorted(self.phases, key=lambda r: (r.start if r.start is not None else 0)):
+            entry = {
+                'name': record.name,
+                'depth': record.depth,
+                'start_ms': round((record.start or 0) * ms, 3),
+                'wall_ms': round(record.wall * ms, 3),
+                'calls': record.calls,
+            }
+            if record.alloc is not None:
+                entry['alloc_bytes'] = record.alloc
+                entry['peak_bytes'] = record.peak
+            phases.append(entry)
+        return {
+            'command': sys.argv,
+            'started': time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(self._started)),
+            'tracemalloc': self.memory,
+            'total_ms': round(self._now() * ms, 3),
+            'phases': phases,
+            'objects': dict(sorted(self.objects.items())),
+            'objects_total': sum(self.objects.values()),
+        }
+
+    def trace(self):
+        """Return the phases as Chrome trace events"""
+        pid, tid = os.getpid(), threading.get_ident()
+        events = [{'name': 'process_name', 'ph': 'M', 'pid': pid, 'tid': tid,
+                   'args': {'name': os.path.basename(sys.argv[0]) or 'python'}}]
+        for record in self.phases:
+            if record.start is None:
+                continue
+            args = {'calls': record.calls}
+            if record.alloc is not None:
+                args.update(alloc_bytes=record.alloc, peak_bytes=record.peak)
+            # Accumulated phases span their first to last call; busy_ms is the time spent inside
+            dur = record.end - record.start
+            if dur != record.wall:
+                args['busy_ms'] = round(record.wall * 1e-6, 3)
+            events.append({'name': record.name, 'cat': 'phase', 'ph': 'X', 'pid': pid, 'tid': tid,
+                           'ts': record.start / 1000, 'dur': dur / 1000, 'args': args})
+        if self.objects:
+            events.append({'name': 'objects', 'ph': 'C', 'pid': pid, 'tid': tid,
+                           'ts': self._now() / 1000, 'args': dict(self.objects)})
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+    def summary(self):
+        """Return a short human-readable table of the phases"""
+        lines = []
+        for entry in self.report()['phases']:
+            name = '  ' * entry['depth'] + entry['name']
+            line = f"  {name:<24}{entry['wall_ms']:>10.1f} ms"
+            if entry['calls'] > 1:
+                line += f"  ({entry['calls']} calls)"
+            if 'alloc_bytes' in entry:
+                line += f"  {entry['alloc_bytes'] / 1048576:+8.1f} MiB  peak {entry['peak_bytes'] / 1048576:.1f} MiB"
+            lines.append(line)
+        if self.objects:
+            lines.append(f"  objects: {sum(self.objects.values())} "
+                         f"({', '.join(f'{isa} {n}' for isa, n in sorted(self.objects.items()))})")
+        return '\n'.join(lines)
+
+
+def enable(memory=True):
+    """Start profiling this process; returns the Profiler"""
+    global _active
+    _active = Profiler(memory)
+    return _active
+
+
+def active():
+    """Return the running Profiler, or None"""
+    return _active
+
+
+def phase(name):
+    """Context manager measuring one phase, or a no-op when profiling is off"""
+    if _active is None:
+        return _NULL
+    return _active.phase(name)
+
+
+def timed(name, iterable):
+    """iterable, timed as phase name when profiling is on"""
+    if _active is None:
+        return iterable
+    return _active.timed(name, iterable)
+
+
+def counted(sections):
+    """(isa, objects) pairs, counted when profiling is on"""
+    if _active is None:
+        return sections
+    return _active.counted(sections)
+
+
+def count_project(project):
+    """Record a parsed project's objects when profiling is on"""
+    if _active is not None:
+        _active.count_project(project)
+
+
+def finish(prefix):
+    """Stop profiling and write PREFIX.json and PREFIX.trace.json.
+
+    Returns the Profiler, or None if profiling was off.
+    """
+    global _active
+    profiler, _active = _active, None
+    if profiler is None:
+        return None
+    if profiler.owns_tracing:
+        tracemalloc.stop()
+    for path, data in ((f"{prefix}.json", profiler.report()), (f"{prefix}.trace.json", profiler.trace())):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=1)
+            f.write('\n')
+    return profiler
@@ -0,0 +1,267 @@
+"""
+Source discovery for the project generators
+
+Directories are read with os.scandir and pruned with .gitignore-style rules
+before they are ever entered, so DerivedData, .build and .git cost
+nothing. Bundle directories such as asset catalogs are never entered
+either: they are reported like files, filtered by suffix like files, and
+suffixes match whatever the case of the name. scan() fans directories
+out over a thread pool, which mostly helps on network filesystems where
+each listing is a round trip; iter_files() is the sequential, streaming
+equivalent. Both return paths relative to the root in the same order:
+entries sorted by name, directories expanded in place.
+"""
+
+import os
+import re
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+DEFAULT_IGNORES = (
+    '.git/',
+    '.build/',
+    '.swiftpm/',
+    'DerivedData/',
+    'build/',
+    'Pods/',
+    'Carthage/',
+    '*.xcodeproj/',
+    '*.xcworkspace/',
+    '.DS_Store',
+)
+
+# Directories that are one item to Xcode, e.g. an asset catalog
+PACKAGE_SUFFIXES = ('.xcassets', '.lproj', '.bundle', '.framework', '.xcframework', '.xcdatamodeld')
+
+DEFAULT_WORKERS = 16
+
+
+def _translate(pattern):
+    """Translate one gitignore glob into a regular expression body"""
+    out = []
+    i, n = 0, len(pattern)
+    while i < n:
+        c = pattern[i]
+        if c == '*':
+            if pattern.startswith('**/', i):
+                out.append('(?:.*/)?')
+                i += 3
+                continue
+            if pattern.startswith('**', i):
+                out.append('.*')
+                i += 2
+                continue
+            out.append('[^/]*')
+        elif c == '?':
+            out.append('[^/]')
+        elif c == '[':
+            end = pattern.find(']', i + 1)
+            if end == -1:
+                out.append(re.escape(c))
+            else:
+                body = pattern[i + 1:end]
+                if body.startswith('!'):
+                    body = '^' + body[1:]
+                out.append(f'[{body}]')
+                i = end
+        elif c == '\\' and i + 1 < n:
+            i += 1
+            out.append(re.escape(pattern[i]))
+        else:
+            out.append(re.escape(c))
+        i += 1
+    return ''.join(out)
+
+
+def compile_rule(pattern, base=''):
+    """Compile a gitignore line into (regex, negate, dir_only, base), or None"""
+    pattern = pattern.rstrip('\n')
+    if not pattern.strip() or pattern.startswith('#'):
+        return None
+    pattern = pattern.rstrip(' ')
+    negate = pattern.startswith('!')
+    if negate:
+        pattern = pattern[1:]
+    dir_only = pattern.endswith('/')
+    pattern = pattern.rstrip('/')
+    anchored = '/' in pattern
+    pattern = pattern.lstrip('/')
+    body = _translate(pattern)
+    if not anchored:
+        body = '(?:.*/)?' + body
+    return re.compile(body + r'\Z'), negate, dir_only, base
+
+
+class IgnoreRules:
+    """Immutable, ordered gitignore rule list; the last matching rule wins"""
+
+    __slots__ = ('_rules',)
+
+    def __init__(self, patterns=(), base='', _rules=None):
+        if _rules is None:
+            _rules = tuple(r for r in (compile_rule(p, base) for p in patterns) if r)
+        self._rules = _rules
+
+    def extend(self, patterns, base=''):
+        """Return new rules with patterns (relative to base) appended"""
+        added = tuple(r for r in (compile_rule(p, base) for p in patterns) if r)
+        if not added:
+            return self
+        return IgnoreRules(_rules=self._rules + added)
+
+    def ignored(self, path, is_dir):
+        """Return True if path (relative to the scan root) is ignored"""
+        result = False
+        for regex, negate, dir_only, base in self._rules:
+            if dir_only and not is_dir:
+                continue
+            sub = path
+            if base:
+                if not path.startswith(base + '/'):
+                    continue
+                sub = path[len(base) + 1:]
+            if regex.match(sub):
+                result = not negate
+        return result
+
+
+def _read_gitignore(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return f.read().splitlines()
+    except OSError:
+        return ()
+
+
+def _scan_dir(root, rel, rules, suffixes, with_stat, gitignore, packages=PACKAGE_SUFFIXES):
+    """List one directory: returns (sorted entries, rules for its children).
+
+    Each entry is (name, rel_path, is_dir, stat_or_None); ignored entries
+    and files without a wanted suffix are already dropped. Packages come
+    back as files, is_dir False.
+    """
+    directory = os.path.join(root, rel) if rel else root
+    try:
+        with os.scandir(directory) as it:
+            entries = list(it)
+    except OSError:
+        return [], rules
+    if gitignore:
+        for entry in entries:
+            if entry.name == '.gitignore':
+                rules = rules.extend(_read_gitignore(entry.path), rel)
+                break
+    out = []
+    for entry in entries:
+        path = f"{rel}/{entry.name}" if rel else entry.name
+        try:
+            is_dir = entry.is_dir(follow_symlinks=False)
+        except OSError:
+            continue
+        name = entry.name.lower()
+        leaf = not is_dir or name.endswith(packages)
+        if leaf and suffixes and not name.endswith(suffixes):
+            continue
+        if rules.ignored(path, is_dir):
+            continue
+        stat = None
+        if with_stat and leaf:
+            try:
+                st = entry.stat()
+            except OSError:
+                continue
+            stat = (st.st_size, st.st_mtime_ns)
+        out.append((entry.name, path, not leaf, stat))
+    out.sort()
+    return out, rules
+
+
+def scan_order(path):
+    """Sort key putting relative paths in the order scan() and iter_files() list them"""
+    return path.split('/')
+
+
+def _rules_for(ignore):
+    if isinstance(ignore, IgnoreRules):
+        return ignore
+    return IgnoreRules(ignore)
+
+
+def iter_files(root, suffixes=('.swift',), ignore=DEFAULT_IGNORES, gitignore=True, with_stat=False,
+               packages=PACKAGE_SUFFIXES):
+    """Yield matching files one by one, depth first, without collecting them.
+
+    Yields relative paths, or (path, (size, mtime_ns)) when with_stat is set.
+    suffixes=None keeps every file. Memory use is bounded by the depth of
+    the tree, not the number of files.
+    """
+    rules = _rules_for(ignore)
+    stack = [iter([(None, '', True, None, rules)])]
+    while stack:
+        item = next(stack[-1], None)
+        if item is None:
+            stack.pop()
+            continue
+        _, path, is_dir, stat, parent_rules = item
+        if is_dir:
+            entries, child_rules = _scan_dir(root, path, parent_rules, suffixes, with_stat, gitignore, packages)
+            stack.append(iter([(*e, child_rules) for e in entries]))
+        else:
+            yield (path, stat) if with_stat else path
+
+
+def scan(root, suffixes=('.swift',), ignore=DEFAULT_IGNORES, gitignore=True,
+         with_stat=False, workers=DEFAULT_WORKERS, packages=PACKAGE_SUFFIXES):
+    """Return every matching file under root, listing directories in parallel.
+
+    The result is a list of relative paths, or a {path: (size, mtime_ns)}
+    dict when with_stat is set, in the same order iter_files produces.
+    """
+    rules = _rules_for(ignore)
+    listings = {}
+    if workers <= 1:
+        pending = [('', rules)]
+        while pending:
+            rel, dir_rules = pending.pop()
+            entries, child_rules = _scan_dir(root, rel, dir_rules, suffixes, with_stat, gitignore, packages)
+            listings[rel] = entries
+            pending.extend((e[1], child_rules) for e in entries if e[2])
+    else:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(_scan_dir, root, '', rules, suffixes, with_stat, gitignore, packages): ''}
+            while futures:
+                done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                for future in done:
+                    rel = futures.pop(future)
+                    entries, child_rules = future.result()
+                    listings[rel] = entries
+                    for _, path, is_dir, _, in entries:
+                        if is_dir:
+                            futures[pool.submit(_scan_dir, root, path, child_rules,
+                                                suffixes, with_stat, gitignore, packages)] = path
+
+    # Stitch the per-directory listings back together in depth-first order
+    files = {} if with_stat else []
+    stack = [iter(listings.get('', ()))]
+    while stack:
+        entry = next(stack[-1], None)
+        if entry is None:
+            stack.pop()
+            continue
+        _, path, is_dir, stat = entry
+        if is_dir:
+            stack.append(iter(listings.get(path, ())))
+        elif with_stat:
+            files[path] = stat
+        else:
+            files.append(path)
+    return files
+
+
+def find_projects(root, ignore=DEFAULT_IGNORES, gitignore=True):
+    """Return every .xcodeproj directory below root, relative to it, in scan order.
+
+    Projects are reported without being entered; directories the ignore
+    rules and .gitignore files exclude are skipped as in any scan.
+    """
+    ignore = tuple(pattern for pattern in ignore if pattern != '*.xcodeproj/')
+    return scan(root, ('.xcodeproj',), ignore, gitignore, packages=('.xcodeproj',))
@@ -0,0 +1,268 @@
+"""
+Long-running project server
+
+ProjectServer parses project.pbxproj once and answers batched requests on a
+local Unix socket, so an editor hook pays for one round trip instead of
+interpreter startup plus a full parse. Requests and responses are one JSON
+object per line:
+
+    {"ops": [{"op": "add", "paths": ["TripBro/A.swift"]}], "expect_version": 3}
+    {"ok": true, "version": 4, "results": [["TripBro/A.swift"]]}
+
+The operations themselves are supplied by the caller as {name: (function,
+mutates)}; function(project, registry, **arguments) returns a JSON value.
+The built-in "flush" op saves pending changes before the response is sent.
+
+A batch applies completely or not at all. Every batch that mutates bumps
+the version, and a client passing expect_version gets a conflict rather
+than acting on a stale view. Saves are coalesced: the project is written
+`delay` seconds after the last change, and no later than `max_delay` after
+the first unsaved one, always under the project's file lock. If another
+tool rewrote the file in the meantime, it is reloaded and the unsaved
+batches are replayed on top before saving.
+"""
+
+import hashlib
+import json
+import os
+import signal
+import socket
+import socketserver
+import sys
+import tempfile
+import threading
+import time
+
+from .ids import registry_from_project
+from .lock import project_lock
+from .manifest import stat_key
+from .pbxproj import Project
+
+
+def socket_path_for(pbxproj):
+    """Return the default socket of the server for a project.pbxproj path.
+
+    It lives in the temp directory, keyed by the project's absolute path,
+    because socket paths are limited to about a hundred bytes.
+    """
+    digest = hashlib.sha1(os.path.abspath(pbxproj).encode('utf-8')).hexdigest()[:16]
+    return os.path.join(tempfile.gettempdir(), f"pbxtools-{digest}.sock")
+
+
+def request(socket_path, ops, expect_version=None, timeout=30.0):
+    """Send one batch of ops to a running server and return its response.
+
+    Raises OSError when no server listens on socket_path.
+    """
+    payload = {'ops': ops}
+    if expect_version is not None:
+        payload['expect_version'] = expect_version
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        # A blocking connect waits for room in the backlog; a timed one would fail
+        sock.connect(socket_path)
+        sock.settimeout(timeout)
+        sock.sendall(json.dumps(payload).encode('utf-8') + b'\n')
+        with sock.makefile('rb') as f:
+            line = f.readline()
+    if not line:
+        raise ConnectionError(f"{socket_path}: server closed the connection")
+    return json.loads(line)
+
+
+class ProjectServer:
+    """A parsed project plus the bookkeeping for versioned, coalesced writes"""
+
+    def __init__(self, pbxproj, operations, socket_path=None, delay=0.2, max_delay=2.0):
+        self.pbxproj = pbxproj
+        self.operations = operations
+        self.socket_path = socket_path or socket_path_for(pbxproj)
+        self.delay = delay
+        self.max_delay = max_delay
+        self.version = 0
+        self._lock = threading.Lock()
+        self._wake = threading.Condition(self._lock)
+        # Batches applied in memory but not saved yet, oldest first
+        self._pending = []
+        self._first_change = None
+        self._last_change = None
+        self._closed = False
+        self._server = None
+        self._load()
+
+    def _load(self):
+        # Stat first: a write racing the read then shows up as a change
+        self.disk_key = stat_key(self.pbxproj)
+        self.project = Project.load(self.pbxproj)
+        self.registry = registry_from_project(self.project)
+
+    def _apply(self, ops):
+        results = []
+        for op in ops:
+            arguments = dict(op)
+            name = arguments.pop('op', None)
+            if name == 'flush':
+                results.append(None)
+                continue
+            if name not in self.operations:
+                raise ValueError(f"unknown op {name!r}")
+            function, _ = self.operations[name]
+            results.append(function(self.project, self.registry, **arguments))
+        return results
+
+    def _mutates(self, ops):
+        return any(self.operations.get(op.get('op'), (None, False))[1] for op in ops)
+
+    def _rebuild(self):
+        """Reload the project from disk and replay the unsaved batches"""
+        self._load()
+        replayed = []
+        for ops in self._pending:
+            try:
+                self._apply(ops)
+            except (ValueError, KeyError, TypeError) as e:
+                # The file changed under it, e.g. its target is gone
+                print(f"⚠️  Dropped a pending batch after reload: {e}", file=sys.stderr)
+                self._load()
+                for kept in replayed:
+                    self._apply(kept)
+                continue
+            replayed.append(ops)
+        self._pending = replayed
+
+    def _sync(self):
+        """Pick up a version of the file written by another tool"""
+        if stat_key(self.pbxproj) != self.disk_key:
+            self._rebuild()
+            self.version += 1
+
+    def _flush(self):
+        if not self._pending:
+            return
+        with project_lock(self.pbxproj):
+            self._sync()
+            self.project.save(self.pbxproj)
+            self.disk_key = stat_key(self.pbxproj)
+        self._pending = []
+        self._first_change = None
+
+    def handle(self, message):
+        """Apply one decoded request and return the response to send"""
+        ops = message.get('ops')
+        if not isinstance(ops, list) or not all(isinstance(op, dict) for op in ops):
+            return {'ok': False, 'error': "bad request: ops must be a list of objects",
+                    'version': self.version}
+        with self._lock:
+            self._sync()
+            expected = message.get('expect_version')
+            if expected is not None and expected != self.version:
+                return {'ok': False, 'error': 'version conflict', 'version': self.version}
+            mutates = self._mutates(ops)
+            try:
+                results = self._apply(ops)
+            except (ValueError, KeyError, TypeError) as e:
+                if mutates:
+                    # Undo the part of the batch that did apply
+                    self._rebuild()
+                return {'ok': False, 'error': str(e), 'version': self.version}
+            if mutates:
+                now = time.monotonic()
+                self._pending.append(ops)
+                self._first_change = self._first_change or now
+                self._last_change = now
+                self.version += 1
+                self._wake.notify()
+            if any(op.get('op') == 'flush' for op in ops):
+                self._flush()
+            return {'ok': True, 'version': self.version, 'results': results}
+
+    def _flusher(self):
+        with self._lock:
+            while not self._closed:
+                if not self._pending:
+                    self._wake.wait()
+                    continue
+                due = min(self._last_change + self.delay, self._first_change + self.max_delay)
+                remaining = due - time.monotonic()
+                if remaining > 0:
+                    self._wake.wait(remaining)
+                    continue
+                try:
+                    self._flush()
+                except OSError as e:
+                    print(f"❌ Saving {self.pbxproj} failed: {e}", file=sys.stderr)
+                    self._wake.wait(self.max_delay)
+
+    def close(self):
+        """Save anything pending and stop the background writer"""
+        with self._lock:
+            self._flush()
+            self._closed = True
+            self._wake.notify()
+
+    def serve_forever(self):
+        """Listen on socket_path until interrupted (SIGINT or SIGTERM) or shut down"""
+        _claim_socket(self.socket_path)
+        # Only the owner may connect: requests rewrite the project
+        umask = os.umask(0o177)
+        try:
+            server = self._server = _UnixServer(self.socket_path, _Handler)
+        finally:
+            os.umask(umask)
+        server.project_server = self
+        writer = threading.Thread(target=self._flusher, name='pbxproj-writer', daemon=True)
+        writer.start()
+
+        def stop(signum, frame):
+            raise KeyboardInterrupt
+        # Signal handlers can only be set from the main thread
+        if threading.current_thread() is threading.main_thread():
+            signal.signal(signal.SIGTERM, stop)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+            try:
+                os.unlink(self.socket_path)
+            except FileNotFoundError:
+                pass
+            self.close()
+
+    def shutdown(self):
+        """Stop a serve_forever() running in another thread; pending changes are saved"""
+        if self._server is not None:
+            self._server.shutdown()
+
+
+def _claim_socket(path):
+    """Remove a stale socket file, refusing if a live server still owns it"""
+    if not os.path.exists(path):
+        return
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        try:
+            sock.connect(path)
+        except (ConnectionRefusedError, FileNotFoundError):
+            os.unlink(path)
+            return
+    raise RuntimeError(f"a project server is already listening on {path}")
+
+
+class _UnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+    request_queue_size = 128
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self):
+        for line in self.rfile:
+            try:
+                message = json.loads(line)
+            except ValueError as e:
+                response = {'ok': False, 'error': f"bad request: {e}"}
+            else:
+                if isinstance(message, dict):
+                    response = self.server.project_server.handle(message)
+                else:
+                    response = {'ok': False, 'error': "bad request: expected an object"}
+            self.wfile.write(json.dumps(response).encode('utf-8') + b'\n')
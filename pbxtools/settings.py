@@ -0,0 +1,247 @@
+"""
+Layered build settings for the TripBro project
+
+Settings are declared once, as layers: BASE applies to every configuration,
+CONFIGURATIONS adds what differs between Debug and Release, and each target
+has its own layer on top. configurations_for() can add a CompileTiming
+configuration: Debug plus the Swift frontend flags whose output
+pbxtools.buildlog turns into a compile-time report. layered() merges
+layers left to right and is memoized, and BuildSettings renders each
+distinct block once, so identical configurations cost one render however
+many targets use them.
+
+The same layers can instead be written out as .xcconfig files (Base,
+one per configuration, one per target); configurations then point at them
+through baseConfigurationReference and carry no inline settings.
+"""
+
+import functools
+import os
+
+from .model import BuildConfiguration, BuildSettings, ConfigurationList, FileReference, Group
+from .writer import write_stream
+
+XCCONFIG_DIR = 'Configs'
+
+EMPTY = BuildSettings()
+
+BASE = BuildSettings({
+    'ALWAYS_SEARCH_USER_PATHS': 'NO',
+    'ASSETCATALOG_COMPILER_GENERATE_SWIFT_ASSET_SYMBOL_EXTENSIONS': 'YES',
+    'CLANG_ANALYZER_NONNULL': 'YES',
+    'CLANG_ANALYZER_NUMBER_OBJECT_CONVERSION': 'YES_AGGRESSIVE',
+    'CLANG_CXX_LANGUAGE_STANDARD': 'gnu++20',
+    'CLANG_ENABLE_MODULES': 'YES',
+    'CLANG_ENABLE_OBJC_ARC': 'YES',
+    'CLANG_ENABLE_OBJC_WEAK': 'YES',
+    'CLANG_WARN_BLOCK_CAPTURE_AUTORELEASING': 'YES',
+    'CLANG_WARN_BOOL_CONVERSION': 'YES',
+    'CLANG_WARN_COMMA': 'YES',
+    'CLANG_WARN_CONSTANT_CONVERSION': 'YES',
+    'CLANG_WARN_DEPRECATED_OBJC_IMPLEMENTATIONS': 'YES',
+    'CLANG_WARN_DIRECT_OBJC_ISA_USAGE': 'YES_ERROR',
+    'CLANG_WARN_DOCUMENTATION_COMMENTS': 'YES',
+    'CLANG_WARN_EMPTY_BODY': 'YES',
+    'CLANG_WARN_ENUM_CONVERSION': 'YES',
+    'CLANG_WARN_INFINITE_RECURSION': 'YES',
+    'CLANG_WARN_INT_CONVERSION': 'YES',
+    'CLANG_WARN_NON_LITERAL_NULL_CONVERSION': 'YES',
+    'CLANG_WARN_OBJC_IMPLICIT_RETAIN_SELF': 'YES',
+    'CLANG_WARN_OBJC_LITERAL_CONVERSION': 'YES',
+    'CLANG_WARN_OBJC_ROOT_CLASS': 'YES_ERROR',
+    'CLANG_WARN_QUOTED_INCLUDE_IN_FRAMEWORK_HEADER': 'YES',
+    'CLANG_WARN_RANGE_LOOP_ANALYSIS': 'YES',
+    'CLANG_WARN_STRICT_PROTOTYPES': 'YES',
+    'CLANG_WARN_SUSPICIOUS_MOVE': 'YES',
+    'CLANG_WARN_UNGUARDED_AVAILABILITY': 'YES_AGGRESSIVE',
+    'CLANG_WARN_UNREACHABLE_CODE': 'YES',
+    'CLANG_WARN__DUPLICATE_METHOD_MATCH': 'YES',
+    'COPY_PHASE_STRIP': 'NO',
+    'ENABLE_STRICT_OBJC_MSGSEND': 'YES',
+    'GCC_C_LANGUAGE_STANDARD': 'gnu17',
+    'GCC_NO_COMMON_BLOCKS': 'YES',
+    'GCC_WARN_64_TO_32_BIT_CONVERSION': 'YES',
+    'GCC_WARN_ABOUT_RETURN_TYPE': 'YES_ERROR',
+    'GCC_WARN_UNDECLARED_SELECTOR': 'YES',
+    'GCC_WARN_UNINITIALIZED_AUTOS': 'YES_AGGRESSIVE',
+    'GCC_WARN_UNUSED_FUNCTION': 'YES',
+    'GCC_WARN_UNUSED_VARIABLE': 'YES',
+    'IPHONEOS_DEPLOYMENT_TARGET': '17.0',
+    'LOCALIZATION_PREFERS_STRING_CATALOGS': 'YES',
+    'MTL_FAST_MATH': 'YES',
+    'SDKROOT': 'iphoneos',
+})
+
+CONFIGURATIONS = {
+    'Debug': BuildSettings({
+        'DEBUG_INFORMATION_FORMAT': 'dwarf',
+        'ENABLE_TESTABILITY': 'YES',
+        'GCC_DYNAMIC_NO_PIC': 'NO',
+        'GCC_OPTIMIZATION_LEVEL': '0',
+        'GCC_PREPROCESSOR_DEFINITIONS': ('DEBUG=1', '$(inherited)'),
+        'MTL_ENABLE_DEBUG_INFO': 'INCLUDE_SOURCE',
+        'ONLY_ACTIVE_ARCH': 'YES',
+        'SWIFT_ACTIVE_COMPILATION_CONDITIONS': 'DEBUG $(inherited)',
+        'SWIFT_OPTIMIZATION_LEVEL': '-Onone',
+    }),
+    'Release': BuildSettings({
+        'DEBUG_INFORMATION_FORMAT': 'dwarf-with-dsym',
+        'ENABLE_NS_ASSERTIONS': 'NO',
+        'MTL_ENABLE_DEBUG_INFO': 'NO',
+        'SWIFT_COMPILATION_MODE': 'wholemodule',
+        'VALIDATE_PRODUCT': 'YES',
+    }),
+}
+
+# Configuration that reports slow function bodies, and its default warning threshold
+TIMING_CONFIGURATION = 'CompileTiming'
+DEFAULT_TIMING_THRESHOLD_MS = 100
+
+APP_TARGET = BuildSettings({
+    'ASSETCATALOG_COMPILER_APPICON_NAME': 'AppIcon',
+    'ASSETCATALOG_COMPILER_GLOBAL_ACCENT_COLOR_NAME': 'AccentColor',
+    'CODE_SIGN_STYLE': 'Automatic',
+    'CURRENT_PROJECT_VERSION': '1',
+    'DEVELOPMENT_ASSET_PATHS': '',
+    'ENABLE_PREVIEWS': 'YES',
+    'GENERATE_INFOPLIST_FILE': 'YES',
+    'INFOPLIST_KEY_UIApplicationSceneManifest_Generation': 'YES',
+    'INFOPLIST_KEY_UIApplicationSupportsIndirectInputEvents': 'YES',
+    'INFOPLIST_KEY_UILaunchScreen_Generation': 'YES',
+    'INFOPLIST_KEY_UISupportedInterfaceOrientations_iPad': 'UIInterfaceOrientationPortrait UIInterfaceOrientationPortraitUpsideDown UIInterfaceOrientationLandscapeLeft UIInterfaceOrientationLandscapeRight',
+    'INFOPLIST_KEY_UISupportedInterfaceOrientations_iPhone': 'UIInterfaceOrientationPortrait UIInterfaceOrientationLandscapeLeft UIInterfaceOrientationLandscapeRight',
+    'LD_RUNPATH_SEARCH_PATHS': ('$(inherited)', '@executable_path/Frameworks'),
+    'MARKETING_VERSION': '1.0',
+    'PRODUCT_BUNDLE_IDENTIFIER': 'com.tripbro.app',
+    'PRODUCT_NAME': '$(TARGET_NAME)',
+    'SWIFT_EMIT_LOC_STRINGS': 'YES',
+    'SWIFT_VERSION': '5.0',
+    'TARGETED_DEVICE_FAMILY': '1,2',
+})
+
+UNIT_TEST_TARGET = BuildSettings({
+    'BUNDLE_LOADER': '$(TEST_HOST)',
+    'CODE_SIGN_STYLE': 'Automatic',
+    'CURRENT_PROJECT_VERSION': '1',
+    'GENERATE_INFOPLIST_FILE': 'YES',
+    'MARKETING_VERSION': '1.0',
+    'PRODUCT_BUNDLE_IDENTIFIER': 'com.tripbro.app.tests',
+    'PRODUCT_NAME': '$(TARGET_NAME)',
+    'SWIFT_EMIT_LOC_STRINGS': 'NO',
+    'SWIFT_VERSION': '5.0',
+    'TARGETED_DEVICE_FAMILY': '1,2',
+    'TEST_HOST': '$(BUILT_PRODUCTS_DIR)/TripBro.app/$(BUNDLE_EXECUTABLE_FOLDER_PATH)/TripBro',
+})
+
+UI_TEST_TARGET = BuildSettings({
+    'CODE_SIGN_STYLE': 'Automatic',
+    'CURRENT_PROJECT_VERSION': '1',
+    'GENERATE_INFOPLIST_FILE': 'YES',
+    'MARKETING_VERSION': '1.0',
+    'PRODUCT_BUNDLE_IDENTIFIER': 'com.tripbro.app.uitests',
+    'PRODUCT_NAME': '$(TARGET_NAME)',
+    'SWIFT_EMIT_LOC_STRINGS': 'NO',
+    'SWIFT_VERSION': '5.0',
+    'TARGETED_DEVICE_FAMILY': '1,2',
+    'TEST_TARGET_NAME': 'TripBro',
+})
+
+
+@functools.lru_cache(maxsize=None)
+def layered(*layers):
+    """Merge BuildSettings layers left to right, later layers winning"""
+    if len(layers) == 1:
+        return layers[0]
+    merged = {}
+    for layer in layers:
+        merged.update(layer)
+    return BuildSettings(merged)
+
+
+def timing_layer(threshold_ms=DEFAULT_TIMING_THRESHOLD_MS):
+    """Debug plus -debug-time-function-bodies and -warn-long-function-bodies=threshold_ms"""
+    return layered(CONFIGURATIONS['Debug'], BuildSettings({
+        'OTHER_SWIFT_FLAGS': ('$(inherited)', '-Xfrontend', '-debug-time-function-bodies',
+                              '-Xfrontend', f'-warn-long-function-bodies={threshold_ms}'),
+    }))
+
+
+def configurations_for(timing_ms=None):
+    """Return CONFIGURATIONS, plus CompileTiming when timing_ms is a threshold"""
+    if timing_ms is None:
+        return CONFIGURATIONS
+    return {**CONFIGURATIONS, TIMING_CONFIGURATION: timing_layer(timing_ms)}
+
+
+def _xcconfig_value(value):
+    if isinstance(value, tuple):
+        return ' '.join(f'"{v}"' if ' ' in v else v for v in value)
+    return value
+
+
+@functools.lru_cache(maxsize=None)
+def render_xcconfig(settings, includes=()):
+    """Return the text of an .xcconfig file holding settings"""
+    lines = [f'#include "{name}"' for name in includes]
+    lines.extend(f"{key} = {_xcconfig_value(value)}".rstrip() for key, value in settings.items())
+    return '\n'.join(lines) + '\n'
+
+
+def xcconfig_files(targets, configurations=CONFIGURATIONS):
+    """Return {file name: text} for Base, each configuration and each target.
+
+    targets maps target names to their settings layer.
+    """
+    files = {'Base.xcconfig': render_xcconfig(BASE)}
+    for name, layer in configurations.items():
+        files[f"{name}.xcconfig"] = render_xcconfig(layer, ('Base.xcconfig',))
+    for name, layer in targets.items():
+        files[f"{name}.xcconfig"] = render_xcconfig(layer)
+    return files
+
+
+def write_xcconfigs(targets, directory=XCCONFIG_DIR, configurations=CONFIGURATIONS):
+    """Write the .xcconfig files for targets into directory; returns their paths"""
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+    for name, text in xcconfig_files(targets, configurations).items():
+        path = os.path.join(directory, name)
+        write_stream(path, [text])
+        paths.append(path)
+    return paths
+
+
+def xcconfig_group(uuid, targets, configurations=CONFIGURATIONS):
+    """Return (Configs group, {file name: FileReference}) for the .xcconfig files.
+
+    uuid is a registry's id_for.
+    """
+    refs = {name: FileReference(uuid('', 'PBXFileReference', f"{XCCONFIG_DIR}/{name}"), name, 'text.xcconfig')
+            for name in xcconfig_files(targets, configurations)}
+    return Group(uuid('', 'PBXGroup', XCCONFIG_DIR), list(refs.values()), path=XCCONFIG_DIR), refs
+
+
+def _configuration(uuid, owner, name, settings, xcconfigs, xcconfig):
+    base = xcconfigs.get(xcconfig) if xcconfigs else None
+    return BuildConfiguration(uuid(owner, 'XCBuildConfiguration', name), name,
+                              EMPTY if base is not None else settings, base)
+
+
+def project_configuration_list(uuid, xcconfigs=None, configurations=CONFIGURATIONS):
+    """Return the project's XCConfigurationList: BASE plus each configuration layer.
+
+    With xcconfigs ({file name: FileReference}, from xcconfig_group) the
+    configurations reference those files instead.
+    """
+    return ConfigurationList(uuid('', 'XCConfigurationList'), [
+        _configuration(uuid, '', name, layered(BASE, overrides), xcconfigs, f"{name}.xcconfig")
+        for name, overrides in configurations.items()
+    ])
+
+
+def target_configuration_list(uuid, target, layer, xcconfigs=None, configurations=CONFIGURATIONS):
+    """Return the XCConfigurationList of target, every configuration holding `layer`"""
+    return ConfigurationList(uuid(target, 'XCConfigurationList'), [
+        _configuration(uuid, target, name, layer, xcconfigs, f"{target}.xcconfig")
+        for name in configurations
+    ])
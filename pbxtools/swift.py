@@ -0,0 +1,197 @@
+"""
+Swift type declarations and references, cached by file content
+
+scan_source() is a lexical scanner, not a parser: comments and string
+literals are blanked out, `class`, `struct`, `enum`, `protocol`, `actor`
+and `typealias` introduce declarations, and every capitalised identifier
+counts as a reference (an `extension Trip` refers to Trip). That is enough
+to tell which files declare and use which of the project's own types;
+references to types the project does not declare (String, View) simply
+resolve to nothing.
+
+SwiftIndex keeps the result per SHA-1 of the file contents, next to the
+.xcodeproj. update() takes a stat scan such as the generators already do,
+reads only files whose size or mtime moved, and parses only contents it
+has never seen, so an unchanged tree costs one stat per file.
+"""
+
+import hashlib
+import json
+import os
+import re
+
+VERSION = 1
+
+_SKIP = re.compile(r'//[^\n]*|/\*.*?\*/|"""(?:[^\\]|\\.)*?"""|"(?:[^"\\\n]|\\.)*"', re.S)
+_DECLARATION = re.compile(r'\b(class|struct|enum|protocol|actor|typealias|extension)\s+'
+                          r'([A-Za-z_][A-Za-z0-9_]*(?:\.[A-Za-z_][A-Za-z0-9_]*)*)')
+_TYPE_NAME = re.compile(r'\b[A-Z][A-Za-z0-9_]*\b')
+
+# `class func`, `class var` and friends are members, not types
+_KEYWORDS = frozenset(('func', 'var', 'let', 'subscript', 'init', 'deinit', 'override', 'final',
+                       'private', 'fileprivate', 'internal', 'public', 'open', 'static'))
+
+
+def swift_index_path(project_dir):
+    """Return the cache location for a .xcodeproj directory"""
+    parent, name = os.path.split(os.path.normpath(project_dir))
+    return os.path.join(parent, f".{name}.swift.json")
+
+
+def blank_literals(text):
+    """Return Swift source with comments and string literals blanked out, line breaks kept"""
+    return _SKIP.sub(lambda match: ' ' * len(match.group(0)) if '\n' not in match.group(0)
+                     else '\n' * match.group(0).count('\n'), text)
+
+
+def scan_source(text):
+    """Return (declared types, referenced type names) of Swift source, both sorted"""
+    code = blank_literals(text)
+    declared = set()
+    for kind, name in _DECLARATION.findall(code):
+        if kind != 'extension' and name not in _KEYWORDS:
+            declared.add(name)
+    referenced = set(_TYPE_NAME.findall(code)) - declared
+    return sorted(declared), sorted(referenced)
+
+
+class SwiftIndex:
+    """path -> declared and referenced types, with the type -> users graph built on demand.
+
+    files maps a path to [size, mtime_ns, digest]; symbols maps a digest to
+    [declared, referenced].
+    """
+
+    def __init__(self, path, files=None, symbols=None):
+        self.path = path
+        self.files = files if files is not None else {}
+        self.symbols = symbols if symbols is not None else {}
+        self._graph = None
+
+    @classmethod
+    def load(cls, path):
+        """Read the cache at path; a missing or unreadable one loads empty"""
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return cls(path)
+        if not isinstance(data, dict) or data.get('version') != VERSION:
+            return cls(path)
+        return cls(path, data.get('files', {}), data.get('symbols', {}))
+
+    def save(self):
+        """Write the cache atomically, dropping contents no file has any more"""
+        live = {entry[2] for entry in self.files.values()}
+        self.symbols = {digest: symbols for digest, symbols in self.symbols.items() if digest in live}
+        tmp = f"{self.path}.tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump({'version': VERSION, 'files': self.files, 'symbols': self.symbols},
+                      f, separators=(',', ':'), sort_keys=True)
+        os.replace(tmp, self.path)
+
+    def update(self, scanned, root='.'):
+        """Bring the index in line with a scan {path: (size, mtime_ns)} of Swift files.
+
+        Returns (files read, files parsed). Paths missing from scanned are
+        forgotten.
+        """
+        read = parsed = 0
+        files = {}
+        for path, (size, mtime_ns) in scanned.items():
+            entry = self.files.get(path)
+            if entry is not None and entry[0] == size and entry[1] == mtime_ns:
+                files[path] = entry
+                continue
+            try:
+                with open(os.path.join(root, path), 'rb') as f:
+                    data = f.read()
+            except OSError:
+                continue
+            read += 1
+            digest = hashlib.sha1(data).hexdigest()
+            if digest not in self.symbols:
+                self.symbols[digest] = list(scan_source(data.decode('utf-8', errors='replace')))
+                parsed += 1
+            files[path] = [size, mtime_ns, digest]
+        if read or files.keys() != self.files.keys():
+            self._graph = None
+        self.files = files
+        return read, parsed
+
+    def declared(self, path):
+        """Return the types declared in path"""
+        entry = self.files.get(path)
+        return list(self.symbols[entry[2]][0]) if entry else []
+
+    def referenced(self, path):
+        """Return the project types path refers to, other than its own"""
+        entry = self.files.get(path)
+        if entry is None:
+            return []
+        declarations = self._build()[0]
+        return [name for name in self.symbols[entry[2]][1] if name in declarations]
+
+    def _build(self):
+        """Return ({type: [declaring paths]}, {type: [referring paths]})"""
+        if self._graph is None:
+            declarations, users = {}, {}
+            for path, entry in self.files.items():
+                declared, _ = self.symbols[entry[2]]
+                for name in declared:
+                    declarations.setdefault(name, []).append(path)
+            for path, entry in self.files.items():
+                _, referenced = self.symbols[entry[2]]
+                for name in referenced:
+                    if name in declarations:
+                        users.setdefault(name, []).append(path)
+            self._graph = declarations, users
+        return self._graph
+
+    def types(self):
+        """Return {type: [paths declaring it]} for every type in the project"""
+        return self._build()[0]
+
+    def users(self, name):
+        """Return the paths that refer to type name"""
+        return list(self._build()[1].get(name, ()))
+
+    def affected(self, paths, transitive=False):
+        """Return the other files that use a type declared in any of paths.
+
+        With transitive, files using types declared in affected files are
+        followed too, until nothing new turns up.
+        """
+        users = self._build()[1]
+        seen = set(paths)
+        result = []
+        pending = list(paths)
+        while pending:
+            path = pending.pop()
+            for name in self.declared(path):
+                for user in users.get(name, ()):
+                    if user not in seen:
+                        seen.add(user)
+                        result.append(user)
+                        if transitive:
+                            pending.append(user)
+        return sorted(result)
+
+
+def swift_files(scanned):
+    """Return the Swift entries of a stat scan, whatever the case of their extension"""
+    return {path: stat for path, stat in scanned.items() if path.lower().endswith('.swift')}
+
+
+def refresh(project_dir, scanned, root='.'):
+    """Load the index kept for project_dir, update it from a stat scan and save it if it changed.
+
+    scanned may hold any files; only the Swift ones are indexed. Returns
+    (index, files read, files parsed).
+    """
+    index = SwiftIndex.load(swift_index_path(project_dir))
+    known = len(index.files)
+    read, parsed = index.update(swift_files(scanned), root)
+    if read or len(index.files) != known:
+        index.save()
+    return index, read, parsed
@@ -0,0 +1,465 @@
+"""
+Native targets of the generated project and the sources each one builds
+
+A TargetSpec names a target, its product type, its settings layer, the
+targets it depends on and its membership rules: gitignore-style patterns,
+relative to the project directory, selecting the files it builds (by
+default everything below its source root). collect_sources() scans every
+source root once, classifies each file as it goes (see classify) and
+offers it to every target in the phase its kind belongs to, so a file can
+be built by several targets, or by none and only show up in the groups.
+
+iter_project() renders the whole project. The PBXBuildFile entries and
+build phases of one target do not depend on any other target, so on large
+projects they are rendered in a process pool, one target per worker, and
+merged back in target order.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain
+
+from . import profile
+from .classify import DEFAULT_CLASSIFIER, FRAMEWORKS, PHASES, RESOURCES, SOURCES
+from .groups import GroupTrie, iter_groups
+from .model import (BuildFile, BuildFileExceptionSet, ContainerItemProxy, FileReference, FrameworksBuildPhase,
+                    Group, NativeTarget, ProductReference, ProjectObject, ResourcesBuildPhase,
+                    SourcesBuildPhase, SynchronizedRootGroup, TargetDependency, iter_document)
+from .scan import IgnoreRules, iter_files, scan
+from .settings import (APP_TARGET, CONFIGURATIONS, UI_TEST_TARGET, UNIT_TEST_TARGET, project_configuration_list,
+                       target_configuration_list, xcconfig_group)
+from .writer import FileTable
+
+APPLICATION = 'com.apple.product-type.application'
+UNIT_TEST = 'com.apple.product-type.bundle.unit-test'
+UI_TEST = 'com.apple.product-type.bundle.ui-testing'
+
+# productType: (product extension, explicitFileType of the product)
+PRODUCT_TYPES = {
+    APPLICATION: ('app', 'wrapper.application'),
+    UNIT_TEST: ('xctest', 'wrapper.cfbundle'),
+    UI_TEST: ('xctest', 'wrapper.cfbundle'),
+}
+
+PHASE_CLASSES = {
+    SOURCES: SourcesBuildPhase,
+    FRAMEWORKS: FrameworksBuildPhase,
+    RESOURCES: ResourcesBuildPhase,
+}
+
+# Below this many build files, starting worker processes costs more than it saves
+PARALLEL_THRESHOLD = 20_000
+
+
+class TargetSpec:
+    """What to generate for one native target.
+
+    include defaults to everything below root; exclude patterns are applied
+    after it. depends names targets that must be built first.
+    """
+
+    __slots__ = ('name', 'product_type', 'root', 'settings', 'depends', 'rules')
+
+    def __init__(self, name, product_type, root, settings, depends=(), include=None, exclude=()):
+        self.name = name
+        self.product_type = product_type
+        self.root = root
+        self.settings = settings
+        self.depends = tuple(depends)
+        patterns = [f"{root}/**"] if include is None else list(include)
+        self.rules = IgnoreRules([*patterns, *(f"!{pattern}" for pattern in exclude)])
+
+    @property
+    def product(self):
+        """File name of the built product, e.g. TripBro.app"""
+        return f"{self.name}.{PRODUCT_TYPES[self.product_type][0]}"
+
+    def includes(self, path):
+        """Return True if this target builds path (relative to the project directory)"""
+        return self.rules.ignored(path, False)
+
+
+DEFAULT_TARGETS = (
+    TargetSpec('TripBro', APPLICATION, 'TripBro', APP_TARGET),
+    TargetSpec('TripBroTests', UNIT_TEST, 'TripBroTests', UNIT_TEST_TARGET, depends=('TripBro',)),
+    TargetSpec('TripBroUITests', UI_TEST, 'TripBroUITests', UI_TEST_TARGET, depends=('TripBro',)),
+)
+
+
+def active_targets(specs=DEFAULT_TARGETS):
+    """Return the specs whose source root exists in the current directory.
+
+    A target is left out when one it depends on is: a test target without
+    its app would name a TEST_HOST that is never built. specs list every
+    target after the ones it depends on.
+    """
+    active = {}
+    for spec in specs:
+        if os.path.isdir(spec.root) and all(name in active for name in spec.depends):
+            active[spec.name] = spec
+    return list(active.values())
+
+
+def source_roots(specs):
+    """Return the distinct source roots of specs, in order"""
+    return list(dict.fromkeys(spec.root for spec in specs))
+
+
+def target_layers(specs):
+    """Return {target name: settings layer}, as the xcconfig helpers expect"""
+    return {spec.name: spec.settings for spec in specs}
+
+
+def scan_sources(specs, with_stat=False, classifier=DEFAULT_CLASSIFIER):
+    """Scan each source root once for the files classifier takes in.
+
+    Paths are relative to the project directory. Returns a list of paths,
+    or {path: (size, mtime_ns)} with with_stat.
+    """
+    classify = classifier.classify
+    files = {} if with_stat else []
+    for root in source_roots(specs):
+        found = scan(root, classifier.suffixes, with_stat=with_stat)
+        for path in found:
+            path, rel = f"{root}/{path}", path
+            if classify(path) is None:
+                continue
+            if with_stat:
+                files[path] = found[rel]
+            else:
+                files.append(path)
+    return files
+
+
+def iter_source_paths(specs, classifier=DEFAULT_CLASSIFIER):
+    """Streaming scan_sources(), one path at a time, unclassified"""
+    for root in source_roots(specs):
+        for path in iter_files(root, classifier.suffixes):
+            yield f"{root}/{path}"
+
+
+def source_ids(registry, specs, path, phase=SOURCES):
+    """Return (file_ref, {target name: build_file}) IDs for path.
+
+    The dict is empty when no target builds the file, or when phase is None.
+    """
+    file_ref = registry.id_for('', 'PBXFileReference', path)
+    if phase is None:
+        return file_ref, {}
+    return file_ref, {spec.name: registry.id_for(spec.name, 'PBXBuildFile', path)
+                      for spec in specs if spec.includes(path)}
+
+
+class Sources:
+    """Scanned files plus the build files of each target.
+
+    files holds one (path, file_ref, file_type) row per file, targets one
+    FileTable of (path, file_ref, build_file) rows per target and phase
+    ({name: {phase: table}}), all in scan order.
+    """
+
+    def __init__(self, specs, low_memory=False):
+        self.specs = list(specs)
+        self.files = FileTable(spool=low_memory)
+        self.targets = {spec.name: {phase: FileTable(spool=low_memory) for phase in PHASES}
+                        for spec in self.specs}
+
+    def add(self, path, file_ref, file_type, phase, build_files):
+        self.files.add(path, file_ref, file_type)
+        for name, build_file in build_files.items():
+            self.targets[name][phase].add(path, file_ref, build_file)
+
+    def tables(self):
+        """Yield every (target name, phase, FileTable) in output order"""
+        for name, phases in self.targets.items():
+            for phase, table in phases.items():
+                yield name, phase, table
+
+    def __len__(self):
+        return len(self.files)
+
+    def close(self):
+        self.files.close()
+        for _, _, table in self.tables():
+            table.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def collect_sources(registry, specs, paths=None, low_memory=False, classifier=DEFAULT_CLASSIFIER):
+    """Assign IDs to paths, by default every file below the specs' roots, scanned once.
+
+    Each file is classified once, on the way in; files the classifier
+    leaves out are skipped.
+    """
+    sources = Sources(specs, low_memory)
+    if paths is None:
+        paths = iter_source_paths(specs, classifier) if low_memory else scan_sources(specs, classifier=classifier)
+    classify = classifier.classify
+    for path in paths:
+        kind = classify(path)
+        if kind is None:
+            continue
+        file_type, phase = kind
+        file_ref, build_files = source_ids(registry, specs, path, phase)
+        sources.add(path, file_ref, file_type, phase, build_files)
+    return sources
+
+
+def source_reference(path, file_ref, file_type='sourcecode.swift'):
+    """Return the FileReference for a scanned file, named relative to its group"""
+    return FileReference(file_ref, os.path.basename(path), file_type)
+
+
+def iter_build_files(rows, phase=SOURCES):
+    """Yield a fresh BuildFile per (path, file_ref, build_file) row"""
+    for path, file_ref, build_file in rows:
+        yield BuildFile(build_file, source_reference(path, file_ref), phase)
+
+
+def render_target(phases):
+    """Return (PBXBuildFile entries, [phase entries]) of one target as text.
+
+    phases is a list of (phase, phase UUID, rows). Runs in a worker
+    process, hence a module-level function of plain values.
+    """
+    build_text, phase_texts = [], []
+    for phase, phase_uuid, rows in phases:
+        build_files = list(iter_build_files(rows, phase))
+        build_text.extend(b.render() for b in build_files)
+        phase_texts.append(PHASE_CLASSES[phase](phase_uuid, build_files).render())
+    return ''.join(build_text), phase_texts
+
+
+def _target_sections(sources, phases, workers):
+    """Return the PBXBuildFile section contents and {phase: section contents}.
+
+    Large in-memory projects with several non-empty targets are rendered in
+    a process pool; otherwise the objects are built lazily while writing.
+    """
+    sizes = {name: sum(len(table) for table in tables.values()) for name, tables in sources.targets.items()}
+    busy = [name for name, size in sizes.items() if size]
+    if workers is None:
+        workers = min(len(busy), os.cpu_count() or 1)
+    if workers > 1 and len(busy) > 1 and sum(sizes.values()) >= PARALLEL_THRESHOLD and not sources.files.spool:
+        with ProcessPoolExecutor(workers) as pool:
+            futures = {name: pool.submit(render_target, [(phase, phases[name][phase].uuid, list(table))
+                                                         for phase, table in tables.items()])
+                       for name, tables in sources.targets.items()}
+            rendered = {name: future.result() for name, future in futures.items()}
+        sections = {phase: [rendered[name][1][i] for name in rendered] for i, phase in enumerate(PHASES)}
+        return [build_text for build_text, _ in rendered.values()], sections
+
+    sections = {phase: [] for phase in PHASES}
+    for name, phase, table in sources.tables():
+        phases[name][phase].files = iter_build_files(table, phase)
+        sections[phase].append(phases[name][phase])
+    build_files = chain.from_iterable(iter_build_files(table, phase) for _, phase, table in sources.tables())
+    return build_files, sections
+
+
+class _Skeleton:
+    """Everything in a project but its files: targets with their phases and
+    configurations, dependencies, products and the top-level groups.
+
+    root_groups holds one group per source root, in order; the main group
+    lists them first, then Configs (with xcconfig) and Products. A target
+    depending on one missing from specs is a ValueError.
+    """
+
+    def __init__(self, specs, registry, xcconfig, root_groups, object_version=56, synchronized=None,
+                 configurations=CONFIGURATIONS):
+        # Stable IDs derived from (target, section, path)
+        uuid = registry.id_for
+        self.config_group, self.xcconfigs = (xcconfig_group(uuid, target_layers(specs), configurations)
+                                             if xcconfig else (None, {}))
+        self.project_configs = project_configuration_list(uuid, self.xcconfigs, configurations)
+
+        self.products, self.phases, self.config_lists, self.targets = [], {}, [], {}
+        for spec in specs:
+            product = ProductReference(uuid(spec.name, 'PBXFileReference', spec.product), spec.product,
+                                       PRODUCT_TYPES[spec.product_type][1], 'BUILT_PRODUCTS_DIR')
+            self.phases[spec.name] = {phase: PHASE_CLASSES[phase](uuid(spec.name, PHASE_CLASSES[phase].isa))
+                                      for phase in PHASES}
+            self.config_lists.append(target_configuration_list(uuid, spec.name, spec.settings, self.xcconfigs,
+                                                               configurations))
+            self.products.append(product)
+            self.targets[spec.name] = NativeTarget(
+                uuid(spec.name, 'PBXNativeTarget'), spec.name, self.config_lists[-1],
+                list(self.phases[spec.name].values()), product, spec.product_type, [],
+                None if synchronized is None else synchronized[spec.name])
+
+        self.products_group = Group(uuid('', 'PBXGroup', 'Products'), self.products, name='Products')
+        self.top_groups = [group for group in (self.config_group, self.products_group) if group is not None]
+        self.main_group = Group(uuid('', 'PBXGroup', ''), [*root_groups, *self.top_groups])
+
+        attributes = {}
+        self.project = ProjectObject(uuid('', 'PBXProject'), {
+            'BuildIndependentTargetsInParallel': 1,
+            'LastSwiftUpdateCheck': 1500,
+            'LastUpgradeCheck': 1500,
+            'TargetAttributes': attributes,
+        }, self.project_configs, self.main_group, self.products_group, list(self.targets.values()), object_version)
+
+        self.proxies, self.dependencies = [], []
+        for spec in specs:
+            target = self.targets[spec.name]
+            attributes[target] = {'CreatedOnToolsVersion': '15.0'}
+            for name in spec.depends:
+                host = self.targets.get(name)
+                if host is None:
+                    raise ValueError(f"{spec.name} depends on {name}, which is not generated")
+                proxy = ContainerItemProxy(uuid(spec.name, 'PBXContainerItemProxy', name), self.project, host)
+                dependency = TargetDependency(uuid(spec.name, 'PBXTargetDependency', name), host, proxy)
+                target.dependencies.append(dependency)
+                self.proxies.append(proxy)
+                self.dependencies.append(dependency)
+                if spec.product_type != APPLICATION and 'TestTargetID' not in attributes[target]:
+                    attributes[target]['TestTargetID'] = host.uuid
+
+    def configurations(self):
+        return chain(self.project_configs.configurations,
+                     *(config_list.configurations for config_list in self.config_lists))
+
+
+def iter_project(sources, registry, xcconfig=False, workers=None, configurations=CONFIGURATIONS):
+    """Yield project.pbxproj one section at a time for collected Sources.
+
+    With xcconfig, build settings live in Configs/*.xcconfig (see
+    settings.write_xcconfigs) and configurations only reference them.
+    workers caps the render processes; 1 keeps everything in-process.
+    configurations names the build configurations (see
+    settings.configurations_for).
+    """
+    uuid = registry.id_for
+    specs = sources.specs
+
+    # One group per source root, nested groups built while the rows stream past
+    def grouped_refs(root):
+        prefix = f"{root}/"
+        return ((os.path.dirname(path)[len(prefix):], source_reference(path, file_ref, file_type))
+                for path, file_ref, file_type in sources.files if path.startswith(prefix))
+
+    root_groups = []
+    source_groups = []
+    for root in source_roots(specs):
+        trie = GroupTrie(uuid('', 'PBXGroup', root))
+        root_groups.append(Group(trie.root.uuid, path=root))
+        source_groups.append(iter_groups(trie, grouped_refs(root),
+                                         lambda path, root=root: uuid('', 'PBXGroup', f"{root}/{path}"), root))
+    skeleton = _Skeleton(specs, registry, xcconfig, root_groups, configurations=configurations)
+
+    build_files, phase_sections = _target_sections(sources, skeleton.phases, workers)
+    file_refs = (source_reference(*row) for row in sources.files)
+
+    yield from iter_document(skeleton.project, profile.counted([
+        ('PBXBuildFile', build_files),
+        ('PBXContainerItemProxy', skeleton.proxies),
+        ('PBXFileReference', chain(skeleton.products, skeleton.xcconfigs.values(), file_refs)),
+        ('PBXFrameworksBuildPhase', phase_sections[FRAMEWORKS]),
+        ('PBXGroup', chain([skeleton.main_group], skeleton.top_groups, *source_groups)),
+        ('PBXNativeTarget', skeleton.targets.values()),
+        ('PBXProject', [skeleton.project]),
+        ('PBXResourcesBuildPhase', phase_sections[RESOURCES]),
+        ('PBXSourcesBuildPhase', phase_sections[SOURCES]),
+        ('PBXTargetDependency', skeleton.dependencies),
+        ('XCBuildConfiguration', skeleton.configurations()),
+        ('XCConfigurationList', [skeleton.project_configs, *skeleton.config_lists]),
+    ]))
+
+
+def _collapse(paths, all_paths):
+    """Replace every directory whose scanned files are all in paths by the directory itself"""
+    totals, hits = {}, {}
+    for counts, group in ((totals, all_paths), (hits, paths)):
+        for path in group:
+            directory = os.path.dirname(path)
+            while directory:
+                counts[directory] = counts.get(directory, 0) + 1
+                directory = os.path.dirname(directory)
+    full = {directory for directory, count in hits.items() if count == totals[directory]}
+    collapsed = set()
+    for path in paths:
+        # The topmost fully covered ancestor stands for the path, if there is one
+        top, directory = path, os.path.dirname(path)
+        while directory:
+            if directory in full:
+                top = directory
+            directory = os.path.dirname(directory)
+        collapsed.add(top)
+    return sorted(collapsed)
+
+
+def membership_exceptions(specs, classifier=DEFAULT_CLASSIFIER):
+    """Return {(root, target name): [paths relative to root]} for synchronized folders.
+
+    Xcode builds everything inside a synchronized folder for the target
+    owning it, so its exceptions are the files that target should not
+    build: excluded by the spec, left out by the classifier, or only listed
+    (Info.plist, headers, documentation). For any other target they are
+    the files below the folder it builds in addition. Directories whose
+    files are all exceptions are listed once. Files the scanner ignores
+    are not listed.
+    """
+    classify = classifier.classify
+    exceptions = {}
+    for root in source_roots(specs):
+        found = scan(root, None)
+        inverted = {spec.name: [] for spec in specs}
+        for rel in found:
+            path = f"{root}/{rel}"
+            kind = classify(path)
+            buildable = kind is not None and kind[1] is not None
+            for spec in specs:
+                if (spec.root == root) != (buildable and spec.includes(path)):
+                    inverted[spec.name].append(rel)
+        for name, paths in inverted.items():
+            if paths:
+                exceptions[root, name] = _collapse(paths, found)
+    return exceptions
+
+
+def iter_synchronized_project(specs, registry, exceptions, xcconfig=False, configurations=CONFIGURATIONS):
+    """Yield an objectVersion 77 project.pbxproj whose source roots are synchronized folders.
+
+    Xcode discovers the files itself, so the project holds no file
+    references or build files; exceptions (see membership_exceptions)
+    become one exception set per folder and target.
+    """
+    uuid = registry.id_for
+    roots = {root: SynchronizedRootGroup(uuid('', 'PBXFileSystemSynchronizedRootGroup', root), root, [])
+             for root in source_roots(specs)}
+    skeleton = _Skeleton(specs, registry, xcconfig, list(roots.values()), object_version=77,
+                         synchronized={spec.name: [roots[spec.root]] for spec in specs},
+                         configurations=configurations)
+
+    exception_sets = []
+    for spec in specs:
+        for root, group in roots.items():
+            paths = exceptions.get((root, spec.name))
+            if paths:
+                exception_set = BuildFileExceptionSet(
+                    uuid(spec.name, BuildFileExceptionSet.isa, root), group, skeleton.targets[spec.name], paths)
+                group.exceptions.append(exception_set)
+                exception_sets.append(exception_set)
+
+    phases = list(skeleton.phases.values())
+    yield from iter_document(skeleton.project, profile.counted([
+        ('PBXContainerItemProxy', skeleton.proxies),
+        ('PBXFileReference', chain(skeleton.products, skeleton.xcconfigs.values())),
+        (BuildFileExceptionSet.isa, exception_sets),
+        (SynchronizedRootGroup.isa, roots.values()),
+        ('PBXFrameworksBuildPhase', [by_phase[FRAMEWORKS] for by_phase in phases]),
+        ('PBXGroup', chain([skeleton.main_group], skeleton.top_groups)),
+        ('PBXNativeTarget', skeleton.targets.values()),
+        ('PBXProject', [skeleton.project]),
+        ('PBXResourcesBuildPhase', [by_phase[RESOURCES] for by_phase in phases]),
+        ('PBXSourcesBuildPhase', [by_phase[SOURCES] for by_phase in phases]),
+        ('PBXTargetDependency', skeleton.dependencies),
+        ('XCBuildConfiguration', skeleton.configurations()),
+        ('XCConfigurationList', [skeleton.project_configs, *skeleton.config_lists]),
+    ]), object_version=77)
@@ -0,0 +1,414 @@
+"""
+Duration-balanced test shards as .xctestplan and .xcscheme files
+
+Tests are known by target and identifier, the way test plans name them:
+('TripBroUITests', 'TripBroUITestsLaunchTests/testLaunch()'). They are
+found twice over: discover_tests() reads the Swift sources of each test
+target for XCTest `test…` methods and Swift Testing `@Test` functions, and
+read_durations() takes per-test durations from JSON exported from earlier
+runs. Tests without a recorded duration are assumed to take the median of
+the ones with one.
+
+shard() deals the tests out longest first, each to the shard with the least
+work so far (LPT scheduling), which keeps the longest shard within 4/3 of
+the best possible. Each shard becomes a test plan listing its tests with
+parallel execution turned on, and a shared scheme running that plan. The
+least loaded shard lists what the others run as skipped instead, so a test
+added after the plans were written still runs somewhere.
+"""
+
+import heapq
+import json
+import os
+import re
+import uuid
+from xml.sax.saxutils import quoteattr
+
+from .pbxproj import Project
+from .scan import iter_files
+from .swift import blank_literals
+from .targets import DEFAULT_TARGETS, PRODUCT_TYPES, UI_TEST, UNIT_TEST
+from .writer import write_stream
+
+# Xcode version the schemes claim to come from
+LAST_UPGRADE_VERSION = '1600'
+# Assumed duration, in seconds, when no test has a recorded one
+DEFAULT_DURATION = 1.0
+
+_TOKEN = re.compile(r'(\{)|(\})|@(Test)\b'
+                    r'|\b(?:class|struct|enum|actor|extension)\s+([A-Za-z_][A-Za-z0-9_.]*)'
+                    r'|\bfunc\s+([A-Za-z_][A-Za-z0-9_]*)\s*(?:<[^>(]*>)?\s*\(([^)]*)\)')
+_DURATION = re.compile(r'^\s*(\d+(?:\.\d+)?)\s*(ms|s|m)?\s*$')
+_BUNDLES = ('Unit test bundle', 'UI test bundle')
+# `class func`, `class var` and friends are members, not types
+_MEMBERS = frozenset(('func', 'var', 'let', 'subscript', 'init', 'deinit', 'override', 'final', 'static',
+                      'private', 'fileprivate', 'internal', 'public', 'open'))
+
+
+def _selector(name, parameters):
+    """Swift selector spelling, e.g. example(city:count:)"""
+    labels = []
+    for parameter in parameters.split(','):
+        head = parameter.split(':', 1)[0].split()
+        if head:
+            labels.append(f"{head[0]}:")
+    return f"{name}({''.join(labels)})"
+
+
+def discover_tests(text):
+    """Return the test identifiers a Swift source file declares.
+
+    XCTest methods are parameterless `test…` functions of a type, Swift
+    Testing tests are functions marked @Test; both are named Type/name(),
+    a free @Test function just name().
+    """
+    code = blank_literals(text)
+    stack, pending_type, marked, found = [], None, False, []
+    for match in _TOKEN.finditer(code):
+        opening, closing, test, type_name, func, parameters = match.groups()
+        if opening:
+            stack.append(pending_type)
+            pending_type = None
+        elif closing:
+            if stack:
+                stack.pop()
+        elif test:
+            marked = True
+        elif type_name:
+            pending_type = None if type_name in _MEMBERS else type_name
+        elif func:
+            # Only functions directly in a type body, or at file scope, are tests
+            owner = stack[-1] if stack else None
+            if stack and owner is None:
+                marked = False
+                continue
+            if marked or (owner and func.startswith('test') and not parameters.strip()):
+                selector = _selector(func, parameters)
+                found.append(f"{owner}/{selector}" if owner else selector)
+            marked = False
+    return found
+
+
+def _seconds(value):
+    """Seconds from a number or a duration string such as '1.5s' or '120ms'"""
+    if isinstance(value, (int, float)):
+        return float(value)
+    match = _DURATION.match(value) if isinstance(value, str) else None
+    if match is None:
+        return None
+    number, unit = float(match.group(1)), match.group(2)
+    return number / 1000 if unit == 'ms' else number * 60 if unit == 'm' else number
+
+
+def _legacy_value(node, key):
+    value = node.get(key)
+    return value.get('_value') if isinstance(value, dict) else None
+
+
+def _walk_results(node, bundle, durations):
+    """Collect {(target, identifier): seconds} from xcresulttool JSON"""
+    pending = [(node, bundle)]
+    while pending:
+        node, bundle = pending.pop()
+        if isinstance(node, list):
+            pending.extend((child, bundle) for child in node)
+            continue
+        if not isinstance(node, dict):
+            continue
+        kind = node.get('nodeType') or (node.get('_type') or {}).get('_name')
+        if kind in _BUNDLES:
+            bundle = node.get('name')
+        elif kind == 'ActionTestableSummary':
+            bundle = _legacy_value(node, 'targetName')
+        elif kind == 'Test Case' and bundle:
+            seconds = node.get('durationInSeconds')
+            seconds = _seconds(node.get('duration')) if seconds is None else seconds
+            identifier = node.get('nodeIdentifier') or node.get('name')
+            if seconds is not None and identifier:
+                key = (bundle, identifier)
+                durations[key] = durations.get(key, 0.0) + float(seconds)
+            continue
+        elif kind == 'ActionTestMetadata' and bundle:
+            seconds = _seconds(_legacy_value(node, 'duration'))
+            identifier = _legacy_value(node, 'identifier')
+            if seconds is not None and identifier:
+                key = (bundle, identifier)
+                durations[key] = durations.get(key, 0.0) + seconds
+            continue
+        pending.extend((child, bundle) for child in node.values() if isinstance(child, (dict, list)))
+
+
+def parse_durations(document):
+    """Return {(target, identifier): seconds} from one exported result.
+
+    Takes `xcresulttool get test-results tests` output (Xcode 16), the
+    legacy `xcresulttool get --format json` test summaries, or a plain
+    {"Target/Type/test()": seconds} map. A test run several times in one
+    result (configurations, devices) counts for all of its runs.
+    """
+    durations = {}
+    if isinstance(document, dict) and document and all(
+            isinstance(value, (int, float)) and not isinstance(value, bool) for value in document.values()):
+        for name, seconds in document.items():
+            target, _, identifier = name.partition('/')
+            if identifier:
+                durations[(target, identifier)] = float(seconds)
+        return durations
+    _walk_results(document, None, durations)
+    return durations
+
+
+def read_durations(paths):
+    """Return {(target, identifier): seconds}, averaged over the result files at paths"""
+    totals, runs = {}, {}
+    for path in paths:
+        with open(path, 'r', encoding='utf-8') as f:
+            durations = parse_durations(json.load(f))
+        for key, seconds in durations.items():
+            totals[key] = totals.get(key, 0.0) + seconds
+            runs[key] = runs.get(key, 0) + 1
+    return {key: totals[key] / runs[key] for key in totals}
+
+
+class TestTarget:
+    """A test target of the project: its name, target UUID, product and source root"""
+
+    __slots__ = ('name', 'uuid', 'product', 'root')
+
+    def __init__(self, name, uuid, product, root):
+        self.name = name
+        self.uuid = uuid
+        self.product = product
+        self.root = root
+
+
+def project_targets(project, base):
+    """Return (app (name, uuid, product) or None, [TestTarget]) for a parsed Project.
+
+    base is the directory holding the .xcodeproj; a test target's sources
+    are its spec's root there, else the directory named after it.
+    """
+    roots = {spec.name: spec.root for spec in DEFAULT_TARGETS}
+    app, tests = None, []
+    for target_uuid, target in project.objects_of('PBXNativeTarget').items():
+        name, product_type = target.get('name'), target.get('productType', '').strip('"')
+        extension = PRODUCT_TYPES.get(product_type, ('app',))[0]
+        product = f"{target.get('productName', name)}.{extension}"
+        if product_type in (UNIT_TEST, UI_TEST):
+            tests.append(TestTarget(name, target_uuid, product, os.path.join(base, roots.get(name, name))))
+        elif app is None and extension == 'app':
+            app = (name, target_uuid, product)
+    return app, tests
+
+
+def collect_tests(test_targets, durations, default=None):
+    """Return {(target, identifier): seconds} for every test to shard.
+
+    The tests are those found in the targets' sources; a target whose
+    sources are missing falls back to the tests recorded in durations.
+    Tests with no recorded duration get default, or the median of the
+    recorded ones.
+    """
+    found = {}
+    for target in test_targets:
+        identifiers = []
+        if os.path.isdir(target.root):
+            for path in iter_files(target.root):
+                with open(os.path.join(target.root, path), 'r', encoding='utf-8', errors='replace') as f:
+                    identifiers.extend(discover_tests(f.read()))
+        if not identifiers:
+            identifiers = [identifier for name, identifier in durations if name == target.name]
+        for identifier in identifiers:
+            found[(target.name, identifier)] = durations.get((target.name, identifier))
+    if default is None:
+        known = sorted(seconds for seconds in found.values() if seconds is not None)
+        default = known[len(known) // 2] if known else DEFAULT_DURATION
+    return {key: default if seconds is None else seconds for key, seconds in found.items()}
+
+
+def shard(tests, count):
+    """Split {test: seconds} into count shards, longest test first onto the least loaded shard.
+
+    Returns [(seconds, [tests])], ordered like the shards were numbered.
+    Ties go to the lower-numbered shard and equal tests are taken in
+    name order, so the same input always gives the same shards.
+    """
+    heap = [(0.0, index) for index in range(count)]
+    shards = [[] for _ in range(count)]
+    loads = [0.0] * count
+    for test, seconds in sorted(tests.items(), key=lambda item: (-item[1], item[0])):
+        load, index = heapq.heappop(heap)
+        shards[index].append(test)
+        loads[index] = load + seconds
+        heapq.heappush(heap, (loads[index], index))
+    return [(loads[index], sorted(shards[index])) for index in range(count)]
+
+
+def _plan_id(name):
+    return str(uuid.uuid5(uuid.NAMESPACE_URL, f"xctestplan:{name}")).upper()
+
+
+def render_test_plan(name, container, test_targets, selected=None, skipped=None, app=None):
+    """Return the text of an .xctestplan running selected tests, or all but skipped ones.
+
+    selected and skipped map a target name to test identifiers; a target
+    with no selected tests is left out of the plan. Every target runs its
+    tests in parallel.
+    """
+    entries = []
+    for target in test_targets:
+        entry = {'parallelizable': True,
+                 'target': {'containerPath': container, 'identifier': target.uuid, 'name': target.name}}
+        if selected is not None:
+            if not selected.get(target.name):
+                continue
+            entry['selectedTests'] = selected[target.name]
+        elif skipped is not None and skipped.get(target.name):
+            entry['skippedTests'] = skipped[target.name]
+        entries.append(entry)
+    default_options = {}
+    if app is not None:
+        default_options['targetForVariableExpansion'] = {'containerPath': container, 'identifier': app[1],
+                                                         'name': app[0]}
+    plan = {'configurations': [{'id': _plan_id(name), 'name': 'Configuration 1', 'options': {}}],
+            'defaultOptions': default_options, 'testTargets': entries, 'version': 1}
+    return json.dumps(plan, indent=2, sort_keys=True, separators=(',', ' : ')) + '\n'
+
+
+def _buildable(indent, blueprint, product, name, container):
+    pad = ' ' * indent
+    return (f'{pad}<BuildableReference\n'
+            f'{pad}   BuildableIdentifier = "primary"\n'
+            f'{pad}   BlueprintIdentifier = {quoteattr(blueprint)}\n'
+            f'{pad}   BuildableName = {quoteattr(product)}\n'
+            f'{pad}   BlueprintName = {quoteattr(name)}\n'
+            f'{pad}   ReferencedContainer = {quoteattr(container)}>\n'
+            f'{pad}</BuildableReference>\n')
+
+
+def render_scheme(plan_reference, container, app, test_targets):
+    """Return the text of an .xcscheme whose test action runs one test plan"""
+    entries = [(app, 'YES')] if app is not None else []
+    entries += [((target.name, target.uuid, target.product), 'NO') for target in test_targets]
+    lines = ['<?xml version="1.0" encoding="UTF-8"?>\n',
+             f'<Scheme\n   LastUpgradeVersion = "{LAST_UPGRADE_VERSION}"\n   version = "1.7">\n',
+             '   <BuildAction\n      parallelizeBuildables = "YES"\n      buildImplicitDependencies = "YES">\n',
+             '      <BuildActionEntries>\n']
+    for (name, target_uuid, product), others in entries:
+        lines.append(f'         <BuildActionEntry\n'
+                     f'            buildForTesting = "YES"\n'
+                     f'            buildForRunning = "{others}"\n'
+                     f'            buildForProfiling = "{others}"\n'
+                     f'            buildForArchiving = "{others}"\n'
+                     f'            buildForAnalyzing = "{others}">\n')
+        lines.append(_buildable(12, target_uuid, product, name, container))
+        lines.append('         </BuildActionEntry>\n')
+    lines.append('      </BuildActionEntries>\n   </BuildAction>\n')
+    lines.append('   <TestAction\n      buildConfiguration = "Debug"\n'
+                 '      selectedDebuggerIdentifier = "Xcode.DebuggerFoundation.Debugger.LLDB"\n'
+                 '      selectedLauncherIdentifier = "Xcode.DebuggerFoundation.Launcher.LLDB"\n'
+                 '      shouldUseLaunchSchemeArgsEnv = "YES">\n'
+                 '      <TestPlans>\n'
+                 f'         <TestPlanReference\n            reference = {quoteattr(plan_reference)}\n'
+                 '            default = "YES">\n'
+                 '         </TestPlanReference>\n'
+                 '      </TestPlans>\n   </TestAction>\n')
+    lines.append('   <LaunchAction\n      buildConfiguration = "Debug"\n'
+                 '      selectedDebuggerIdentifier = "Xcode.DebuggerFoundation.Debugger.LLDB"\n'
+                 '      selectedLauncherIdentifier = "Xcode.DebuggerFoundation.Launcher.LLDB"\n'
+                 '      launchStyle = "0"\n      useCustomWorkingDirectory = "NO"\n'
+                 '      ignoresPersistentStateOnLaunch = "NO"\n      debugDocumentVersioning = "YES"\n'
+                 '      debugServiceExtension = "internal"\n      allowLocationSimulation = "YES">\n')
+    if app is not None:
+        lines.append('      <BuildableProductRunnable\n         runnableDebuggingMode = "0">\n')
+        lines.append(_buildable(9, app[1], app[2], app[0], container))
+        lines.append('      </BuildableProductRunnable>\n')
+    lines.append('   </LaunchAction>\n')
+    lines.append('   <AnalyzeAction\n      buildConfiguration = "Debug">\n   </AnalyzeAction>\n')
+    lines.append('   <ArchiveAction\n      buildConfiguration = "Release"\n'
+                 '      revealArchiveInOrganizer = "YES">\n   </ArchiveAction>\n')
+    lines.append('</Scheme>\n')
+    return ''.join(lines)
+
+
+class ShardFiles:
+    """Where the plans and schemes for a project go.
+
+    Plans live in TestPlans/ beside the .xcodeproj, schemes among its shared
+    schemes, both named prefix1, prefix2, ...
+    """
+
+    def __init__(self, project_dir, prefix, plan_dir='TestPlans'):
+        self.project_dir = os.path.normpath(project_dir)
+        self.base = os.path.dirname(os.path.abspath(self.project_dir))
+        self.prefix = prefix
+        self.plan_dir = plan_dir
+        self.container = f"container:{os.path.basename(self.project_dir)}"
+        self.schemes = os.path.join(self.project_dir, 'xcshareddata', 'xcschemes')
+
+    def name(self, index):
+        return f"{self.prefix}{index + 1}"
+
+    def plan(self, index):
+        return os.path.join(self.base, self.plan_dir, f"{self.name(index)}.xctestplan")
+
+    def plan_reference(self, index):
+        return f"container:{self.plan_dir}/{self.name(index)}.xctestplan"
+
+    def scheme(self, index):
+        return os.path.join(self.schemes, f"{self.name(index)}.xcscheme")
+
+    def stale(self, count):
+        """Return plans and schemes with this prefix numbered above count"""
+        pattern = re.compile(rf'{re.escape(self.prefix)}(\d+)\.(?:xctestplan|xcscheme)$')
+        found = []
+        for directory in (os.path.join(self.base, self.plan_dir), self.schemes):
+            try:
+                names = os.listdir(directory)
+            except OSError:
+                continue
+            for name in names:
+                match = pattern.match(name)
+                if match and int(match.group(1)) > count:
+                    found.append(os.path.join(directory, name))
+        return sorted(found)
+
+
+def write_shards(project_dir, shards, prefix, test_targets=None, app=None):
+    """Write a test plan and a scheme per shard, removing those of shards no longer made.
+
+    shards is shard() output over (target, identifier) tests. Returns the
+    paths written or removed; files whose text did not change are left alone.
+    """
+    files = ShardFiles(project_dir, prefix)
+    if test_targets is None:
+        app, test_targets = project_targets(Project.load(os.path.join(project_dir, 'project.pbxproj')), files.base)
+    # The least loaded shard also runs tests none of the plans knew about
+    catch_all = min(range(len(shards)), key=lambda index: (shards[index][0], index))
+    assigned = {}
+    for index, (_, tests) in enumerate(shards):
+        for target, identifier in tests:
+            assigned.setdefault(target, {})[identifier] = index
+    changed = []
+    for index, (_, tests) in enumerate(shards):
+        if index == catch_all:
+            skipped = {target: sorted(identifier for identifier, owner in identifiers.items() if owner != index)
+                       for target, identifiers in assigned.items()}
+            text = render_test_plan(files.name(index), files.container, test_targets, skipped=skipped, app=app)
+        else:
+            selected = {}
+            for target, identifier in tests:
+                selected.setdefault(target, []).append(identifier)
+            text = render_test_plan(files.name(index), files.container, test_targets, selected=selected, app=app)
+        plan = files.plan(index)
+        os.makedirs(os.path.dirname(plan), exist_ok=True)
+        if write_stream(plan, [text]):
+            changed.append(plan)
+        scheme = files.scheme(index)
+        os.makedirs(os.path.dirname(scheme), exist_ok=True)
+        if write_stream(scheme, [render_scheme(files.plan_reference(index), files.container, app, test_targets)]):
+            changed.append(scheme)
+    for path in files.stale(len(shards)):
+        os.remove(path)
+        changed.append(path)
+    return changed
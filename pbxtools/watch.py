@@ -0,0 +1,197 @@
+"""
+Watch a source tree for files appearing or disappearing
+
+On Linux the tree is watched with inotify (through ctypes, no extra
+dependencies); elsewhere, or if inotify is unavailable, it falls back to
+polling scan() snapshots. Bursts of events, such as a branch switch that
+touches thousands of files, are debounced into a single callback.
+"""
+
+import ctypes
+import ctypes.util
+import errno
+import os
+import select
+import struct
+import sys
+import time
+
+from .scan import DEFAULT_IGNORES, PACKAGE_SUFFIXES, IgnoreRules, scan
+
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+
+WATCH_MASK = IN_CREATE | IN_DELETE | IN_MOVED_FROM | IN_MOVED_TO | IN_DELETE_SELF | IN_ONLYDIR
+
+_EVENT = struct.Struct('iIII')
+
+
+class PollingWatcher:
+    """Detects added or removed files by comparing periodic scans"""
+
+    def __init__(self, root, suffixes=('.swift',), ignore=DEFAULT_IGNORES, interval=1.0):
+        self.root = root
+        self.suffixes = suffixes
+        self.ignore = ignore
+        self.interval = interval
+        self._snapshot = self._scan()
+
+    def _scan(self):
+        return frozenset(scan(self.root, self.suffixes, self.ignore))
+
+    def wait(self, timeout=None):
+        """Block until the set of files changes; False if timeout passes first"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            delay = self.interval
+            if deadline is not None:
+                delay = min(delay, max(0.0, deadline - time.monotonic()))
+            time.sleep(delay)
+            snapshot = self._scan()
+            if snapshot != self._snapshot:
+                self._snapshot = snapshot
+                return True
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class InotifyWatcher:
+    """Recursive inotify watch that reports file creations, deletions and moves"""
+
+    def __init__(self, root, suffixes=('.swift',), ignore=DEFAULT_IGNORES):
+        libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        self._add_watch = libc.inotify_add_watch
+        self._add_watch.argtypes = (ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32)
+        fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.fd = fd
+        self.root = root
+        self.suffixes = suffixes
+        self.rules = ignore if isinstance(ignore, IgnoreRules) else IgnoreRules(ignore)
+        self._dirs = {}
+        self._add_tree('')
+
+    def _add_tree(self, rel):
+        """Watch rel and every non-ignored directory below it"""
+        stack = [rel]
+        while stack:
+            rel = stack.pop()
+            path = os.path.join(self.root, rel) if rel else self.root
+            wd = self._add_watch(self.fd, os.fsencode(path), WATCH_MASK)
+            if wd < 0:
+                err = ctypes.get_errno()
+                if err == errno.ENOSPC:
+                    raise OSError(err, "inotify watch limit reached")
+                continue
+            self._dirs[wd] = rel
+            try:
+                with os.scandir(path) as it:
+                    for entry in it:
+                        child = f"{rel}/{entry.name}" if rel else entry.name
+                        if (entry.is_dir(follow_symlinks=False) and not entry.name.lower().endswith(PACKAGE_SUFFIXES)
+                                and not self.rules.ignored(child, True)):
+                            stack.append(child)
+            except OSError:
+                pass
+
+    def _relevant(self, mask, rel):
+        if mask & IN_Q_OVERFLOW:
+            return True
+        is_dir = bool(mask & IN_ISDIR)
+        if is_dir and not rel.lower().endswith(PACKAGE_SUFFIXES):
+            return not self.rules.ignored(rel, True)
+        # A file, or a package directory standing for one
+        return (not self.suffixes or rel.lower().endswith(self.suffixes)) and not self.rules.ignored(rel, is_dir)
+
+    def _drain(self):
+        """Read pending events; returns True if any of them matters"""
+        relevant = False
+        while True:
+            try:
+                data = os.read(self.fd, 1 << 16)
+            except BlockingIOError:
+                return relevant
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, length = _EVENT.unpack_from(data, offset)
+                offset += _EVENT.size
+                name = data[offset:offset + length].rstrip(b'\0').decode('utf-8', 'surrogateescape')
+                offset += length
+                if mask & IN_IGNORED:
+                    self._dirs.pop(wd, None)
+                    continue
+                parent = self._dirs.get(wd)
+                if parent is None and not mask & IN_Q_OVERFLOW:
+                    continue
+                rel = f"{parent}/{name}" if parent and name else (name or parent or '')
+                if (mask & IN_ISDIR and mask & (IN_CREATE | IN_MOVED_TO) and not rel.lower().endswith(PACKAGE_SUFFIXES)
+                        and not self.rules.ignored(rel, True)):
+                    self._add_tree(rel)
+                if self._relevant(mask, rel):
+                    relevant = True
+
+    def wait(self, timeout=None):
+        """Block until a relevant event arrives; False if timeout passes first"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            ready, _, _ = select.select([self.fd], [], [], remaining)
+            if ready and self._drain():
+                return True
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+
+    def close(self):
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def open_watcher(root, suffixes=('.swift',), ignore=DEFAULT_IGNORES, poll_interval=1.0):
+    """Return an inotify watcher on Linux, or a polling watcher otherwise"""
+    if sys.platform.startswith('linux'):
+        try:
+            return InotifyWatcher(root, suffixes, ignore)
+        except (OSError, AttributeError):
+            pass
+    return PollingWatcher(root, suffixes, ignore, poll_interval)
+
+
+def watch(root, on_change, debounce=0.5, max_delay=5.0, suffixes=('.swift',),
+          ignore=DEFAULT_IGNORES, poll_interval=1.0):
+    """Call on_change() once per burst of file additions or removals under root.
+
+    A burst ends after `debounce` seconds without relevant events, or after
+    `max_delay` seconds at most so a steady trickle still gets flushed. Runs
+    until interrupted.
+    """
+    with open_watcher(root, suffixes, ignore, poll_interval) as watcher:
+        while True:
+            watcher.wait()
+            deadline = time.monotonic() + max_delay
+            while time.monotonic() < deadline and watcher.wait(debounce):
+                pass
+            on_change()
@@ -0,0 +1,139 @@
+"""
+Streaming output for project.pbxproj generation
+
+write_stream() only replaces a file whose content actually changes, via a
+temporary file and an atomic rename: rewriting identical bytes would still
+bump project.pbxproj's mtime, which makes Xcode reload the project and
+restart indexing.
+"""
+
+import os
+import tempfile
+import zlib
+
+_BLOCK = 1 << 20
+
+
+class FileTable:
+    """Ordered (path, file_uuid, build_uuid) rows for the generated sources.
+
+    Rows are kept in a list by default. With spool=True they are appended to
+    an anonymous temporary file and re-read on every iteration instead, so
+    memory stays flat no matter how many sources the project has.
+    """
+
+    def __init__(self, spool=False):
+        self.spool = spool
+        self._rows = []
+        self._file = tempfile.TemporaryFile('w+b') if spool else None
+        self._count = 0
+
+    def add(self, path, file_uuid, build_uuid):
+        """Append one source row"""
+        if self._file is not None:
+            self._file.write(f"{file_uuid}\t{build_uuid}\t{path}\n".encode('utf-8'))
+        else:
+            self._rows.append((path, file_uuid, build_uuid))
+        self._count += 1
+
+    def __len__(self):
+        return self._count
+
+    def __iter__(self):
+        if self._file is None:
+            yield from self._rows
+            return
+
+        # pread keeps a private offset, so iterations may overlap safely
+        self._file.flush()
+        fd = self._file.fileno()
+        offset = 0
+        pending = b''
+        while True:
+            chunk = os.pread(fd, 1 << 16, offset)
+            if not chunk:
+                break
+            offset += len(chunk)
+            *lines, pending = (pending + chunk).split(b'\n')
+            for line in lines:
+                file_uuid, build_uuid, path = line.decode('utf-8').split('\t', 2)
+                yield path, file_uuid, build_uuid
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _crc32(path):
+    crc = 0
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(_BLOCK), b''):
+            crc = zlib.crc32(block, crc)
+    return crc
+
+
+def _same_bytes(a, b):
+    with open(a, 'rb') as fa, open(b, 'rb') as fb:
+        while True:
+            block = fa.read(_BLOCK)
+            if block != fb.read(_BLOCK):
+                return False
+            if not block:
+                return True
+
+
+def _unchanged(path, tmp, size, crc):
+    """Size first, then a CRC-32 of the old file, then the bytes themselves"""
+    try:
+        if os.stat(path).st_size != size:
+            return False
+    except FileNotFoundError:
+        return False
+    return _crc32(path) == crc and _same_bytes(path, tmp)
+
+
+def _file_mode(path):
+    try:
+        return os.stat(path).st_mode & 0o7777
+    except FileNotFoundError:
+        umask = os.umask(0)
+        os.umask(umask)
+        return 0o666 & ~umask
+
+
+def write_stream(path, chunks):
+    """Write text chunks to path as they are produced, never joining them.
+
+    The chunks go to a temporary file beside path, which then atomically
+    replaces it, unless the content is identical: then path is left alone,
+    mtime included. Returns True if path was written, False if skipped.
+    """
+    fd, tmp = tempfile.mkstemp(prefix=f".{os.path.basename(path)}.", suffix='.tmp',
+                               dir=os.path.dirname(os.path.abspath(path)))
+    try:
+        size = crc = 0
+        with os.fdopen(fd, 'wb') as f:
+            for chunk in chunks:
+                data = chunk.encode('utf-8')
+                size += len(data)
+                crc = zlib.crc32(data, crc)
+                f.write(data)
+        if _unchanged(path, tmp, size, crc):
+            os.unlink(tmp)
+            return False
+        os.chmod(tmp, _file_mode(path))
+        os.replace(tmp, path)
+        return True
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except FileNotFoundError:
+            pass
+        raise
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Answer read-only questions about an Xcode project from a cached index
+
+Which targets build a file, which files a target's phase holds, which
+targets and phases exist. The first query parses project.pbxproj and
+saves an index next to the .xcodeproj (see pbxtools.index); later ones
+load the index directly for as long as the project's content hash
+matches, so they never parse the project.
+
+--declares, --users and --affected answer from the Swift type index
+instead (see pbxtools.swift), brought up to date first by re-reading only
+the Swift files that changed since it was last saved.
+"""
+
+import argparse
+import json
+import os
+
+from pbxtools import swift, targets
+from pbxtools.classify import SOURCES
+from pbxtools.index import load_index
+
+DEFAULT_PROJECT = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                               'TripBroComplete', 'TripBro.xcodeproj')
+
+def main():
+    parser = argparse.ArgumentParser(description="Query the files and targets of an Xcode project")
+    parser.add_argument("--project", default=DEFAULT_PROJECT,
+                        help="path to the .xcodeproj (default: TripBroComplete/TripBro.xcodeproj)")
+    parser.add_argument("--file", dest="files", nargs="+", default=[], metavar="PATH",
+                        help="show the targets and phases that build each file")
+    parser.add_argument("--target", help="list the files in this target's build phase")
+    parser.add_argument("--phase", default=SOURCES,
+                        help=f"build phase listed with --target (default: {SOURCES})")
+    parser.add_argument("--targets", action="store_true", help="list the targets and their build phases")
+    parser.add_argument("--declares", nargs="+", default=[], metavar="PATH",
+                        help="show the Swift types each file declares and the project types it uses")
+    parser.add_argument("--users", nargs="+", default=[], metavar="TYPE",
+                        help="show the files declaring and using each Swift type")
+    parser.add_argument("--affected", nargs="+", default=[], metavar="PATH",
+                        help="list the files using a type declared in any of these files")
+    parser.add_argument("--transitive", action="store_true",
+                        help="with --affected, follow users of users until nothing new turns up")
+    parser.add_argument("--json", action="store_true", help="print the answers as JSON")
+    parser.add_argument("--no-cache", action="store_true", help="parse the project and leave the cache alone")
+    args = parser.parse_args()
+    swift_queries = args.declares or args.users or args.affected
+    if not args.files and not args.target and not args.targets and not swift_queries:
+        parser.error("nothing to do: pass --file, --target, --targets, --declares, --users or --affected")
+
+    pbxproj = os.path.join(args.project, 'project.pbxproj')
+    base = os.path.dirname(os.path.abspath(args.project))
+    answers = {}
+
+    def relative(paths):
+        return [os.path.relpath(os.path.abspath(path), base) for path in paths]
+
+    if swift_queries:
+        # Source roots and cached paths are relative to the project's directory
+        declares, affected = relative(args.declares), relative(args.affected)
+        project_dir = os.path.abspath(args.project)
+        cwd = os.getcwd()
+        os.chdir(base)
+        try:
+            scanned = targets.scan_sources(targets.active_targets(), with_stat=True)
+            types, _, _ = swift.refresh(project_dir, scanned)
+        finally:
+            os.chdir(cwd)
+        if declares:
+            answers['declares'] = [{'path': path, 'declares': types.declared(path), 'uses': types.referenced(path)}
+                                   for path in declares]
+        if args.users:
+            answers['users'] = [{'type': name, 'declared_in': types.types().get(name, []),
+                                 'users': types.users(name)} for name in args.users]
+        if affected:
+            answers['affected'] = types.affected(affected, args.transitive)
+    if args.files or args.target or args.targets:
+        index = load_index(pbxproj, cache=not args.no_cache)
+
+    if args.targets:
+        answers['targets'] = index.targets()
+    if args.target:
+        try:
+            answers['phase'] = {'target': args.target, 'phase': args.phase,
+                                'files': index.phase_files(args.target, args.phase)}
+        except KeyError as e:
+            raise SystemExit(e.args[0])
+    if args.files:
+        answers['files'] = []
+        for path in relative(args.files):
+            answers['files'].append({'path': path, 'file_ref': index.file_ref(path),
+                                     'phases': index.memberships(path)})
+
+    if args.json:
+        print(json.dumps(answers, indent=1))
+        return
+    for name, phases in answers.get('targets', {}).items():
+        print(f"{name}: {', '.join(phases)}")
+    if 'phase' in answers:
+        listing = answers['phase']
+        print(f"{listing['target']} {listing['phase']} ({len(listing['files'])} files)")
+        for path in listing['files']:
+            print(f"  {path}")
+    for entry in answers.get('files', ()):
+        if entry['file_ref'] is None:
+            print(f"  {entry['path']}: not in project")
+        else:
+            where = ', '.join(f"{target} ({phase})" for target, phase in entry['phases']) or 'no target'
+            print(f"  {entry['path']}: {where}")
+    for entry in answers.get('declares', ()):
+        print(f"  {entry['path']}: declares {', '.join(entry['declares']) or 'nothing'}; "
+              f"uses {', '.join(entry['uses']) or 'no project types'}")
+    for entry in answers.get('users', ()):
+        if not entry['declared_in']:
+            print(f"  {entry['type']}: not declared in the project")
+            continue
+        print(f"  {entry['type']} ({', '.join(entry['declared_in'])}): "
+              f"{len(entry['users'])} users")
+        for path in entry['users']:
+            print(f"    {path}")
+    if 'affected' in answers:
+        print(f"Affected ({len(answers['affected'])} files)")
+        for path in answers['affected']:
+            print(f"  {path}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Split the project's tests into shards that take about as long as each other
+
+Reads per-test durations from results exported by earlier runs, e.g.
+
+    xcrun xcresulttool get test-results tests --path Run.xcresult > run.json
+
+finds the tests in the test targets' sources, and deals them out longest
+first over N shards (see pbxtools.testplan). Each shard gets a test plan in
+TestPlans/ and a shared scheme of the same name with parallel testing on,
+so CI can give every runner one of
+
+    xcodebuild test -project TripBro.xcodeproj -scheme TripBro-Shard2
+"""
+
+import argparse
+import json
+import os
+
+from pbxtools.lock import project_lock
+from pbxtools.pbxproj import Project
+from pbxtools.testplan import collect_tests, project_targets, read_durations, shard, write_shards
+
+DEFAULT_PROJECT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'TripBro.xcodeproj')
+
+def main():
+    parser = argparse.ArgumentParser(description="Write duration-balanced test plans and schemes")
+    parser.add_argument("results", nargs="*", metavar="RESULTS",
+                        help="test results exported as JSON (xcresulttool, or {\"Target/Type/test()\": "
+                             "seconds}); several are averaged")
+    parser.add_argument("--shards", type=int, required=True, metavar="N", help="number of shards to write")
+    parser.add_argument("--project", default=DEFAULT_PROJECT,
+                        help="path to the .xcodeproj (default: TripBro.xcodeproj)")
+    parser.add_argument("--prefix", help="name of the plans and schemes before the shard number "
+                                         "(default: PROJECT-Shard)")
+    parser.add_argument("--default-duration", type=float, metavar="SECONDS",
+                        help="duration assumed for tests with none recorded (default: the median recorded one)")
+    parser.add_argument("--dry-run", action="store_true", help="print the shards without writing files")
+    parser.add_argument("--json", action="store_true", help="print the shards as JSON")
+    args = parser.parse_args()
+    if args.shards < 1:
+        parser.error("--shards must be at least 1")
+    project_dir = os.path.normpath(args.project)
+    prefix = args.prefix or f"{os.path.splitext(os.path.basename(project_dir))[0]}-Shard"
+
+    try:
+        durations = read_durations(args.results)
+    except (OSError, ValueError) as e:
+        raise SystemExit(f"Cannot read test results: {e}")
+    pbxproj = os.path.join(project_dir, 'project.pbxproj')
+    with project_lock(pbxproj):
+        project = Project.load(pbxproj)
+    app, test_targets = project_targets(project, os.path.dirname(os.path.abspath(project_dir)))
+    if not test_targets:
+        raise SystemExit(f"{project_dir} has no test targets")
+    tests = collect_tests(test_targets, durations, args.default_duration)
+    if not tests:
+        raise SystemExit(f"No tests found in {', '.join(target.name for target in test_targets)}")
+    # More shards than tests would only add plans with nothing to run
+    count = min(args.shards, len(tests))
+    shards = shard(tests, count)
+
+    changed = [] if args.dry_run else write_shards(project_dir, shards, prefix, test_targets, app)
+    if args.json:
+        print(json.dumps([{'name': f"{prefix}{index + 1}", 'seconds': round(seconds, 3),
+                           'tests': [f"{target}/{identifier}" for target, identifier in members]}
+                          for index, (seconds, members) in enumerate(shards)], indent=1))
+        return
+    recorded = sum(1 for key in tests if key in durations)
+    total = sum(tests.values())
+    longest = max(seconds for seconds, _ in shards)
+    print(f"{len(tests)} tests ({recorded} with recorded durations), {total:.1f}s run serially")
+    if count < args.shards:
+        print(f"Only {len(tests)} tests: writing {count} shards instead of {args.shards}")
+    for index, (seconds, members) in enumerate(shards):
+        print(f"  {prefix}{index + 1}: {len(members)} tests, {seconds:.1f}s")
+    if longest:
+        print(f"Longest shard {longest:.1f}s, {total / longest:.2f}x faster than one runner")
+    for path in changed:
+        print(f"✅ {'Removed' if not os.path.exists(path) else 'Wrote'} {path}")
+    if not args.dry_run and not changed:
+        print("✅ Test plans and schemes already match; left untouched")
+
+if __name__ == "__main__":
+    main()
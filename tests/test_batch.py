@@ -0,0 +1,67 @@
+import os
+import shutil
+import subprocess
+import sys
+
+from benchmark import load_generator, make_tree
+from conftest import ROOT
+
+GENERATOR = os.path.join(ROOT, 'TripBroComplete', 'generate_project.py')
+
+
+def run(*args, cwd):
+    return subprocess.run([sys.executable, GENERATOR, *args], cwd=cwd, check=True,
+                          capture_output=True, text=True).stdout
+
+
+def read(path):
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+def test_batch_leaves_hand_written_projects_alone(tmp_path):
+    generated = tmp_path / 'generated'
+    make_tree(str(generated), 10, depth=1)
+    run('--full', cwd=generated)
+    os.remove(generated / 'TripBro' / 'App' / 'Type0.swift')
+
+    # The repository's own project: test folders only, kept by hand
+    hand = tmp_path / 'hand'
+    shutil.copytree(os.path.join(ROOT, 'TripBro.xcodeproj'), hand / 'TripBro.xcodeproj')
+    for folder in ('TripBroTests', 'TripBroUITests'):
+        shutil.copytree(os.path.join(ROOT, folder), hand / folder)
+    hand_project = hand / 'TripBro.xcodeproj' / 'project.pbxproj'
+    original = read(hand_project)
+
+    # Generated once, but its app folder is gone since
+    orphaned = tmp_path / 'orphaned'
+    make_tree(str(orphaned), 5, depth=1)
+    run('--full', cwd=orphaned)
+    shutil.rmtree(orphaned / 'TripBro')
+    orphaned_project = read(orphaned / 'TripBro.xcodeproj' / 'project.pbxproj')
+
+    output = run('--batch', str(tmp_path), '--jobs', '2', cwd=tmp_path)
+    assert '1 written, 0 unchanged, 2 skipped, 0 failed' in output
+    assert 'not a generated project' in output
+    assert 'no TripBro/ folder next to it' in output
+    assert read(hand_project) == original
+    assert read(orphaned / 'TripBro.xcodeproj' / 'project.pbxproj') == orphaned_project
+    assert b'Type0.swift' not in read(generated / 'TripBro.xcodeproj' / 'project.pbxproj')
+
+
+def update_or_die(project, args):
+    """Stands in for update_project in the pool workers"""
+    if project.endswith('Broken.xcodeproj'):
+        os._exit(1)
+    return project
+
+
+def test_a_dying_worker_only_fails_its_own_project(monkeypatch):
+    generator = load_generator()
+    monkeypatch.setattr(generator, 'update_project', update_or_die)
+    projects = [f"/src/{name}.xcodeproj" for name in ('A', 'B', 'Broken', 'C', 'D')]
+    results = list(generator._run_pool(projects, None, 2))
+    [failed] = [result for result in results if not isinstance(result, str)]
+    assert (failed.project, failed.status, failed.error) == ('/src/Broken.xcodeproj', 'failed', "worker process died")
+    assert sorted(result for result in results if isinstance(result, str)) == [
+        project for project in projects if 'Broken' not in project]
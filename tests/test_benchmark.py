@@ -0,0 +1,20 @@
+import json
+import os
+import subprocess
+import sys
+
+from conftest import ROOT
+
+
+def test_benchmark_smoke(tmp_path):
+    output = tmp_path / 'results.json'
+    subprocess.run([sys.executable, os.path.join(ROOT, 'benchmark.py'), '--sizes', '30', '--repeat', '1',
+                    '--changes', '3', '--depth', '2', '--fanout', '2', '--workdir', str(tmp_path),
+                    '--output', str(output)],
+                   cwd=ROOT, check=True, capture_output=True, text=True)
+    results = json.loads(output.read_text())['results']['30']
+    assert {'scan', 'ids', 'render', 'write', 'generate', 'patch_add', 'patch_remove', 'load',
+            'updater'} <= set(results)
+    assert all(metrics['seconds'] >= 0 and metrics['peak_bytes'] > 0 for metrics in results.values())
+    # The scratch tree is removed afterwards
+    assert sorted(os.listdir(tmp_path)) == ['results.json']
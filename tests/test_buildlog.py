@@ -0,0 +1,102 @@
+import os
+
+import pytest
+
+from conftest import FIXTURES
+from pbxtools.buildlog import CompileTimes, History, format_report, report
+
+SOURCES = '/Users/dev/TripBro/TripBro'
+TRIP = 'Models/Trip.swift'
+LIST = 'Views/TripListView.swift'
+
+
+@pytest.fixture(params=['compile_timing.log', 'compile_timing.log.gz'])
+def times(request):
+    return CompileTimes().read(os.path.join(FIXTURES, request.param)).relative_to(SOURCES)
+
+
+def test_reads_plain_and_gzipped_logs(times):
+    assert times.lines == 29
+    assert len(times.functions) == 5
+    assert set(times.files()) == {TRIP, LIST}
+
+
+def test_body_timed_twice_counts_at_its_slowest(times):
+    assert times.functions[TRIP, 42, 10, 'instance method total()'] == 151.07
+    assert times.functions[TRIP, 12, 9, 'getter id'] == 0.21
+    assert times.functions[LIST, 20, 9, 'getter body'] == 120.12
+
+
+def test_file_time_is_the_sum_of_its_functions(times):
+    ms, count = times.files()[TRIP]
+    assert count == 3
+    assert ms == pytest.approx(0.21 + 151.07 + 3.50)
+
+
+def test_warnings_are_keyed_by_position(times):
+    assert times.warnings == {(TRIP, 42, 10): 151.0, (LIST, 20, 9): 120.0}
+
+
+def test_feed_parses_body_lines():
+    times = CompileTimes().feed([
+        "12.5ms\t/src/A.swift:3:5\tgetter value",
+        "0.1ms\t/src/A.swift:3:5\tgetter value",
+        "7ms\t/src/B.swift:10:1\tglobal function main() ",
+        "Compiling A.swift",
+    ])
+    assert times.lines == 4
+    assert times.functions == {('/src/A.swift', 3, 5, 'getter value'): 12.5,
+                               ('/src/B.swift', 10, 1, 'global function main()'): 7.0}
+    assert times.common_root() == '/src'
+    assert times.warnings == {}
+
+
+def test_feed_parses_warnings():
+    times = CompileTimes().feed([
+        "/src/A.swift:3:5: warning: getter 'value' took 250ms to type-check (limit: 100ms)",
+        "/src/A.swift:3:5: warning: getter 'value' took 240ms to type-check (limit: 100ms)",
+        "/src/A.swift:9:1: warning: unused variable 'x'",
+    ])
+    assert times.warnings == {('/src/A.swift', 3, 5): 250.0}
+    assert times.functions == {}
+
+
+def test_report_ranks_files_and_functions(times):
+    data = report(times, top=2)
+    assert [entry['path'] for entry in data['files']] == [TRIP, LIST]
+    assert [entry['name'] for entry in data['functions']] == ['instance method total()', 'getter body']
+    assert all(entry['warned'] for entry in data['functions'])
+    assert data['previous_total_ms'] is None
+    assert data['functions'][0]['delta_ms'] is None
+    assert "Slowest functions" in format_report(data)
+
+
+def test_history_trend(times, tmp_path):
+    path = str(tmp_path / 'history.json')
+    history = History.load(path)
+    assert history.runs == []
+    slower = CompileTimes().feed([f"200ms\t{TRIP}:42:10\tinstance method total()"])
+    history.record(slower, 'before')
+    history.save()
+
+    history = History.load(path)
+    data = report(times, history=history.runs, depth=3)
+    total = next(entry for entry in data['functions'] if entry['line'] == 42)
+    assert total['delta_ms'] == pytest.approx(151.07 - 200)
+    assert total['trend'] == [200.0, 151.07]
+    body = next(entry for entry in data['functions'] if entry['line'] == 20)
+    assert body['delta_ms'] is None
+    assert data['previous_total_ms'] == 200.0
+    assert "since the last run" in format_report(data)
+
+    for label in 'abc':
+        history.record(times, label, keep=2)
+    assert [run['label'] for run in history.runs] == ['b', 'c']
+
+
+def test_history_ignores_unreadable_files(tmp_path):
+    path = tmp_path / 'history.json'
+    path.write_text('{"version": 0, "runs": [{}]}')
+    assert History.load(str(path)).runs == []
+    path.write_text('not json')
+    assert History.load(str(path)).runs == []
@@ -0,0 +1,46 @@
+from pbxtools.check import check, fix, relink_configurations
+from pbxtools.pbxproj import Project
+from test_pbxproj import PROJECTS
+
+# TripBroComplete's target configuration list names two configurations that do not exist
+DAMAGED_LIST = '8130F382B44D4D58AEE10719'
+TARGET_CONFIGS = ['5199BF716AD34CB08A73C4EF', '7485DC65FD2948D7ABC37E82']
+
+
+def test_fix_relinks_orphaned_configurations():
+    project = Project.load(PROJECTS[1])
+    issues, _ = check(project)
+    assert {issue.kind for issue in issues} == {'config-list', 'dangling', 'orphan'}
+
+    assert fix(project) == 0
+    assert list(project.get(DAMAGED_LIST)['buildConfigurations']) == TARGET_CONFIGS
+    assert check(project)[0] == []
+    text = project.dumps()
+    assert f"{TARGET_CONFIGS[0]} /* Debug */," in text
+    assert Project.parse(text).dumps() == text
+
+
+def test_ambiguous_configurations_are_kept():
+    project = Project.load(PROJECTS[1])
+    # Both lists now point nowhere, so either could own either Debug
+    project_list = project.root_object['buildConfigurationList']
+    configs = project.get(project_list)['buildConfigurations']
+    for item in configs.items():
+        item.value = item.raw = '0' * 23 + item.value[-1]
+    assert relink_configurations(project) == 0
+    fix(project)
+    assert len(project.objects_of('XCBuildConfiguration')) == 4
+    assert any(issue.kind == 'config-list' for issue in check(project)[0])
+
+
+def test_empty_and_mismatched_configuration_lists_are_reported():
+    project = Project.load(PROJECTS[1])
+    fix(project)
+    config_list = project.get(DAMAGED_LIST)
+    config_list['defaultConfigurationName'] = 'Staging'
+    issues = [str(issue) for issue in check(project)[0]]
+    assert issues == [f"{DAMAGED_LIST}: defaultConfigurationName Staging names no listed configuration"]
+
+    config_list['buildConfigurations'].remove_all(set(TARGET_CONFIGS))
+    issues = [issue for issue in check(project)[0] if issue.kind == 'config-list']
+    assert [str(issue) for issue in issues] == [f"{DAMAGED_LIST}: configuration list has no buildConfigurations"]
@@ -0,0 +1,48 @@
+import contextlib
+import io
+import os
+
+import pytest
+
+from benchmark import load_generator, make_tree
+from pbxtools import targets
+
+
+@pytest.fixture
+def generator(tmp_path, monkeypatch):
+    make_tree(str(tmp_path), 40, depth=2, fanout=2)
+    monkeypatch.chdir(tmp_path)
+    return load_generator()
+
+
+def update(generator, full=False):
+    args = generator.build_parser().parse_args(['--full'] if full else [])
+    with contextlib.redirect_stdout(io.StringIO()) as output:
+        written = generator.update(args)
+    return written, output.getvalue()
+
+
+def test_patch_matches_a_full_regeneration(generator):
+    update(generator, full=True)
+    classifier = generator.classifier_for(generator.build_parser().parse_args([]))
+    scanned = sorted(targets.scan_sources(targets.active_targets(), with_stat=True, classifier=classifier))
+    os.remove(scanned[1])
+    for path in ('TripBro/AAA/Deep/A.swift', 'TripBro/App/Aaa.swift', 'TripBro/App/0data.json'):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w') as f:
+            f.write('{}\n')
+
+    written, output = update(generator)
+    assert written and 'patched: 3 added, 1 removed' in output
+    with open(generator.PROJECT_FILE, 'rb') as f:
+        patched = f.read()
+    written, _ = update(generator, full=True)
+    assert not written
+    with open(generator.PROJECT_FILE, 'rb') as f:
+        assert f.read() == patched
+
+
+def test_unchanged_tree_is_left_alone(generator):
+    assert update(generator, full=True)[0]
+    written, output = update(generator)
+    assert not written and 'up to date' in output
@@ -0,0 +1,48 @@
+from pbxtools.groups import GroupTrie, group_order, iter_groups, missing_groups, prune_groups
+from pbxtools.model import Group
+from pbxtools.pbxproj import Project
+from test_pbxproj import PROJECTS
+
+
+def group_id(path):
+    return f"G:{path}"
+
+
+def test_iter_groups_yields_deepest_first():
+    trie = GroupTrie('root')
+    files = [('', 'r'), ('A', 'a'), ('A/B', 'ab'), ('C', 'c')]
+    groups = list(iter_groups(trie, files, group_id, root_path='Sources'))
+    assert [group.uuid for group in groups] == ['G:A/B', 'G:A', 'G:C', 'root']
+    assert sorted(groups, key=lambda group: group_order(trie.paths()[group.uuid])) == groups
+    assert trie.paths() == {'root': '', 'G:A': 'A', 'G:A/B': 'A/B', 'G:C': 'C'}
+
+
+def test_missing_groups_only_touches_the_trie():
+    trie = GroupTrie('root')
+    list(iter_groups(trie, [('A', 'a')], group_id))
+    node, created = missing_groups(trie, 'A/B/C', group_id)
+    assert node.uuid == 'G:A/B/C'
+    assert [path for path, _ in created] == ['A/B', 'A/B/C']
+    assert trie.get('A/B/C') is node
+    assert missing_groups(trie, 'A', group_id) == (trie.get('A'), [])
+
+
+def test_from_project_and_prune():
+    project = Project.load(PROJECTS[1])
+    trie = GroupTrie.from_project(project, 'TripBro')
+    assert trie is not None
+    paths = trie.paths()
+    directory = max(paths.values(), key=lambda path: path.count('/'))
+    uuid = trie.get(directory).uuid
+    assert project.get(uuid)['isa'] == 'PBXGroup'
+
+    node, created = missing_groups(trie, 'Empty/Leaf', group_id)
+    parent = trie.root
+    for path, child in created:
+        project.add_object(child.uuid, Group(child.uuid, path=path.rsplit('/', 1)[-1]).to_dict())
+        project.get(parent.uuid)['children'].append(child.uuid)
+        parent = child
+    prune_groups(project, trie, 'Empty/Leaf')
+    assert trie.get('Empty') is None
+    assert 'G:Empty' not in project and 'G:Empty/Leaf' not in project
+    assert project.dumps() == Project.load(PROJECTS[1]).dumps()
@@ -0,0 +1,46 @@
+import pytest
+
+from pbxtools.ids import IDCollisionError, IDRegistry, hash_id, project_keys, registry_from_project
+from pbxtools.pbxproj import Project
+from test_pbxproj import PROJECTS
+
+
+def test_hash_id_is_stable():
+    uuid = hash_id('TripBro', 'PBXBuildFile', 'TripBro/App/TripBroApp.swift')
+    assert len(uuid) == 24 and uuid == uuid.upper()
+    assert uuid == hash_id('TripBro', 'PBXBuildFile', 'TripBro/App/TripBroApp.swift')
+    assert uuid != hash_id('TripBroTests', 'PBXBuildFile', 'TripBro/App/TripBroApp.swift')
+    assert uuid != hash_id('TripBro', 'PBXBuildFile', 'TripBro/App/TripBroApp.swift', salt=1)
+
+
+def test_registry_salts_reserved_ids():
+    registry = IDRegistry()
+    registry.reserve(hash_id('', 'PBXGroup', 'TripBro'))
+    uuid = registry.id_for('', 'PBXGroup', 'TripBro')
+    assert uuid == hash_id('', 'PBXGroup', 'TripBro', salt=1)
+    assert registry.collisions == 1
+    assert registry.id_for('', 'PBXGroup', 'TripBro') == uuid
+    assert registry.lookup('', 'PBXGroup', 'TripBro') == uuid
+    assert registry.release('', 'PBXGroup', 'TripBro') == uuid
+    assert registry.lookup('', 'PBXGroup', 'TripBro') is None
+
+
+def test_seeds_are_claimed_on_request():
+    registry = IDRegistry()
+    registry.seed('', 'PBXGroup', 'TripBro', 'A' * 24)
+    registry.seed('', 'PBXGroup', 'Stale', 'B' * 24)
+    assert len(registry) == 0
+    assert registry.id_for('', 'PBXGroup', 'TripBro') == 'A' * 24
+    with pytest.raises(IDCollisionError):
+        registry.seed('', 'PBXGroup', 'TripBro', 'C' * 24)
+
+
+@pytest.mark.parametrize('path', PROJECTS, ids=['TripBro', 'TripBroComplete'])
+def test_registry_from_project_reuses_its_ids(path):
+    project = Project.load(path)
+    registry = registry_from_project(project)
+    keys = {key: uuid for key, uuid in project_keys(project) if uuid and key[2] is not None}
+    assert keys
+    for key, uuid in keys.items():
+        assert registry.id_for(*key) == uuid
+    assert registry.id_for('', 'PBXGroup', 'NoSuchDirectory') not in project.objects
@@ -0,0 +1,67 @@
+import os
+import shutil
+
+import pytest
+
+from pbxtools import index as index_module
+from pbxtools.index import ProjectIndex, index_path, load_index
+from pbxtools.pbxproj import Project
+from test_pbxproj import PROJECTS
+
+
+@pytest.fixture
+def pbxproj(tmp_path):
+    project_dir = tmp_path / 'TripBro.xcodeproj'
+    project_dir.mkdir()
+    path = str(project_dir / 'project.pbxproj')
+    shutil.copyfile(PROJECTS[1], path)
+    return path
+
+
+def test_lookups(pbxproj):
+    index = ProjectIndex.from_project(Project.load(pbxproj))
+    assert index.file_ref('TripBro/./Trip.swift') == 'C73C28BE71A24162B73A36EC'
+    assert index.memberships('TripBro/Trip.swift') == [('TripBro', 'Sources')]
+    assert index.targets_for('TripBro/Trip.swift') == ['TripBro']
+    assert index.targets_for('TripBro/Missing.swift') == []
+    assert index.targets() == {'TripBro': ['Sources', 'Frameworks', 'Resources']}
+    sources = index.phase_files('TripBro')
+    assert len(sources) == 13 and sources[-1] == 'TripBro/ContentView.swift'
+    assert index.phase_files('TripBro', 'Frameworks') == []
+    with pytest.raises(KeyError):
+        index.phase_files('TripBroTests')
+
+
+def test_cache_is_reused_until_the_project_changes(pbxproj, monkeypatch):
+    cache = index_path(pbxproj)
+    assert cache == os.path.join(os.path.dirname(os.path.dirname(pbxproj)), '.TripBro.xcodeproj.index.json')
+    first = load_index(pbxproj)
+    assert os.path.exists(cache)
+
+    def no_parse(path):
+        raise AssertionError("parsed a project the cache covers")
+    with monkeypatch.context() as patch:
+        patch.setattr(index_module.Project, 'load', no_parse)
+        cached = load_index(pbxproj)
+    assert cached.files == first.files and cached.phases == first.phases
+    assert cached.file_of == first.file_of
+
+    with open(pbxproj) as f:
+        text = f.read()
+    with open(pbxproj, 'w') as f:
+        f.write(text.replace('path = Trip.swift;', 'path = Journey.swift;'))
+    changed = load_index(pbxproj)
+    assert changed.digest != first.digest
+    assert changed.targets_for('TripBro/Journey.swift') == ['TripBro']
+    assert ProjectIndex.load(cache).digest == changed.digest
+
+
+def test_unreadable_cache_is_rebuilt_and_no_cache_leaves_it_alone(pbxproj):
+    cache = index_path(pbxproj)
+    with open(cache, 'w') as f:
+        f.write('{"version": 0}')
+    assert load_index(pbxproj, cache=False).targets_for('TripBro/Trip.swift') == ['TripBro']
+    with open(cache) as f:
+        assert f.read() == '{"version": 0}'
+    assert load_index(pbxproj).targets_for('TripBro/Trip.swift') == ['TripBro']
+    assert ProjectIndex.load(cache) is not None
@@ -0,0 +1,81 @@
+import os
+
+from pbxtools.manifest import Manifest, file_digest, manifest_path, stat_key
+
+
+def write(path, text):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as f:
+        f.write(text)
+
+
+def scan(root):
+    found = {}
+    for directory, _, files in os.walk(root):
+        for name in files:
+            path = os.path.join(directory, name)
+            found[os.path.relpath(path, root)] = tuple(stat_key(path))
+    return found
+
+
+def test_manifest_sits_next_to_the_project():
+    assert manifest_path('/src/TripBro.xcodeproj/') == '/src/.TripBro.xcodeproj.manifest.json'
+
+
+def test_diff_reports_added_removed_and_changed(tmp_path):
+    root = tmp_path / 'TripBro'
+    write(root / 'A.swift', 'a')
+    write(root / 'B.swift', 'b')
+    manifest = Manifest(str(tmp_path / 'manifest.json'))
+    for path, (size, mtime_ns) in scan(root).items():
+        manifest.record(path, size, mtime_ns, file_digest(os.path.join(root, path)), 'ID')
+    manifest.save()
+
+    manifest = Manifest.load(manifest.path)
+    assert manifest.diff(scan(root), str(root)) == ([], [], [])
+    os.remove(root / 'B.swift')
+    write(root / 'C.swift', 'c')
+    write(root / 'A.swift', 'edited')
+    assert manifest.diff(scan(root), str(root)) == (['C.swift'], ['B.swift'], ['A.swift'])
+    assert manifest.files['A.swift'][2] == file_digest(str(root / 'A.swift'))
+    assert manifest.files['A.swift'][3] == 'ID'
+
+
+def test_touched_files_only_count_without_hashing(tmp_path):
+    root = tmp_path / 'TripBro'
+    write(root / 'A.swift', 'a')
+    manifest = Manifest(str(tmp_path / 'manifest.json'))
+    size, mtime_ns = stat_key(str(root / 'A.swift'))
+    manifest.record('A.swift', size, mtime_ns, file_digest(str(root / 'A.swift')))
+    os.utime(root / 'A.swift', ns=(mtime_ns + 10**9, mtime_ns + 10**9))
+
+    assert manifest.diff(scan(root)) == ([], [], ['A.swift'])
+    manifest.files['A.swift'][1] = mtime_ns
+    assert manifest.diff(scan(root), str(root)) == ([], [], [])
+    # The new mtime is recorded, so the next run skips hashing
+    assert manifest.files['A.swift'][1] == mtime_ns + 10**9
+
+
+def test_unreadable_or_old_manifests_load_empty(tmp_path):
+    path = tmp_path / 'manifest.json'
+    assert Manifest.load(str(path)).files == {}
+    path.write_text('{"version": 0, "files": {"A.swift": [1, 2, null]}}')
+    assert Manifest.load(str(path)).files == {}
+    path.write_text('not json')
+    assert Manifest.load(str(path)).files == {}
+
+
+def test_discard_keeps_an_empty_manifest(tmp_path):
+    manifest = Manifest(str(tmp_path / 'manifest.json'), {'A.swift': [1, 2, None]}, {'full': True})
+    manifest.discard()
+    loaded = Manifest.load(manifest.path)
+    assert os.path.exists(manifest.path)
+    assert (loaded.files, loaded.meta) == ({}, {})
+
+
+def test_directories_hash_their_contents(tmp_path):
+    catalog = tmp_path / 'Assets.xcassets'
+    write(catalog / 'Icon.imageset' / 'Contents.json', '{}')
+    before = file_digest(str(catalog))
+    write(catalog / 'Icon.imageset' / 'Contents.json', '{"x": 1}')
+    assert file_digest(str(catalog)) != before
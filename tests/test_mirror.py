@@ -0,0 +1,112 @@
+import errno
+import os
+
+from pbxtools import mirror as mirror_module
+from pbxtools.mirror import mirror
+
+
+def write(path, text, mtime_ns=None):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as f:
+        f.write(text)
+    if mtime_ns is not None:
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def tree(root):
+    found = {}
+    for directory, dirs, files in os.walk(root):
+        for name in dirs:
+            found[os.path.relpath(os.path.join(directory, name), root)] = None
+        for name in files:
+            with open(os.path.join(directory, name)) as f:
+                found[os.path.relpath(os.path.join(directory, name), root)] = f.read()
+    return found
+
+
+def test_copies_then_leaves_unchanged_files_alone(tmp_path):
+    src, dst = tmp_path / 'src', tmp_path / 'dst'
+    write(src / 'App' / 'A.swift', 'a')
+    write(src / 'B.swift', 'b')
+    result = mirror(str(src), str(dst))
+    assert (result.copied, result.unchanged, result.removed) == (2, 0, 0)
+    assert tree(dst) == tree(src)
+    assert os.stat(dst / 'B.swift').st_mtime_ns == os.stat(src / 'B.swift').st_mtime_ns
+    assert str(mirror(str(src), str(dst))) == "0 copied, 0 linked, 2 unchanged, 0 removed"
+
+
+def test_deletes_what_vanished_from_the_source(tmp_path):
+    src, dst = tmp_path / 'src', tmp_path / 'dst'
+    write(src / 'Keep.swift', 'k')
+    write(src / 'Old' / 'Deep' / 'Gone.swift', 'g')
+    write(src / 'Gone.swift', 'g')
+    mirror(str(src), str(dst))
+    os.remove(src / 'Gone.swift')
+    os.remove(src / 'Old' / 'Deep' / 'Gone.swift')
+    os.rmdir(src / 'Old' / 'Deep')
+    os.rmdir(src / 'Old')
+    write(dst / '.DS_Store', 'finder')
+
+    # Old/Deep, Old and Gone.swift; the nested file goes with its directory
+    result = mirror(str(src), str(dst))
+    assert result.removed == 3
+    assert tree(dst) == {'Keep.swift': 'k', '.DS_Store': 'finder'}
+
+
+def test_symlinked_directory_is_unlinked_not_emptied(tmp_path):
+    src, dst, outside = tmp_path / 'src', tmp_path / 'dst', tmp_path / 'outside'
+    write(src / 'A.swift', 'a')
+    write(outside / 'Precious.swift', 'p')
+    os.makedirs(dst)
+    os.symlink(outside, dst / 'Linked')
+    mirror(str(src), str(dst))
+    assert not os.path.lexists(dst / 'Linked')
+    assert tree(outside) == {'Precious.swift': 'p'}
+
+
+def test_file_and_directory_swap_places(tmp_path):
+    src, dst = tmp_path / 'src', tmp_path / 'dst'
+    write(src / 'Models' / 'Trip.swift', 't')
+    write(src / 'Views', 'a file for now')
+    mirror(str(src), str(dst))
+
+    os.remove(src / 'Models' / 'Trip.swift')
+    os.rmdir(src / 'Models')
+    write(src / 'Models', 'now a file')
+    os.remove(src / 'Views')
+    write(src / 'Views' / 'List.swift', 'l')
+    mirror(str(src), str(dst))
+    assert tree(dst) == {'Models': 'now a file', 'Views': None, 'Views/List.swift': 'l'}
+
+
+def test_link_falls_back_to_copying(tmp_path, monkeypatch):
+    src, dst = tmp_path / 'src', tmp_path / 'dst'
+    write(src / 'A.swift', 'a')
+    result = mirror(str(src), str(dst), link=True)
+    assert result.linked == 1
+    assert os.stat(dst / 'A.swift').st_ino == os.stat(src / 'A.swift').st_ino
+
+    def cross_device(src, dst):
+        raise OSError(errno.EXDEV, "Invalid cross-device link")
+    monkeypatch.setattr(mirror_module.os, 'link', cross_device)
+    write(src / 'B.swift', 'b')
+    result = mirror(str(src), str(dst), link=True)
+    assert (result.linked, result.copied, result.unchanged) == (0, 1, 1)
+    assert os.stat(dst / 'B.swift').st_ino != os.stat(src / 'B.swift').st_ino
+    assert tree(dst) == tree(src)
+
+
+def test_hash_mode_compares_contents(tmp_path):
+    src, dst = tmp_path / 'src', tmp_path / 'dst'
+    mtime = 1_700_000_000_000_000_000
+    write(src / 'Same.swift', 'same', mtime)
+    write(dst / 'Same.swift', 'same', mtime + 1)
+    write(src / 'Edited.swift', 'new!', mtime)
+    write(dst / 'Edited.swift', 'old!', mtime)
+
+    # Same size and mtime hide the edit from a stat comparison
+    assert mirror(str(src), str(dst)).unchanged == 1
+    assert tree(dst)['Edited.swift'] == 'old!'
+    result = mirror(str(src), str(dst), compare='hash')
+    assert (result.copied, result.unchanged) == (1, 1)
+    assert tree(dst) == tree(src)
@@ -0,0 +1,21 @@
+import tracemalloc
+
+from pbxtools.model import BuildFile, FileReference, measure
+
+UUID = 'A' * 24
+
+
+def test_measure_counts_only_the_objects():
+    paths = [f"Models/Type{i}.swift" for i in range(1000)]
+    size = measure(lambda i: FileReference(UUID, paths[i], 'sourcecode.swift'), 1000)
+    assert 0 < size < 200
+    assert not tracemalloc.is_tracing()
+
+
+def test_measure_leaves_outside_tracing_running():
+    tracemalloc.start()
+    try:
+        measure(lambda i: BuildFile(UUID, None), 10)
+        assert tracemalloc.is_tracing()
+    finally:
+        tracemalloc.stop()
@@ -0,0 +1,49 @@
+import json
+
+import pytest
+
+from pbxtools.pbxjson import from_json, iter_json, to_json
+from pbxtools.pbxproj import Project
+from test_pbxproj import PROJECTS
+
+
+@pytest.fixture(params=PROJECTS, ids=['TripBro', 'TripBroComplete'])
+def project(request):
+    return Project.load(request.param)
+
+
+def test_streamed_text_matches_the_document(project):
+    for trivia in (True, False):
+        assert json.loads(''.join(iter_json(project, trivia))) == to_json(project, trivia)
+
+
+def test_round_trip_is_byte_faithful(project):
+    document = json.loads(''.join(iter_json(project)))
+    assert from_json(document).dumps() == project.dumps()
+
+
+def test_without_trivia_the_graph_survives(project):
+    document = json.loads(''.join(iter_json(project, trivia=False)))
+    rebuilt = from_json(document)
+    assert to_json(rebuilt, trivia=False)['project'] == document['project']
+    assert Project.parse(rebuilt.dumps()).dumps() == rebuilt.dumps()
+
+
+def test_edits_keep_the_rest_of_the_file(project):
+    document = to_json(project)
+    objects = document['project']['objects']
+    uuid, obj = next((uuid, obj) for uuid, obj in objects.items()
+                     if obj['isa'] == 'XCBuildConfiguration' and 'SWIFT_VERSION' in obj['buildSettings'])
+    obj['buildSettings']['SWIFT_VERSION'] = '6.0'
+    before, after = project.dumps().splitlines(), from_json(document).dumps().splitlines()
+    assert len(after) == len(before)
+    assert [line.strip() for old, line in zip(before, after) if old != line] == ['SWIFT_VERSION = 6.0;']
+    del objects[uuid]
+    assert f"\n\t\t{uuid} " not in from_json(document).dumps()
+
+
+def test_rejects_other_documents():
+    with pytest.raises(ValueError):
+        from_json({'objects': {}})
+    with pytest.raises(ValueError):
+        from_json({'pbxproj': 99, 'project': {}})
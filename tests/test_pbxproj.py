@@ -0,0 +1,65 @@
+import os
+
+import pytest
+
+from conftest import ROOT
+from pbxtools.pbxproj import PBXDict, PBXParseError, Project, quote, unquote
+
+PROJECTS = [os.path.join(ROOT, 'TripBro.xcodeproj', 'project.pbxproj'),
+            os.path.join(ROOT, 'TripBroComplete', 'TripBro.xcodeproj', 'project.pbxproj')]
+
+
+@pytest.mark.parametrize('path', PROJECTS, ids=['TripBro', 'TripBroComplete'])
+def test_round_trip_is_byte_faithful(path):
+    with open(path, 'rb') as f:
+        data = f.read()
+    project = Project.load(path)
+    assert project.dumps().encode('utf-8') == data
+    assert ''.join(project.iter_chunks()).encode('utf-8') == data
+    assert Project.parse(data.decode('utf-8')).dumps() == project.dumps()
+
+
+@pytest.mark.parametrize('path', PROJECTS, ids=['TripBro', 'TripBroComplete'])
+def test_save_leaves_an_unchanged_project_untouched(path, tmp_path):
+    copy = tmp_path / 'project.pbxproj'
+    copy.write_bytes(open(path, 'rb').read())
+    before = os.stat(copy).st_mtime_ns
+    assert not Project.load(str(copy)).save(str(copy))
+    assert os.stat(copy).st_mtime_ns == before
+
+
+def test_quote_round_trips():
+    for value in ('Trip.swift', 'My App', 'a"b\\c', 'line\nbreak', '___VARIABLE', 'a//b', ''):
+        assert unquote(quote(value)) == value
+    assert quote('Trip.swift') == 'Trip.swift'
+    assert quote('My App') == '"My App"'
+
+
+def test_parse_errors():
+    with pytest.raises(PBXParseError):
+        Project.parse('// !$*UTF8*$!\n{ objects = { ;\n')
+
+
+def test_insert_before_and_after():
+    node = PBXDict({'a': '1', 'c': '3'})
+    node.insert_before('c', 'b', '2')
+    node.insert_after('c', 'd', '4')
+    node.insert_before('a', 'first', '0')
+    assert list(node) == ['first', 'a', 'b', 'c', 'd']
+    del node['c']
+    assert list(node) == ['first', 'a', 'b', 'd']
+
+
+def test_add_object_before_keeps_section_markers():
+    project = Project.load(PROJECTS[1])
+    files = list(project.objects_of('PBXFileReference'))
+    obj = {'isa': 'PBXFileReference', 'path': 'New.swift', 'sourceTree': '<group>'}
+    project.add_object('0' * 24, obj, before=files[0])
+    project.add_object('F' * 24, dict(obj, path='Last.swift'))
+    assert list(project.objects_of('PBXFileReference')) == ['0' * 24, *files, 'F' * 24]
+    text = project.dumps()
+    begin = text.index('/* Begin PBXFileReference section */')
+    end = text.index('/* End PBXFileReference section */')
+    defined = [text.index(f"\n\t\t{uuid} ") for uuid in ('0' * 24, files[0], 'F' * 24)]
+    assert begin < defined[0] < defined[1] < defined[2] < end
+    assert Project.parse(text).dumps() == text
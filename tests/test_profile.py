@@ -0,0 +1,85 @@
+import contextlib
+import io
+import json
+import tracemalloc
+
+import pytest
+
+from benchmark import load_generator, make_tree
+from pbxtools import profile
+
+
+@pytest.fixture(autouse=True)
+def disabled(monkeypatch):
+    # Restored on teardown, so a failing test cannot leave profiling on
+    monkeypatch.setattr(profile, '_active', None)
+
+
+def test_disabled_profiling_is_free():
+    sections = [('PBXGroup', [])]
+    chunks = iter(['a'])
+    assert profile.active() is None
+    assert profile.phase('scan') is profile.phase('write')
+    assert profile.timed('render', chunks) is chunks
+    assert profile.counted(sections) is sections
+    assert profile.finish('unused') is None
+
+
+def test_phases_nest_and_accumulate(tmp_path):
+    profiler = profile.enable(memory=True)
+    with profile.phase('total'):
+        with profile.phase('scan'):
+            data = [bytes(1000) for _ in range(100)]
+        assert list(profile.timed('render', ['a', 'b', 'c'])) == ['a', 'b', 'c']
+        assert list(profile.timed('render', ['d'])) == ['d']
+        for _, objects in profile.counted([('PBXFileReference', ['x', 'y']), ('PBXGroup', [])]):
+            list(objects)
+    prefix = str(tmp_path / 'run')
+    assert profile.finish(prefix) is profiler
+    assert profile.active() is None
+
+    with open(f"{prefix}.json") as f:
+        report = json.load(f)
+    phases = {entry['name']: entry for entry in report['phases']}
+    assert [entry['name'] for entry in report['phases']] == ['total', 'scan', 'render']
+    assert (phases['total']['depth'], phases['scan']['depth'], phases['render']['depth']) == (0, 1, 1)
+    assert phases['render']['calls'] == 6
+    assert phases['scan']['alloc_bytes'] >= 100_000
+    assert phases['total']['peak_bytes'] >= phases['scan']['peak_bytes']
+    assert report['objects'] == {'PBXFileReference': 2}
+    assert report['objects_total'] == 2
+    del data
+
+    with open(f"{prefix}.trace.json") as f:
+        events = json.load(f)['traceEvents']
+    assert {event['name'] for event in events if event['ph'] == 'X'} == {'total', 'scan', 'render'}
+    assert 'render' in profiler.summary()
+
+
+def test_finish_leaves_outside_tracing_running(tmp_path):
+    tracemalloc.start()
+    try:
+        profile.enable()
+        profile.finish(str(tmp_path / 'run'))
+        assert tracemalloc.is_tracing()
+    finally:
+        tracemalloc.stop()
+    profile.enable()
+    profile.finish(str(tmp_path / 'run'))
+    assert not tracemalloc.is_tracing()
+
+
+def test_generator_profile_reports_its_phases(tmp_path, monkeypatch):
+    make_tree(str(tmp_path), 20, depth=1)
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr('sys.argv', ['generate_project.py', '--full', '--profile', 'run'])
+    generator = load_generator()
+    with contextlib.redirect_stdout(io.StringIO()) as output:
+        generator.main()
+    assert 'Profile written to run.json' in output.getvalue()
+    with open(tmp_path / 'run.json') as f:
+        report = json.load(f)
+    names = [entry['name'] for entry in report['phases']]
+    assert names[0] == 'total'
+    assert {'scan', 'write', 'render'} <= set(names)
+    assert report['objects']['PBXFileReference'] >= 20
@@ -0,0 +1,91 @@
+import os
+
+import pytest
+
+from pbxtools.scan import IgnoreRules, find_projects, iter_files, scan, scan_order
+
+
+def write(root, path, text=''):
+    path = os.path.join(root, path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as f:
+        f.write(text)
+
+
+@pytest.fixture
+def tree(tmp_path):
+    root = str(tmp_path)
+    for path in ('App/TripBroApp.swift', 'App/Generated/Api.swift', 'App/Notes.md',
+                 'Models/Trip.swift', 'Models/Trip.SWIFT', 'Models/Old/Legacy.swift',
+                 'Views/Z.swift', 'Views/a.swift', 'Views/B/C.swift',
+                 'Resources/Assets.xcassets/Contents.json', 'Resources/Assets.xcassets/Nested.swift',
+                 '.build/debug/Cached.swift', 'DerivedData/X/Build.swift', 'Pods/Alamofire/AF.swift',
+                 'Keep.xcodeproj/Inside.swift', '.DS_Store'):
+        write(root, path)
+    write(root, '.gitignore', '# generated code\nGenerated/\n*.SWIFT\n')
+    write(root, 'Models/.gitignore', 'Old/\n!Old/\n/Trip.swift\n')
+    return root
+
+
+EXPECTED = ['App/TripBroApp.swift', 'Models/Old/Legacy.swift', 'Views/B/C.swift', 'Views/Z.swift', 'Views/a.swift']
+
+
+@pytest.mark.parametrize('workers', [1, 4])
+def test_scan_prunes_and_orders(tree, workers):
+    assert scan(tree, workers=workers) == EXPECTED
+
+
+def test_nested_gitignore_rules_apply_below_their_directory(tree):
+    # Models/.gitignore re-includes Old/ and anchors Trip.swift to Models/
+    assert 'Models/Old/Legacy.swift' in scan(tree)
+    assert 'Models/Trip.swift' not in scan(tree)
+    assert 'Models/Trip.swift' in scan(tree, gitignore=False)
+    assert 'App/Generated/Api.swift' in scan(tree, gitignore=False)
+
+
+def test_iter_files_streams_the_same_order(tree):
+    assert list(iter_files(tree)) == sorted(scan(tree), key=scan_order)
+    assert list(iter_files(tree)) == scan(tree)
+
+
+def test_packages_are_reported_not_entered(tree):
+    found = scan(tree, suffixes=('.swift', '.xcassets'))
+    assert 'Resources/Assets.xcassets' in found
+    assert not any(path.startswith('Resources/Assets.xcassets/') for path in found)
+    assert scan(tree, suffixes=('.XCASSETS',)) == []
+    assert scan(tree, suffixes=('.xcassets',)) == ['Resources/Assets.xcassets']
+
+
+def test_suffixes_match_any_case(tree):
+    assert 'Models/Trip.SWIFT' in scan(tree, gitignore=False)
+    assert 'App/Notes.md' in scan(tree, suffixes=None)
+
+
+def test_with_stat_returns_sizes_and_mtimes(tree):
+    write(tree, 'Views/Z.swift', 'struct Z {}\n')
+    stats = scan(tree, with_stat=True, workers=2)
+    assert list(stats) == scan(tree)
+    st = os.stat(os.path.join(tree, 'Views/Z.swift'))
+    assert stats['Views/Z.swift'] == (st.st_size, st.st_mtime_ns)
+    assert dict(iter_files(tree, with_stat=True)) == stats
+
+
+def test_ignore_rules():
+    rules = IgnoreRules(['build/', '*.generated.swift', '/Top.swift', 'docs/**/*.md', '!keep.generated.swift'])
+    assert rules.ignored('build', True)
+    assert not rules.ignored('build', False)
+    assert rules.ignored('App/A.generated.swift', False)
+    assert not rules.ignored('App/keep.generated.swift', False)
+    assert rules.ignored('Top.swift', False)
+    assert not rules.ignored('App/Top.swift', False)
+    assert rules.ignored('docs/a/b/c.md', False)
+    assert rules.ignored('docs/c.md', False)
+    scoped = IgnoreRules().extend(['Mocks/'], base='Tests')
+    assert scoped.ignored('Tests/Mocks', True)
+    assert not scoped.ignored('Mocks', True)
+
+
+def test_find_projects(tree):
+    write(tree, 'Sub/Other.xcodeproj/project.pbxproj')
+    write(tree, 'build/Stale.xcodeproj/project.pbxproj')
+    assert find_projects(tree) == ['Keep.xcodeproj', 'Sub/Other.xcodeproj']
@@ -0,0 +1,149 @@
+import os
+import shutil
+import socket
+import threading
+import time
+
+import pytest
+
+from pbxtools.pbxproj import Project
+from pbxtools.server import ProjectServer, request
+from test_pbxproj import PROJECTS
+
+
+def set_value(project, registry, key, value):
+    project.root[key] = value
+    return value
+
+
+def set_then_fail(project, registry, key):
+    project.root[key] = 'partial'
+    raise ValueError("failed halfway")
+
+
+def get_value(project, registry, key):
+    return project.root.get(key)
+
+
+OPERATIONS = {
+    'set': (set_value, True),
+    'fail': (set_then_fail, True),
+    'get': (get_value, False),
+}
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError("timed out")
+        time.sleep(0.01)
+
+
+@pytest.fixture
+def pbxproj(tmp_path):
+    path = tmp_path / 'project.pbxproj'
+    shutil.copy(PROJECTS[1], path)
+    return str(path)
+
+
+@pytest.fixture
+def start(pbxproj, tmp_path):
+    running = []
+
+    def start(delay=0.05, max_delay=0.5, socket_path=None):
+        server = ProjectServer(pbxproj, OPERATIONS, socket_path or str(tmp_path / 'server.sock'), delay, max_delay)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        running.append((server, thread))
+        wait_for(lambda: server._server is not None and os.path.exists(server.socket_path))
+        return server
+
+    yield start
+    for server, thread in running:
+        server.shutdown()
+        thread.join(5)
+
+
+@pytest.fixture
+def saves(monkeypatch):
+    calls = []
+    save = Project.save
+
+    def counting_save(project, path):
+        calls.append(path)
+        return save(project, path)
+    monkeypatch.setattr(Project, 'save', counting_save)
+    return calls
+
+
+def on_disk(pbxproj, key):
+    return Project.load(pbxproj).root.get(key)
+
+
+def test_version_conflict(start):
+    server = start()
+    assert request(server.socket_path, [{'op': 'set', 'key': 'tag', 'value': 'one'}]) == {
+        'ok': True, 'version': 1, 'results': ['one']}
+    stale = request(server.socket_path, [{'op': 'set', 'key': 'tag', 'value': 'two'}], expect_version=0)
+    assert stale == {'ok': False, 'error': 'version conflict', 'version': 1}
+    assert request(server.socket_path, [{'op': 'get', 'key': 'tag'}], expect_version=1)['results'] == ['one']
+    # Reads do not bump the version
+    assert request(server.socket_path, [{'op': 'get', 'key': 'tag'}])['version'] == 1
+
+
+def test_failed_batch_rolls_back(start, pbxproj):
+    server = start()
+    request(server.socket_path, [{'op': 'set', 'key': 'tag', 'value': 'kept'}])
+    response = request(server.socket_path, [{'op': 'set', 'key': 'tag', 'value': 'lost'},
+                                            {'op': 'fail', 'key': 'other'}])
+    assert response == {'ok': False, 'error': 'failed halfway', 'version': 1}
+    assert request(server.socket_path, [{'op': 'get', 'key': 'tag'}, {'op': 'get', 'key': 'other'}])[
+        'results'] == ['kept', None]
+    request(server.socket_path, [{'op': 'flush'}])
+    assert on_disk(pbxproj, 'tag') == 'kept' and on_disk(pbxproj, 'other') is None
+    assert request(server.socket_path, [{'op': 'nope'}])['error'] == "unknown op 'nope'"
+
+
+def test_saves_are_coalesced(start, pbxproj, saves):
+    server = start(delay=0.2, max_delay=5.0)
+    for i in range(5):
+        request(server.socket_path, [{'op': 'set', 'key': 'tag', 'value': f"v{i}"}])
+    assert saves == [] and on_disk(pbxproj, 'tag') is None
+    wait_for(lambda: saves)
+    time.sleep(0.3)
+    assert len(saves) == 1
+    assert on_disk(pbxproj, 'tag') == 'v4'
+
+
+def test_changes_are_saved_on_shutdown(start, pbxproj):
+    server = start(delay=60, max_delay=60)
+    request(server.socket_path, [{'op': 'set', 'key': 'tag', 'value': 'pending'}])
+    server.shutdown()
+    wait_for(lambda: on_disk(pbxproj, 'tag') == 'pending')
+
+
+def test_external_write_is_replayed_under(start, pbxproj):
+    server = start(delay=60, max_delay=60)
+    request(server.socket_path, [{'op': 'set', 'key': 'tag', 'value': 'mine'}])
+    # Another tool rewrites the file while the change is still in memory
+    project = Project.load(pbxproj)
+    project.root['theirs'] = 'kept'
+    project.save(pbxproj)
+
+    response = request(server.socket_path, [{'op': 'flush'}])
+    assert response['ok'] and response['version'] == 2
+    assert on_disk(pbxproj, 'tag') == 'mine'
+    assert on_disk(pbxproj, 'theirs') == 'kept'
+
+
+def test_stale_socket_is_replaced_and_live_one_refused(start, pbxproj, tmp_path):
+    path = str(tmp_path / 'stale.sock')
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.bind(path)
+    assert os.path.exists(path)
+    server = start(socket_path=path)
+    assert request(path, [{'op': 'get', 'key': 'tag'}])['ok']
+    with pytest.raises(RuntimeError, match="already listening"):
+        ProjectServer(pbxproj, OPERATIONS, path).serve_forever()
+    assert request(server.socket_path, [{'op': 'get', 'key': 'tag'}])['ok']
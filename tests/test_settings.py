@@ -0,0 +1,79 @@
+import contextlib
+import io
+import os
+
+from benchmark import load_generator, make_tree
+from pbxtools.ids import IDRegistry
+from pbxtools.model import BuildSettings
+from pbxtools.settings import (BASE, CONFIGURATIONS, EMPTY, TIMING_CONFIGURATION, configurations_for, layered,
+                               project_configuration_list, render_xcconfig, target_configuration_list,
+                               xcconfig_files, xcconfig_group)
+
+APP = BuildSettings({'PRODUCT_NAME': '$(TARGET_NAME)', 'LD_RUNPATH_SEARCH_PATHS': ['$(inherited)', '@executable_path/Frameworks']})
+
+
+def test_layers_merge_left_to_right_and_are_shared():
+    merged = layered(BASE, CONFIGURATIONS['Debug'])
+    assert merged['SWIFT_OPTIMIZATION_LEVEL'] == '-Onone'
+    assert merged['SDKROOT'] == 'iphoneos'
+    assert layered(BASE, BuildSettings({'SDKROOT': 'macosx'}))['SDKROOT'] == 'macosx'
+    assert layered(BASE, CONFIGURATIONS['Debug']) is merged
+    assert list(merged) == sorted(merged)
+
+
+def test_timing_configuration_extends_debug():
+    configurations = configurations_for(250)
+    assert list(configurations) == ['Debug', 'Release', TIMING_CONFIGURATION]
+    timing = configurations[TIMING_CONFIGURATION]
+    assert '-warn-long-function-bodies=250' in timing['OTHER_SWIFT_FLAGS']
+    assert timing['SWIFT_OPTIMIZATION_LEVEL'] == '-Onone'
+    assert configurations_for(None) is CONFIGURATIONS
+
+
+def test_render_xcconfig():
+    assert render_xcconfig(APP, ('Base.xcconfig',)) == (
+        '#include "Base.xcconfig"\n'
+        'LD_RUNPATH_SEARCH_PATHS = $(inherited) @executable_path/Frameworks\n'
+        'PRODUCT_NAME = $(TARGET_NAME)\n')
+    spaced = BuildSettings({'FLAGS': ('-D', 'A B'), 'EMPTY_VALUE': ''})
+    assert render_xcconfig(spaced) == 'EMPTY_VALUE =\nFLAGS = -D "A B"\n'
+
+
+def test_xcconfig_files_layout():
+    files = xcconfig_files({'TripBro': APP})
+    assert list(files) == ['Base.xcconfig', 'Debug.xcconfig', 'Release.xcconfig', 'TripBro.xcconfig']
+    assert 'SDKROOT = iphoneos\n' in files['Base.xcconfig']
+    assert files['Debug.xcconfig'].startswith('#include "Base.xcconfig"\n')
+    assert 'SDKROOT' not in files['Debug.xcconfig']
+    assert '#include' not in files['TripBro.xcconfig']
+
+
+def test_configurations_reference_xcconfigs_instead_of_inlining():
+    uuid = IDRegistry().id_for
+    group, refs = xcconfig_group(uuid, {'TripBro': APP})
+    assert group.path == 'Configs'
+    project = project_configuration_list(uuid, refs)
+    target = target_configuration_list(uuid, 'TripBro', APP, refs)
+    assert [(c.name, c.base, c.settings) for c in project.configurations] == [
+        ('Debug', refs['Debug.xcconfig'], EMPTY), ('Release', refs['Release.xcconfig'], EMPTY)]
+    assert {c.base for c in target.configurations} == {refs['TripBro.xcconfig']}
+
+    inline = project_configuration_list(uuid)
+    assert [c.base for c in inline.configurations] == [None, None]
+    assert inline.configurations[1].settings == layered(BASE, CONFIGURATIONS['Release'])
+
+
+def test_generator_writes_xcconfigs(tmp_path, monkeypatch):
+    make_tree(str(tmp_path), 10, depth=1)
+    monkeypatch.chdir(tmp_path)
+    generator = load_generator()
+    with contextlib.redirect_stdout(io.StringIO()):
+        generator.update(generator.build_parser().parse_args(['--xcconfig']))
+    # The tree has no test folders, so only the app target gets a file
+    assert sorted(os.listdir('Configs')) == ['Base.xcconfig', 'Debug.xcconfig', 'Release.xcconfig',
+                                             'TripBro.xcconfig']
+    with open(generator.PROJECT_FILE) as f:
+        pbxproj = f.read()
+    assert 'baseConfigurationReference' in pbxproj
+    assert 'SDKROOT' not in pbxproj
+    assert 'path = Configs;' in pbxproj
@@ -0,0 +1,94 @@
+import os
+
+from pbxtools.swift import SwiftIndex, refresh, scan_source, swift_files, swift_index_path
+
+TRIP = '''
+import Foundation
+
+/// A Trip has Stops; "class Ghost" in a comment declares nothing
+struct Trip: Identifiable, Codable {
+    let id: UUID
+    var stops: [Stop]
+    var title = "struct Fake { }"
+    var notes = """
+        enum AlsoFake
+        """
+    class func make() -> Trip { Trip(id: UUID(), stops: []) }
+}
+
+extension Trip.Stop {}
+typealias TripID = UUID
+'''
+
+SOURCES = {
+    'TripBro/Models/Trip.swift': 'struct Trip { var stops: [Stop] }\n',
+    'TripBro/Models/Stop.swift': 'struct Stop { var place: Place }\n',
+    'TripBro/Models/Place.swift': 'struct Place {}\n',
+    'TripBro/Views/TripListView.swift': 'struct TripListView: View { var trips: [Trip] }\n',
+    'TripBro/Views/Copy.swift': 'struct Place {}\n',
+}
+
+
+def test_scan_source_skips_comments_and_literals():
+    declared, referenced = scan_source(TRIP)
+    assert declared == ['Trip', 'TripID']
+    assert referenced == ['Codable', 'Foundation', 'Identifiable', 'Stop', 'UUID']
+
+
+def write(root, sources):
+    for path, text in sources.items():
+        path = os.path.join(root, path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w') as f:
+            f.write(text)
+
+
+def stat_scan(root, paths):
+    return {path: (os.stat(os.path.join(root, path)).st_size, os.stat(os.path.join(root, path)).st_mtime_ns)
+            for path in paths}
+
+
+def test_graph_queries(tmp_path):
+    write(tmp_path, SOURCES)
+    index = SwiftIndex(str(tmp_path / 'index.json'))
+    # Identical contents are parsed once
+    assert index.update(stat_scan(tmp_path, SOURCES), str(tmp_path)) == (5, 4)
+    assert index.types()['Place'] == ['TripBro/Models/Place.swift', 'TripBro/Views/Copy.swift']
+    assert index.declared('TripBro/Models/Trip.swift') == ['Trip']
+    assert index.referenced('TripBro/Views/TripListView.swift') == ['Trip']
+    assert index.users('Stop') == ['TripBro/Models/Trip.swift']
+    assert index.affected(['TripBro/Models/Place.swift']) == ['TripBro/Models/Stop.swift']
+    assert index.affected(['TripBro/Models/Place.swift'], transitive=True) == [
+        'TripBro/Models/Stop.swift', 'TripBro/Models/Trip.swift', 'TripBro/Views/TripListView.swift']
+
+
+def test_only_moved_files_are_read_and_only_new_contents_parsed(tmp_path):
+    write(tmp_path, SOURCES)
+    project_dir = str(tmp_path / 'TripBro.xcodeproj')
+    index, read, parsed = refresh(project_dir, stat_scan(tmp_path, SOURCES), str(tmp_path))
+    assert (read, parsed) == (5, 4)
+    assert os.path.exists(swift_index_path(project_dir))
+
+    scanned = stat_scan(tmp_path, SOURCES)
+    assert refresh(project_dir, scanned, str(tmp_path))[1:] == (0, 0)
+
+    # Touched but identical: read, not parsed
+    place = str(tmp_path / 'TripBro/Models/Place.swift')
+    os.utime(place, ns=(1, 1))
+    assert refresh(project_dir, stat_scan(tmp_path, SOURCES), str(tmp_path))[1:] == (1, 0)
+
+    write(tmp_path, {'TripBro/Models/Place.swift': 'struct Place { var trip: Trip }\n'})
+    scanned = stat_scan(tmp_path, [path for path in SOURCES if path != 'TripBro/Views/Copy.swift'])
+    index, read, parsed = refresh(project_dir, scanned, str(tmp_path))
+    assert (read, parsed) == (1, 1)
+    assert 'TripBro/Views/Copy.swift' not in index.files
+    assert index.users('Trip') == ['TripBro/Models/Place.swift', 'TripBro/Views/TripListView.swift']
+    reloaded = SwiftIndex.load(swift_index_path(project_dir))
+    assert reloaded.files == index.files
+    # Contents no file has any more are dropped on save
+    assert len(reloaded.symbols) == 4
+
+
+def test_swift_files_match_the_extension_in_any_case():
+    scanned = {'TripBro/A.swift': (1, 1), 'TripBro/B.SWIFT': (1, 1), 'TripBro/Info.plist': (1, 1)}
+    assert list(swift_files(scanned)) == ['TripBro/A.swift', 'TripBro/B.SWIFT']
@@ -0,0 +1,72 @@
+import contextlib
+import io
+import os
+
+import pytest
+
+from benchmark import load_generator
+from pbxtools.pbxproj import Project
+from pbxtools.settings import APP_TARGET, UNIT_TEST_TARGET
+from pbxtools.targets import APPLICATION, UNIT_TEST, TargetSpec, membership_exceptions
+
+SPECS = (
+    TargetSpec('TripBro', APPLICATION, 'TripBro', APP_TARGET, exclude=['TripBro/Previews/**']),
+    TargetSpec('TripBroTests', UNIT_TEST, 'TripBroTests', UNIT_TEST_TARGET, depends=('TripBro',),
+               include=['TripBroTests/**', 'TripBro/Fixtures/**']),
+)
+
+
+def write(path, text='struct A {}\n'):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as f:
+        f.write(text)
+
+
+@pytest.fixture
+def tree(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    for path in ('TripBro/App/TripBroApp.swift', 'TripBro/Info.plist', 'TripBro/Docs/Guide.md',
+                 'TripBro/Docs/Deep/Notes.md', 'TripBro/Previews/TripPreview.swift',
+                 'TripBro/Fixtures/Trip.json', 'TripBro/Models/Trip.swift', 'TripBro/Models/README.md',
+                 'TripBroTests/TripTests.swift'):
+        write(path)
+    return tmp_path
+
+
+def test_exceptions_invert_membership_per_target(tree):
+    assert membership_exceptions(SPECS) == {
+        # Listed-only files, the excluded folder, and folders made only of them collapse to one entry
+        ('TripBro', 'TripBro'): ['Docs', 'Info.plist', 'Models/README.md', 'Previews'],
+        # The tests build the fixtures in addition to their own folder
+        ('TripBro', 'TripBroTests'): ['Fixtures'],
+    }
+
+
+def generate(generator, *argv):
+    args = generator.build_parser().parse_args(['--synchronized', *argv])
+    with contextlib.redirect_stdout(io.StringIO()) as output:
+        written = generator.update(args)
+    return written, output.getvalue()
+
+
+def test_generator_writes_synchronized_folders(tree):
+    generator = load_generator()
+    written, output = generate(generator)
+    assert written and 'Found 3 membership exceptions' in output
+    project = Project.load(generator.PROJECT_FILE)
+    assert project.root['objectVersion'] == '77'
+    assert 'PBXBuildFile' not in project.by_isa
+    groups = {project.objects[uuid]['path']: uuid for uuid in project.by_isa['PBXFileSystemSynchronizedRootGroup']}
+    assert list(groups) == ['TripBro', 'TripBroTests']
+    targets = {project.objects[uuid]['name']: project.objects[uuid] for uuid in project.by_isa['PBXNativeTarget']}
+    assert list(targets['TripBro']['fileSystemSynchronizedGroups']) == [groups['TripBro']]
+    assert list(targets['TripBroTests']['fileSystemSynchronizedGroups']) == [groups['TripBroTests']]
+    [exceptions] = project.objects[groups['TripBro']]['exceptions']
+    assert list(project.objects[exceptions]['membershipExceptions']) == ['Docs', 'Info.plist', 'Models/README.md']
+
+    # Xcode picks up new sources itself; only a new exception changes the project
+    write('TripBro/Views/TripListView.swift')
+    written, output = generate(generator)
+    assert not written and 'up to date' in output
+    write('TripBro/Views/README.md')
+    assert generate(generator)[0]
@@ -0,0 +1,45 @@
+import os
+
+import pytest
+
+from pbxtools.ids import IDRegistry
+from pbxtools.targets import DEFAULT_TARGETS, active_targets, collect_sources, iter_project
+
+
+def make_roots(tmp_path, *roots):
+    for root in roots:
+        os.makedirs(tmp_path / root)
+
+
+def test_active_targets_follow_the_source_roots(tmp_path, monkeypatch):
+    make_roots(tmp_path, 'TripBro', 'TripBroTests')
+    monkeypatch.chdir(tmp_path)
+    assert [spec.name for spec in active_targets()] == ['TripBro', 'TripBroTests']
+
+
+def test_test_targets_need_their_host(tmp_path, monkeypatch):
+    make_roots(tmp_path, 'TripBroTests', 'TripBroUITests')
+    monkeypatch.chdir(tmp_path)
+    assert active_targets() == []
+
+
+def test_target_without_its_dependency_is_refused():
+    registry = IDRegistry()
+    specs = [spec for spec in DEFAULT_TARGETS if spec.name == 'TripBroTests']
+    with collect_sources(registry, specs, []) as sources:
+        with pytest.raises(ValueError, match="depends on TripBro"):
+            ''.join(iter_project(sources, registry))
+
+
+def test_core_data_models_are_compiled(tmp_path, monkeypatch):
+    model = tmp_path / 'TripBro' / 'Model.xcdatamodeld' / 'Model.xcdatamodel'
+    os.makedirs(model)
+    (model / 'contents').write_text('<model/>')
+    (tmp_path / 'TripBro' / 'TripBroApp.swift').write_text('')
+    monkeypatch.chdir(tmp_path)
+    registry = IDRegistry()
+    with collect_sources(registry, active_targets()) as sources:
+        pbxproj = ''.join(iter_project(sources, registry))
+    assert 'lastKnownFileType = wrapper.xcdatamodeld; path = Model.xcdatamodeld;' in pbxproj
+    assert '/* Model.xcdatamodeld in Sources */' in pbxproj
+    assert 'Model.xcdatamodel/' not in pbxproj
@@ -0,0 +1,81 @@
+import json
+import os
+import shutil
+import subprocess
+import sys
+
+from conftest import ROOT
+from pbxtools.testplan import discover_tests, parse_durations, read_durations, shard
+
+SOURCE = '''
+import XCTest
+import Testing
+
+final class TripTests: XCTestCase {
+    override func setUp() {}
+    func testTotal() throws {}
+    func testWithArgument(_ value: Int) {}
+    func helper() {}
+    var text = "func testInString() {}"
+}
+
+struct ParsingTests {
+    @Test func parsesDates() {}
+    @Test("Named") func example(city: String, count: Int) {}
+}
+
+@Test func freeFunction() {}
+'''
+
+
+def test_discover_tests():
+    assert discover_tests(SOURCE) == ['TripTests/testTotal()', 'ParsingTests/parsesDates()',
+                                      'ParsingTests/example(city:count:)', 'freeFunction()']
+
+
+def test_parse_plain_durations():
+    assert parse_durations({'TripBroTests/TripTests/testTotal()': 1.5, 'Broken': 2}) == {
+        ('TripBroTests', 'TripTests/testTotal()'): 1.5}
+
+
+def test_parse_xcresulttool_durations():
+    document = {'testNodes': [{'nodeType': 'Test Plan', 'children': [
+        {'nodeType': 'Unit test bundle', 'name': 'TripBroTests', 'children': [
+            {'nodeType': 'Test Suite', 'name': 'TripTests', 'children': [
+                {'nodeType': 'Test Case', 'nodeIdentifier': 'TripTests/testTotal()', 'duration': '1.5s'},
+                {'nodeType': 'Test Case', 'nodeIdentifier': 'TripTests/testFast()', 'durationInSeconds': 0.25},
+                {'nodeType': 'Test Case', 'nodeIdentifier': 'TripTests/testTotal()', 'duration': '500ms'},
+            ]}]}]}]}
+    assert parse_durations(document) == {('TripBroTests', 'TripTests/testTotal()'): 2.0,
+                                         ('TripBroTests', 'TripTests/testFast()'): 0.25}
+
+
+def test_read_durations_averages_runs(tmp_path):
+    paths = []
+    for i, seconds in enumerate((1.0, 3.0)):
+        path = tmp_path / f"run{i}.json"
+        path.write_text(json.dumps({'TripBroTests/TripTests/testTotal()': seconds}))
+        paths.append(str(path))
+    assert read_durations(paths) == {('TripBroTests', 'TripTests/testTotal()'): 2.0}
+
+
+def test_shard_balances_longest_first():
+    tests = {('T', 'a'): 5.0, ('T', 'b'): 4.0, ('T', 'c'): 3.0, ('T', 'd'): 2.0, ('T', 'e'): 2.0}
+    shards = shard(tests, 2)
+    assert shards == [(9.0, [('T', 'a'), ('T', 'd'), ('T', 'e')]), (7.0, [('T', 'b'), ('T', 'c')])]
+    assert shard(tests, 2) == shards
+    assert shard({}, 3) == [(0.0, [])] * 3
+
+
+def test_shard_count_is_clamped_to_the_tests(tmp_path):
+    for folder in ('TripBro.xcodeproj', 'TripBroTests', 'TripBroUITests'):
+        shutil.copytree(os.path.join(ROOT, folder), tmp_path / folder)
+    output = subprocess.run([sys.executable, os.path.join(ROOT, 'shard_xcode_tests.py'), '--shards', '6',
+                             '--project', str(tmp_path / 'TripBro.xcodeproj')],
+                            check=True, capture_output=True, text=True).stdout
+    assert "Only 4 tests: writing 4 shards instead of 6" in output
+    plans = sorted(os.listdir(tmp_path / 'TestPlans'))
+    assert plans == [f"TripBro-Shard{index}.xctestplan" for index in range(1, 5)]
+    for plan in plans:
+        with open(tmp_path / 'TestPlans' / plan) as f:
+            assert json.load(f)['testTargets']
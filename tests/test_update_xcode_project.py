@@ -0,0 +1,87 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+from benchmark import make_tree
+from conftest import ROOT
+from pbxtools.index import ProjectIndex
+from pbxtools.pbxproj import Project
+from test_pbxproj import PROJECTS
+from update_xcode_project import add_files, remove_files
+
+GENERATOR = os.path.join(ROOT, 'TripBroComplete', 'generate_project.py')
+NEW_FILES = ['TripBro/AAA/Deep/A.swift', 'TripBro/App/Aaa.swift', 'TripBro/App/0data.json',
+             'TripBroTests/NewTests.swift']
+
+
+@pytest.fixture
+def generated(tmp_path):
+    """A generated project with app and unit-test targets, in tmp_path"""
+    make_tree(str(tmp_path), 20, depth=2, fanout=2)
+    os.makedirs(tmp_path / 'TripBroTests')
+    (tmp_path / 'TripBroTests' / 'TripTests.swift').write_text("import XCTest\n")
+    generate(tmp_path)
+    return str(tmp_path / 'TripBro.xcodeproj' / 'project.pbxproj')
+
+
+def generate(cwd):
+    output = subprocess.run([sys.executable, GENERATOR, '--full'], cwd=cwd, check=True,
+                            capture_output=True, text=True).stdout
+    return 'left untouched' not in output
+
+
+def read(path):
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+@pytest.mark.parametrize('path', PROJECTS[1:], ids=['TripBroComplete'])
+def test_add_then_remove_is_byte_identical(path):
+    project = Project.load(path)
+    original = project.dumps()
+    assert add_files(project, NEW_FILES[:3]) == NEW_FILES[:3]
+    assert project.dumps() != original
+    assert remove_files(project, NEW_FILES[:3]) == NEW_FILES[:3]
+    assert project.dumps() == original
+
+
+def test_added_files_go_where_the_generator_puts_them(generated, tmp_path):
+    for path in NEW_FILES:
+        os.makedirs(tmp_path / os.path.dirname(path), exist_ok=True)
+        (tmp_path / path).write_text("\n")
+    project = Project.load(generated)
+    add_files(project, NEW_FILES[:3], targets=['TripBro'])
+    add_files(project, NEW_FILES[3:], targets=['TripBroTests'])
+    project.save(generated)
+    patched = read(generated)
+    assert not generate(tmp_path)
+    assert read(generated) == patched
+
+
+def test_target_scoping(generated):
+    project = Project.load(generated)
+    path = 'TripBro/App/Shared.swift'
+    add_files(project, [path], targets=['TripBro', 'TripBroTests'])
+    assert ProjectIndex.from_project(project).targets_for(path) == ['TripBro', 'TripBroTests']
+    # An existing file only joins the targets it is missing from
+    assert add_files(project, [path], targets=['TripBro']) == []
+
+    assert remove_files(project, [path], targets=['TripBroTests']) == [path]
+    index = ProjectIndex.from_project(project)
+    assert index.targets_for(path) == ['TripBro']
+    assert index.file_ref(path) is not None
+    with pytest.raises(ValueError, match="Target Missing not found"):
+        add_files(project, ['TripBro/App/Other.swift'], targets=['Missing'])
+
+
+def test_removing_the_last_file_prunes_empty_groups(generated):
+    project = Project.load(generated)
+    original = project.dumps()
+    add_files(project, ['TripBro/New/Deeper/Only.swift'])
+    groups = set(project.group_paths().values())
+    assert {'TripBro/New', 'TripBro/New/Deeper'} <= groups
+    remove_files(project, ['TripBro/New/Deeper/Only.swift'])
+    assert not {'TripBro/New', 'TripBro/New/Deeper'} & set(project.group_paths().values())
+    assert project.dumps() == original
@@ -0,0 +1,99 @@
+import os
+import sys
+
+import pytest
+
+from pbxtools import watch as watch_module
+from pbxtools.watch import InotifyWatcher, PollingWatcher, watch
+
+
+def write(root, path):
+    path = os.path.join(root, path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as f:
+        f.write('struct A {}\n')
+
+
+class Stop(Exception):
+    pass
+
+
+class ScriptedWatcher:
+    """Replays wait() results, advancing a fake clock by each call's timeout"""
+
+    def __init__(self, clock, results):
+        self.clock = clock
+        self.results = list(results)
+        self.calls = []
+
+    def wait(self, timeout=None):
+        self.calls.append(timeout)
+        if timeout is not None:
+            self.clock[0] += timeout
+        return self.results.pop(0)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+
+def run_watch(monkeypatch, results, bursts, **kwargs):
+    clock = [0.0]
+    watcher = ScriptedWatcher(clock, results)
+    monkeypatch.setattr(watch_module, 'open_watcher', lambda *args: watcher)
+    monkeypatch.setattr(watch_module.time, 'monotonic', lambda: clock[0])
+    changes = []
+
+    def on_change():
+        changes.append(clock[0])
+        if len(changes) == bursts:
+            raise Stop
+    with pytest.raises(Stop):
+        watch('.', on_change, **kwargs)
+    return watcher, changes
+
+
+def test_a_burst_of_events_triggers_one_callback(monkeypatch):
+    watcher, changes = run_watch(monkeypatch, [True, True, True, False, True, False], 2, debounce=0.5)
+    assert watcher.calls == [None, 0.5, 0.5, 0.5, None, 0.5]
+    assert changes == [1.5, 2.0]
+
+
+def test_a_steady_trickle_is_flushed_after_max_delay(monkeypatch):
+    watcher, changes = run_watch(monkeypatch, [True] * 20, 1, debounce=0.5, max_delay=2.0)
+    assert watcher.calls == [None, 0.5, 0.5, 0.5, 0.5]
+    assert changes == [2.0]
+
+
+def test_polling_watcher_sees_added_and_removed_files(tmp_path):
+    root = str(tmp_path)
+    write(root, 'App/A.swift')
+    with PollingWatcher(root, interval=0.01) as watcher:
+        assert not watcher.wait(0.05)
+        write(root, 'App/Notes.md')
+        assert not watcher.wait(0.05)
+        write(root, 'App/B.swift')
+        assert watcher.wait(1)
+        os.remove(os.path.join(root, 'App/A.swift'))
+        assert watcher.wait(1)
+
+
+@pytest.mark.skipif(not sys.platform.startswith('linux'), reason="inotify is Linux only")
+def test_inotify_watcher_follows_new_directories(tmp_path):
+    root = str(tmp_path)
+    write(root, 'App/A.swift')
+    with InotifyWatcher(root) as watcher:
+        assert not watcher.wait(0.05)
+        write(root, 'App/Notes.md')
+        write(root, 'DerivedData/Build/Cached.swift')
+        assert not watcher.wait(0.1)
+        os.makedirs(os.path.join(root, 'Views', 'List'))
+        assert watcher.wait(1)
+        # The new directory is watched, so a file created inside it counts
+        write(root, 'Views/List/TripListView.swift')
+        assert watcher.wait(1)
+        os.rename(os.path.join(root, 'App/A.swift'), os.path.join(root, 'App/B.swift'))
+        assert watcher.wait(1)
+        assert not watcher.wait(0.05)
@@ -0,0 +1,58 @@
+import os
+import stat
+
+import pytest
+
+from pbxtools.writer import FileTable, write_stream
+
+
+def chunks(text):
+    return (text[i:i + 3] for i in range(0, len(text), 3))
+
+
+def test_identical_content_leaves_the_file_alone(tmp_path):
+    path = str(tmp_path / 'project.pbxproj')
+    assert write_stream(path, chunks('// !$*UTF8*$!\n{}\n'))
+    os.utime(path, ns=(1, 1))
+    assert not write_stream(path, chunks('// !$*UTF8*$!\n{}\n'))
+    assert os.stat(path).st_mtime_ns == 1
+    assert os.listdir(tmp_path) == ['project.pbxproj']
+
+
+@pytest.mark.parametrize('text', ['// !$*UTF8*$!\n{x}\n', '// !$*UTF8*$!\n{}\n\n', ''])
+def test_changed_content_is_replaced(tmp_path, text):
+    path = str(tmp_path / 'project.pbxproj')
+    write_stream(path, ['// !$*UTF8*$!\n{}\n'])
+    os.chmod(path, 0o640)
+    assert write_stream(path, chunks(text))
+    with open(path) as f:
+        assert f.read() == text
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o640
+    assert os.listdir(tmp_path) == ['project.pbxproj']
+
+
+def test_failed_generation_keeps_the_old_file(tmp_path):
+    path = str(tmp_path / 'project.pbxproj')
+    write_stream(path, ['old'])
+
+    def failing():
+        yield 'new'
+        raise RuntimeError("generation failed")
+    with pytest.raises(RuntimeError):
+        write_stream(path, failing())
+    with open(path) as f:
+        assert f.read() == 'old'
+    assert os.listdir(tmp_path) == ['project.pbxproj']
+
+
+@pytest.mark.parametrize('spool', [False, True])
+def test_file_table_round_trips_rows(spool):
+    rows = [('App/A b.swift', 'A' * 24, 'B' * 24), ('Views/ü.swift', 'C' * 24, 'D' * 24)]
+    with FileTable(spool) as table:
+        for row in rows:
+            table.add(*row)
+        assert len(table) == 2
+        outer = iter(table)
+        assert next(outer) == rows[0]
+        assert list(table) == rows
+        assert next(outer) == rows[1]
@@ -1,85 +1,302 @@
 #!/usr/bin/env python3
 """
-Script to add new Swift files to the Xcode project
+Script to add files to, or remove them from, an Xcode project
+
+All additions and removals are applied to the parsed project in memory
+and written back in a single pass, under the project's file lock. With
+--serve the script instead stays running as a project server (see
+pbxtools.server); while one is listening, later invocations hand their
+changes to it rather than parsing the project themselves.
 """
 
-import re
-import uuid
-
-def generate_uuid():
-    """Generate a random UUID in the format used by Xcode"""
-    return uuid.uuid4().hex[:24].upper()
-
-# Read the project file
-with open('/home/user/tripbro/TripBroComplete/TripBro.xcodeproj/project.pbxproj', 'r') as f:
-    content = f.read()
-
-# New files to add
-new_files = [
-    {'name': 'Document.swift', 'path': 'Trip.swift'},
-    {'name': 'DocumentRepository.swift', 'path': 'Trip.swift'},
-    {'name': 'DocumentService.swift', 'path': 'Trip.swift'},
-    {'name': 'DocumentListView.swift', 'path': 'TripListView.swift'},
-    {'name': 'DocumentDetailView.swift', 'path': 'TripListView.swift'},
-    {'name': 'DocumentPickerView.swift', 'path': 'TripListView.swift'},
-    {'name': 'TripDetailView.swift', 'path': 'TripListView.swift'},
-]
-
-# Generate UUIDs for new files
-file_references = {}
-build_files = {}
-
-for file_info in new_files:
-    file_name = file_info['name']
-    file_references[file_name] = generate_uuid()
-    build_files[file_name] = generate_uuid()
-
-# 1. Add PBXBuildFile section entries
-build_file_section_match = re.search(r'(/\* Begin PBXBuildFile section \*/\n)', content)
-if build_file_section_match:
-    insert_pos = build_file_section_match.end()
-    new_entries = []
-    for file_name in file_references:
-        new_entries.append(
-            f"\t\t{build_files[file_name]} /* {file_name} in Sources */ = "
-            f"{{isa = PBXBuildFile; fileRef = {file_references[file_name]} /* {file_name} */; }};\n"
-        )
-    content = content[:insert_pos] + ''.join(new_entries) + content[insert_pos:]
-
-# 2. Add PBXFileReference section entries
-file_ref_section_match = re.search(r'(/\* Begin PBXFileReference section \*/\n)', content)
-if file_ref_section_match:
-    insert_pos = file_ref_section_match.end()
-    new_entries = []
-    for file_name in file_references:
-        new_entries.append(
-            f"\t\t{file_references[file_name]} /* {file_name} */ = "
-            f"{{isa = PBXFileReference; lastKnownFileType = sourcecode.swift; path = {file_name}; sourceTree = \"<group>\"; }};\n"
-        )
-    content = content[:insert_pos] + ''.join(new_entries) + content[insert_pos:]
-
-# 3. Add files to PBXGroup (TripBro group)
-group_section_match = re.search(r'(6A269C141BA24297B77212DD /\* TripBro \*/ = \{\s+isa = PBXGroup;\s+children = \(\s+)', content)
-if group_section_match:
-    insert_pos = group_section_match.end()
-    new_entries = []
-    for file_name in file_references:
-        new_entries.append(f"\t\t\t\t{file_references[file_name]} /* {file_name} */,\n")
-    content = content[:insert_pos] + ''.join(new_entries) + content[insert_pos:]
-
-# 4. Add to PBXSourcesBuildPhase
-sources_section_match = re.search(r'(8AE8A754C1424BAA82640DA4 /\* Sources \*/ = \{\s+isa = PBXSourcesBuildPhase;\s+buildActionMask = 2147483647;\s+files = \(\s+)', content)
-if sources_section_match:
-    insert_pos = sources_section_match.end()
-    new_entries = []
-    for file_name in file_references:
-        new_entries.append(f"\t\t\t\t{build_files[file_name]} /* {file_name} in Sources */,\n")
-    content = content[:insert_pos] + ''.join(new_entries) + content[insert_pos:]
-
-# Write the updated project file
-with open('/home/user/tripbro/TripBroComplete/TripBro.xcodeproj/project.pbxproj', 'w') as f:
-    f.write(content)
-
-print("Successfully updated Xcode project file with new Swift files")
-for file_name in file_references:
-    print(f"  - {file_name}")
+import argparse
+import os
+
+from pbxtools.classify import DEFAULT_CLASSIFIER, PHASES, SOURCES, UNKNOWN
+from pbxtools.groups import GroupTrie, child_order, group_order, missing_groups, prune_groups
+from pbxtools.ids import registry_from_project
+from pbxtools.index import ProjectIndex
+from pbxtools.lock import project_lock
+from pbxtools.model import BuildFile, FileReference, Group, PBXObject
+from pbxtools.pbxproj import Project, insert_sorted
+from pbxtools.scan import scan_order
+from pbxtools.server import ProjectServer, request, socket_path_for
+from pbxtools.targets import PHASE_CLASSES
+
+DEFAULT_PROJECT = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                               'TripBroComplete', 'TripBro.xcodeproj')
+DEFAULT_TARGET = 'TripBro'
+
+def find_phase(project, target_name, phase=SOURCES):
+    """Return the UUID of the named target's Sources, Frameworks or Resources phase"""
+    _, target = project.find('PBXNativeTarget', name=target_name)
+    if target is None:
+        raise ValueError(f"Target {target_name} not found in project")
+    isa = PHASE_CLASSES[phase].isa
+    for phase_uuid in target.get('buildPhases', ()):
+        if project.get(phase_uuid, {}).get('isa') == isa:
+            return phase_uuid
+    raise ValueError(f"Target {target_name} has no {phase} build phase")
+
+def add_files(project, paths, targets=(DEFAULT_TARGET,), registry=None, classifier=DEFAULT_CLASSIFIER):
+    """Add files to the project and to the matching build phase of every target.
+
+    paths are relative to the directory holding the .xcodeproj. Each file is
+    placed in the group mirroring its directory; missing groups below the
+    deepest existing one are created. The classifier picks the file type
+    and phase: Swift files are compiled, resources copied, headers only
+    listed, and unknown files copied as Xcode would. New objects, group
+    children and phase members go where the generator would put them
+    (see _layout_order). Returns the paths actually added.
+    """
+    registry = registry or registry_from_project(project)
+    groups = GroupTrie.from_project(project)
+    if groups is None:
+        raise ValueError("Project has no main group")
+    refs = {path: uuid for uuid, path in project.file_paths().items()}
+    # (target, phase) -> (phase UUID, file refs already in it), looked up on first use
+    phases = {}
+
+    def phase_of(target, phase):
+        if (target, phase) not in phases:
+            phase_uuid = find_phase(project, target, phase)
+            phases[target, phase] = phase_uuid, {project.get(b, {}).get('fileRef')
+                                                 for b in project.get(phase_uuid)['files']}
+        return phases[target, phase]
+
+    for target in targets:
+        phase_of(target, SOURCES)
+
+    order = _layout_order(project, groups)
+    objects, children, members = {}, {}, {}
+    added = []
+    for path in paths:
+        path = os.path.normpath(path)
+        file_type, phase = classifier.classify(path) or UNKNOWN
+        file_ref = refs.get(path)
+        if file_ref is None:
+            directory = os.path.dirname(path)
+            node, created = missing_groups(groups, directory,
+                                           lambda directory: registry.id_for('', 'PBXGroup', directory))
+            parent = groups.get(os.path.dirname(created[0][0])) if created else None
+            for group_path, group in created:
+                order[group.uuid] = (group_order(group_path),)
+                objects[group.uuid] = Group(group.uuid, path=os.path.basename(group_path)).to_dict()
+                children.setdefault(parent.uuid, []).append(group.uuid)
+                parent = group
+            file_ref = registry.id_for('', 'PBXFileReference', path)
+            order[file_ref] = (scan_order(path),)
+            objects[file_ref] = FileReference(file_ref, os.path.basename(path), file_type).to_dict()
+            children.setdefault(node.uuid, []).append(file_ref)
+            refs[path] = file_ref
+            added.append(path)
+        if phase is None:
+            continue
+
+        for target in targets:
+            phase_uuid, phase_members = phase_of(target, phase)
+            if file_ref in phase_members:
+                continue
+            build_file = registry.id_for(target, 'PBXBuildFile', path)
+            order[build_file] = (*order.get(phase_uuid, (-1, -1)), scan_order(path))
+            objects[build_file] = BuildFile(build_file, PBXObject(file_ref), phase).to_dict()
+            members.setdefault(phase_uuid, []).append(build_file)
+            phase_members.add(file_ref)
+            if path not in added:
+                added.append(path)
+
+    project.add_sorted(objects, lambda uuid: order.get(uuid, ()))
+    for group_uuid, uuids in children.items():
+        insert_sorted(project.get(group_uuid)['children'], uuids, child_order(project))
+    for phase_uuid, build_files in members.items():
+        insert_sorted(project.get(phase_uuid)['files'], build_files, lambda uuid: order.get(uuid, ())[-1:])
+    return added
+
+def _layout_order(project, groups):
+    """Return {uuid: sort key} giving the order the generator writes objects in.
+
+    Groups sort deepest first (group_order), file references and phase
+    members in scan order, build files by target, then phase, then file.
+    Phases map to their (target, phase) prefix. Objects missing here sort
+    first, like the products and xcconfigs of a generated project.
+    """
+    paths = project.file_paths()
+    order = {uuid: (scan_order(path),) for uuid, path in paths.items()}
+    for uuid, dir_path in groups.paths().items():
+        if dir_path:
+            order[uuid] = (group_order(dir_path),)
+    phase_isas = {PHASE_CLASSES[phase].isa: PHASES.index(phase) for phase in PHASES}
+    root = project.root_object or {}
+    for target_index, target_uuid in enumerate(root.get('targets', ())):
+        for phase_uuid in project.get(target_uuid, {}).get('buildPhases', ()):
+            phase = project.get(phase_uuid, {})
+            if phase.get('isa') not in phase_isas:
+                continue
+            order[phase_uuid] = (target_index, phase_isas[phase['isa']])
+            for build_file in phase.get('files', ()):
+                path = paths.get(project.get(build_file, {}).get('fileRef'))
+                if path is not None:
+                    order[build_file] = (*order[phase_uuid], scan_order(path))
+    return order
+
+def remove_files(project, paths, targets=None):
+    """Remove files from the given targets, or from the project entirely.
+
+    With targets=None the file references are deleted along with every
+    build file that points at them, and groups left empty are removed too;
+    otherwise only the build files in those targets' build phases go.
+    Returns the paths that were found.
+    """
+    refs = {path: uuid for uuid, path in project.file_paths().items()}
+    found = [p for p in (os.path.normpath(p) for p in paths) if p in refs]
+    stale_refs = {refs[p] for p in found}
+    if not stale_refs:
+        return found
+
+    if targets is None:
+        phase_ids = [uuid for isa, objs in project.by_isa.items()
+                     if isa and isa.endswith('BuildPhase') for uuid in objs]
+    else:
+        phase_ids = [uuid for target in targets for uuid in _target_phases(project, target)]
+
+    stale_builds = set()
+    for phase_uuid in phase_ids:
+        for build_file in project.get(phase_uuid).get('files', ()):
+            if project.get(build_file, {}).get('fileRef') in stale_refs:
+                stale_builds.add(build_file)
+    for phase_uuid in phase_ids:
+        project.get(phase_uuid)['files'].remove_all(stale_builds)
+    for build_file in stale_builds:
+        project.remove_object(build_file)
+
+    if targets is None:
+        for _, group, _, _ in project.walk_groups():
+            group['children'].remove_all(stale_refs)
+        for file_ref in stale_refs:
+            project.remove_object(file_ref)
+        groups = GroupTrie.from_project(project)
+        for directory in sorted({os.path.dirname(p) for p in found}, key=len, reverse=True):
+            prune_groups(project, groups, directory)
+    return found
+
+def _target_phases(project, target_name):
+    """Return the UUIDs of the named target's Sources, Frameworks and Resources phases"""
+    _, target = project.find('PBXNativeTarget', name=target_name)
+    if target is None:
+        raise ValueError(f"Target {target_name} not found in project")
+    isas = {PHASE_CLASSES[phase].isa for phase in PHASES}
+    return [uuid for uuid in target.get('buildPhases', ()) if project.get(uuid, {}).get('isa') in isas]
+
+def query_files(project, paths):
+    """Return, for each path, its file reference and the targets building it"""
+    index = ProjectIndex.from_project(project)
+    return [{'path': path, 'file_ref': index.file_ref(path), 'targets': index.targets_for(path)}
+            for path in (os.path.normpath(p) for p in paths)]
+
+def _add_op(project, registry, paths, targets=None):
+    return add_files(project, paths, targets or (DEFAULT_TARGET,), registry)
+
+def _remove_op(project, registry, paths, targets=None):
+    return remove_files(project, paths, targets)
+
+def _query_op(project, registry, paths):
+    return query_files(project, paths)
+
+# Operations offered by the project server: name -> (function, mutates)
+OPERATIONS = {
+    'add': (_add_op, True),
+    'remove': (_remove_op, True),
+    'query': (_query_op, False),
+}
+
+def apply_ops(pbxproj, ops):
+    """Apply ops directly, as the server would: one read, at most one write"""
+    with project_lock(pbxproj):
+        project = Project.load(pbxproj)
+        registry = registry_from_project(project)
+        results = []
+        for op in ops:
+            arguments = dict(op)
+            function, _ = OPERATIONS[arguments.pop('op')]
+            results.append(function(project, registry, **arguments))
+        if any(OPERATIONS[op['op']][1] for op in ops):
+            project.save(pbxproj)
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Add or remove files in an Xcode project")
+    parser.add_argument("--project", default=DEFAULT_PROJECT,
+                        help="path to the .xcodeproj (default: TripBroComplete/TripBro.xcodeproj)")
+    parser.add_argument("--target", dest="targets", action="append",
+                        help=f"target to update; repeatable (default: {DEFAULT_TARGET})")
+    parser.add_argument("--add", nargs="+", default=[], metavar="PATH", help="files to add")
+    parser.add_argument("--remove", nargs="+", default=[], metavar="PATH", help="files to remove")
+    parser.add_argument("--query", nargs="+", default=[], metavar="PATH",
+                        help="show whether files are in the project and which targets build them")
+    parser.add_argument("--serve", action="store_true",
+                        help="keep the project loaded and serve requests on a Unix socket")
+    parser.add_argument("--socket", help="server socket (default: one per project in the temp directory)")
+    parser.add_argument("--sync", action="store_true",
+                        help="when going through the server, wait until the change is on disk")
+    parser.add_argument("--no-server", action="store_true", help="edit the file directly even if a server runs")
+    args = parser.parse_args()
+
+    pbxproj = os.path.join(args.project, 'project.pbxproj')
+    socket_path = args.socket or socket_path_for(pbxproj)
+    if args.serve:
+        server = ProjectServer(pbxproj, OPERATIONS, socket_path)
+        print(f"🛰  Serving {pbxproj} on {socket_path} (Ctrl+C to stop)")
+        try:
+            server.serve_forever()
+        except RuntimeError as e:
+            raise SystemExit(str(e))
+        return
+    if not args.add and not args.remove and not args.query:
+        parser.error("nothing to do: pass --add, --remove, --query or --serve")
+
+    base = os.path.dirname(os.path.abspath(args.project))
+
+    def relative(paths):
+        return [os.path.relpath(os.path.abspath(p), base) for p in paths]
+
+    # Removals first, then additions, then queries, which see the result
+    ops = []
+    if args.remove:
+        ops.append({'op': 'remove', 'paths': relative(args.remove), 'targets': args.targets})
+    if args.add:
+        ops.append({'op': 'add', 'paths': relative(args.add), 'targets': args.targets})
+    if args.query:
+        ops.append({'op': 'query', 'paths': relative(args.query)})
+
+    response = None
+    if not args.no_server and os.path.exists(socket_path):
+        try:
+            response = request(socket_path, ops + [{'op': 'flush'}] if args.sync else ops)
+        except OSError:
+            response = None
+    if response is None:
+        try:
+            results = apply_ops(pbxproj, ops)
+        except ValueError as e:
+            raise SystemExit(str(e))
+    elif not response.get('ok'):
+        raise SystemExit(response.get('error'))
+    else:
+        results = response['results']
+
+    results = iter(results)
+    if args.remove or args.add:
+        removed = next(results) if args.remove else []
+        added = next(results) if args.add else []
+        print("Successfully updated Xcode project file")
+        for path in added:
+            print(f"  + {path}")
+        for path in removed:
+            print(f"  - {path}")
+    if args.query:
+        for entry in next(results):
+            where = ', '.join(entry['targets']) or 'no target'
+            print(f"  {entry['path']}: {where}" if entry['file_ref'] else f"  {entry['path']}: not in project")
+
+if __name__ == "__main__":
+    main()